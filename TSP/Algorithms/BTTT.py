@@ -1,14 +1,11 @@
-import heapq
-import folium
-from math import radians, sin, cos, sqrt, atan2
-
-class Node:
-    def __init__(self, name, heuristic_value):
-        self.name = name
-        self.heuristic = heuristic_value
-    
-    def __lt__(self, other):
-        return self.heuristic < other.heuristic
+import os
+from functools import lru_cache
+import numpy as np
+
+from .Control import counters_of
+from .Distances import CachedProvider, HttpProvider, MatrixFileProvider, TableProvider
+from .Instance import TSPInstance, as_instance
+from .LocalSearch import improve_ids
 
 positions = {
     "Quận 1": (106.700981, 10.775658),
@@ -20,86 +17,338 @@ positions = {
     "Thủ Đức": (106.7565, 10.8510)
 }
 
+# Khoảng cách đường đi thực tế (km), mỗi cặp ghi một lần; chiều ngược lại do TableProvider bổ sung
 real_distances = {
-    ("Bình Tân", "Quận 1"): 10.0, ("Quận 1", "Bình Tân"): 10.0,
-    ("Bình Tân", "Quận 12"): 12.5, ("Quận 12", "Bình Tân"): 12.5,
-    ("Bình Tân", "Quận 7"): 11.0, ("Quận 7", "Bình Tân"): 11.0,
-    ("Bình Tân", "Quận 8"): 6.5, ("Quận 8", "Bình Tân"): 6.5,
-    ("Bình Tân", "Quận 10"): 9.0, ("Quận 10", "Bình Tân"): 9.0,
-    ("Thủ Đức", "Quận 1"): 12.0, ("Quận 1", "Thủ Đức"): 12.0,
-    ("Thủ Đức", "Quận 12"): 10.0, ("Quận 12", "Thủ Đức"): 10.0,
-    ("Thủ Đức", "Quận 7"): 14.0, ("Quận 7", "Thủ Đức"): 14.0,
-    ("Thủ Đức", "Quận 8"): 15.5, ("Quận 8", "Thủ Đức"): 15.5,
-    ("Thủ Đức", "Quận 10"): 11.5, ("Quận 10", "Thủ Đức"): 11.5,
-    ("Thủ Đức", "Bình Tân"): 16.0, ("Bình Tân", "Thủ Đức"): 16.0,
-    ("Quận 1", "Quận 12"): 13.5, ("Quận 12", "Quận 1"): 13.5,
-    ("Quận 1", "Quận 7"): 6.0,   ("Quận 7", "Quận 1"): 6.0,
-    ("Quận 1", "Quận 8"): 5.5,   ("Quận 8", "Quận 1"): 5.5,
-    ("Quận 1", "Quận 10"): 3.0,  ("Quận 10", "Quận 1"): 3.0,
-    ("Quận 12", "Quận 7"): 15.0, ("Quận 7", "Quận 12"): 15.0,
-    ("Quận 12", "Quận 8"): 14.5, ("Quận 8", "Quận 12"): 14.5,
-    ("Quận 12", "Quận 10"): 11.0,("Quận 10", "Quận 12"): 11.0,
-    ("Quận 7", "Quận 8"): 3.5,   ("Quận 8", "Quận 7"): 3.5,
-    ("Quận 7", "Quận 10"): 6.5,  ("Quận 10", "Quận 7"): 6.5,
-    ("Quận 8", "Quận 10"): 5.0,  ("Quận 10", "Quận 8"): 5.0,
+    ("Bình Tân", "Quận 1"): 10.0,
+    ("Bình Tân", "Quận 12"): 12.5,
+    ("Bình Tân", "Quận 7"): 11.0,
+    ("Bình Tân", "Quận 8"): 6.5,
+    ("Bình Tân", "Quận 10"): 9.0,
+    ("Thủ Đức", "Quận 1"): 12.0,
+    ("Thủ Đức", "Quận 12"): 10.0,
+    ("Thủ Đức", "Quận 7"): 14.0,
+    ("Thủ Đức", "Quận 8"): 15.5,
+    ("Thủ Đức", "Quận 10"): 11.5,
+    ("Thủ Đức", "Bình Tân"): 16.0,
+    ("Quận 1", "Quận 12"): 13.5,
+    ("Quận 1", "Quận 7"): 6.0,
+    ("Quận 1", "Quận 8"): 5.5,
+    ("Quận 1", "Quận 10"): 3.0,
+    ("Quận 12", "Quận 7"): 15.0,
+    ("Quận 12", "Quận 8"): 14.5,
+    ("Quận 12", "Quận 10"): 11.0,
+    ("Quận 7", "Quận 8"): 3.5,
+    ("Quận 7", "Quận 10"): 6.5,
+    ("Quận 8", "Quận 10"): 5.0,
 }
 
-def heu_haversine(city1, city2):
-    lon1, lat1 = positions[city1]
-    lon2, lat2 = positions[city2]
+# Nguồn khoảng cách đường đi (xem Distances.py); đổi bằng use_distances()
+DISTANCE_CACHE = "Algorithms/distances_cache.sqlite"
+distance_provider = TableProvider(real_distances)
+
+def use_distances(source='table', cache=DISTANCE_CACHE):
+    # source: "table" (bảng real_distances), file .npz / thư mục ma trận, hoặc URL dịch vụ định tuyến.
+    # Nguồn file / HTTP được bọc bằng bộ nhớ đệm SQLite (cache=None để tắt).
+    global distance_provider
+    if source == 'table':
+        distance_provider = TableProvider(real_distances)
+        return distance_provider
+    if source.startswith(('http://', 'https://')):
+        provider = HttpProvider(source, positions)
+    else:
+        provider = MatrixFileProvider(source)
+    distance_provider = CachedProvider(provider, cache, source) if cache else provider
+    return distance_provider
+
+# Tọa độ (lon, lat) đổi sang radian một lần; ma trận haversine của mỗi tập quận được giữ
+# trong bộ nhớ đệm LRU để các lần chạy sau (cùng tập, thứ tự bất kỳ) không phải tính lại.
+HAVERSINE_CACHE_SIZE = 32
+city_index = {city: i for i, city in enumerate(positions)}
+radians_table = np.radians(np.array(list(positions.values()), dtype=np.float64))
+
+@lru_cache(maxsize=HAVERSINE_CACHE_SIZE)
+def haversine_sorted(cities):
+    # cities: tuple đã sắp xếp -> ma trận khoảng cách (km) theo đúng thứ tự đó
+    rad = radians_table[[city_index[city] for city in cities]]
+    lon, lat = rad[:, 0], rad[:, 1]
     R = 6371.0
-    dlon = radians(lon2 - lon1)
-    dlat = radians(lat2 - lat1)
-    a = sin(dlat / 2)**2 + cos(radians(lat1)) * cos(radians(lat2)) * sin(dlon / 2)**2
-    c = 2 * atan2(sqrt(a), sqrt(1 - a))
-    return R * c
+    dlon = lon[None, :] - lon[:, None]
+    dlat = lat[None, :] - lat[:, None]
+    a = np.sin(dlat / 2)**2 + np.cos(lat)[:, None] * np.cos(lat)[None, :] * np.sin(dlon / 2)**2
+    matrix = 2 * R * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+    matrix.setflags(write=False)
+    return matrix
+
+def haversine_matrix(selected_cities):
+    key = tuple(sorted(set(selected_cities)))
+    matrix = haversine_sorted(key)
+    order = {city: i for i, city in enumerate(key)}
+    idx = [order[city] for city in selected_cities]
+    return matrix[np.ix_(idx, idx)]
 
 def create_graph(selected_cities):
+    heuristic = haversine_matrix(selected_cities).tolist()
     graph = {}
-    for city1 in selected_cities:
-        neighbors = []
-        for city2 in selected_cities:
-            if city1 != city2:
-                neighbors.append([city2, heu_haversine(city1, city2)])
-        graph[city1] = neighbors
+    for i, city1 in enumerate(selected_cities):
+        graph[city1] = [[city2, heuristic[i][j]] for j, city2 in enumerate(selected_cities) if city1 != city2]
     return graph
 
-def greedy_best_first_search(graph, start):
-    visited = set()
-    path = [start]
-    total_cost = 0
-    current = start
-    visited.add(current)
+def create_instance(selected_cities, provider=None):
+    # Chi phí: một truy vấn theo lô (tất cả x tất cả) tới nguồn khoảng cách
+    cost = (provider or distance_provider).matrix(selected_cities, selected_cities)
+    heuristic = haversine_matrix(selected_cities)
+    coords = [positions[city] for city in selected_cities]
+    return TSPInstance(selected_cities, cost, coords, heuristic)
 
-    while len(visited) < len(graph):
-        heap = []
-        for neighbor, _ in graph[current]:
-            if neighbor not in visited:
-                h_value = heu_haversine(neighbor, current)
-                heapq.heappush(heap, Node(neighbor, h_value))
+def instance_of(graph):
+    # graph: TSPInstance, danh sách quận (chi phí từ nguồn khoảng cách) hoặc đồ thị chi phí
+    # {thành phố: [[láng giềng, chi phí], ...]} với thành phố không phải quận (không có tọa độ)
+    if isinstance(graph, TSPInstance):
+        return graph
+    if isinstance(graph, dict) and not graph.keys() <= city_index.keys():
+        return as_instance(graph)
+    return create_instance(list(graph))
 
-        if not heap:
-            return None, None
+def greedy_best_first_search(graph, start, control=None):
+    inst = instance_of(graph)
+    s = inst.index[start]
+    visited = np.zeros(inst.n, dtype=bool)
+    visited[s] = True
+    path = [s]
+    total_cost = 0
+    current = s
+    counters = counters_of(control)
 
-        next_node = heapq.heappop(heap)
-        path.append(next_node.name)
-        visited.add(next_node.name)
+    for step in range(inst.n - 1):
+        if control is not None:
+            control.check()
+            control.progress(step / inst.n)
+        h_value = np.where(visited, np.inf, inst.heuristic[current])
+        next_node = int(np.argmin(h_value))
+        path.append(next_node)
+        visited[next_node] = True
+        if counters is not None:
+            counters['heap_pushes'] += inst.n - step - 1
+            counters['heap_pops'] += 1
 
-        if (current, next_node.name) in real_distances:
-            total_cost += real_distances[(current, next_node.name)]
+        if inst.adj[current, next_node]:
+            total_cost += inst.cost[current, next_node]
         else:
+            if counters is not None:
+                counters['dead_ends'] += 1
             return None, None
-        current = next_node.name
+        current = next_node
 
-    if (current, start) in real_distances:
-        total_cost += real_distances[(current, start)]
-        path.append(start)
+    if inst.adj[current, s]:
+        total_cost += inst.cost[current, s]
+        path.append(s)
     else:
+        if counters is not None:
+            counters['dead_ends'] += 1
         return None, None
 
-    return path, round(total_cost, 2)
+    return inst.path_names(path), round(float(total_cost), 2)
+
+# ==== Cập nhật lộ trình khi thêm / bớt quận ====
+# Giữ lộ trình và ma trận khoảng cách của lần trước. Thêm quận: chỉ hỏi nguồn khoảng cách hàng và
+# cột của quận mới rồi chèn vào cạnh rẻ nhất; bớt quận: nối thẳng hai quận kề nó. Sau mỗi thay đổi
+# chạy 2-opt / Or-opt bắt đầu từ các quận quanh chỗ vừa sửa (LocalSearch.improve_ids(focus=...)).
+# Không chèn được (bảng khoảng cách thiếu cạnh) thì dựng lại lộ trình bằng chèn rẻ nhất từ đầu.
+# Mỗi quận giữ cố định một ô của ma trận; ma trận có sức chứa gấp đôi khi đầy, ô của quận bị bớt
+# được đặt inf và dùng lại. Bài toán cho improve_ids và danh sách láng giềng gần nhất được giữ lại,
+# mỗi thay đổi chỉ sửa hàng / cột của ô đó.
+
+ROUTE_NEIGHBORS = 10   # số láng giềng gần nhất cho 2-opt / Or-opt (như k mặc định của improve_ids)
+
+class IncrementalRoute:
+    def __init__(self, inst, start, path=None, provider=None):
+        # inst: bài toán của lần giải đầy đủ (create_instance); path: lộ trình đã tìm được, nếu có
+        self.provider = provider or distance_provider
+        n = inst.n
+        self.capacity = max(n, 1)
+        self.cost = np.full((self.capacity, self.capacity), np.inf)
+        self.cost[:n, :n] = inst.cost
+        self.slots = list(inst.names)       # tên quận của mỗi ô, None nếu ô trống
+        self.slot_of = {city: i for i, city in enumerate(self.slots)}
+        self.free = []                      # ô trống, pop() lấy ô dùng tiếp theo
+        # Số cặp quận có chi phí hai chiều khác nhau: bằng 0 thì dùng được 2-opt
+        self.asymmetric = int(np.count_nonzero(np.triu(self.cost != self.cost.T, 1)))
+        self.near = [self.nearest(i) for i in range(self.capacity)]
+        self.kth = np.array([self.kth_cost(i) for i in range(self.capacity)])
+        self._inst = None
+        self.start = start
+        self.tour = None   # chỉ số ô, không lặp lại quận đầu
+        if path:
+            self.tour = [self.slot_of[city] for city in path[:-1]]
+        else:
+            self.rebuild()
+
+    def nearest(self, i):
+        row = self.cost[i]
+        k = min(ROUTE_NEIGHBORS, self.capacity - 1)
+        if k < 1:
+            return []
+        near = np.argpartition(row, k - 1)[:k]
+        near = near[np.argsort(row[near], kind='stable')]
+        return [j for j in near.tolist() if row[j] != np.inf]
+
+    def kth_cost(self, i):
+        # Chi phí láng giềng xa nhất trong danh sách; danh sách chưa đủ thì mọi ô đều có thể vào
+        near = self.near[i]
+        return self.cost[i, near[-1]] if len(near) == ROUTE_NEIGHBORS else np.inf
 
-def draw_map(path, selected_cities, start):
+    def grow(self):
+        old = self.capacity
+        self.capacity = 2 * old
+        cost = np.full((self.capacity, self.capacity), np.inf)
+        cost[:old, :old] = self.cost
+        self.cost = cost
+        self.slots.extend([None] * old)
+        self.free = list(range(self.capacity - 1, old - 1, -1)) + self.free
+        self.near.extend([] for _ in range(old))
+        self.kth = np.concatenate([self.kth, np.full(old, np.inf)])
+        self._inst = None
+
+    def changed(self, j, stale):
+        # Hàng / cột j vừa đổi: tính lại danh sách láng giềng của j và của các ô trong stale,
+        # chèn j vào danh sách của các ô khác nếu j gần hơn láng giềng xa nhất của chúng
+        closer = np.flatnonzero(self.cost[:, j] < self.kth)
+        stale = set(stale.tolist()) | {j}
+        for i in stale:
+            self.near[i] = self.nearest(i)
+            self.kth[i] = self.kth_cost(i)
+        for i in closer.tolist():
+            if i in stale:
+                continue
+            near, row = self.near[i], self.cost[i]
+            k = 0
+            while k < len(near) and row[near[k]] <= row[j]:
+                k += 1
+            near.insert(k, j)
+            del near[ROUTE_NEIGHBORS:]
+            self.kth[i] = self.kth_cost(i)
+        if self._inst is not None:
+            self._inst.cost_changed(j)
+
+    def rebuild(self):
+        if self.start not in self.slot_of:
+            self.tour = None
+            return
+        s = self.slot_of[self.start]
+        self.tour = [s]
+        for j in self.slot_of.values():
+            if j != s and not self.insert(j):
+                self.tour = None
+                return
+
+    def insert(self, j):
+        # Chèn rẻ nhất: cạnh (a, b) của lộ trình có c[a, j] + c[j, b] - c[a, b] nhỏ nhất
+        tour = np.array(self.tour)
+        nxt = np.roll(tour, -1)
+        base = np.where(tour == nxt, 0.0, self.cost[tour, nxt])
+        delta = self.cost[tour, j] + self.cost[j, nxt] - base
+        k = int(np.argmin(delta))
+        if not np.isfinite(delta[k]):
+            return False
+        self.tour.insert(k + 1, j)
+        return True
+
+    def add(self, city):
+        cities = list(self.slot_of)
+        active = np.fromiter(self.slot_of.values(), dtype=np.intp, count=len(cities))
+        row = self.provider.matrix([city], cities)[0]
+        col = self.provider.matrix(cities, [city])[:, 0]
+        if not self.free:
+            self.grow()
+        j = self.free.pop()
+        self.cost[j, active] = row
+        self.cost[active, j] = col
+        self.asymmetric += int(np.count_nonzero(row != col))
+        self.slots[j] = city
+        self.slot_of[city] = j
+        self.changed(j, active[:0])   # ô mới: chỉ có thể được chèn thêm vào danh sách của ô khác
+        if self.tour is None or not self.insert(j):
+            self.rebuild()
+            return None if self.tour is None else list(self.tour)
+        i = self.tour.index(j)
+        return [self.tour[i - 1], j, self.tour[(i + 1) % len(self.tour)]]
+
+    def remove(self, city):
+        j = self.slot_of.pop(city)
+        focus = None
+        if self.tour is not None:
+            i = self.tour.index(j)
+            p, nx = self.tour[i - 1], self.tour[(i + 1) % len(self.tour)]
+            del self.tour[i]
+            if len(self.tour) > 1 and not np.isfinite(self.cost[p, nx]):
+                self.tour = None
+            else:
+                focus = [c for c in (p, nx) if c != j]
+        active = np.fromiter(self.slot_of.values(), dtype=np.intp, count=len(self.slot_of))
+        self.asymmetric -= int(np.count_nonzero(self.cost[j, active] != self.cost[active, j]))
+        # Các ô có j trong danh sách láng giềng (chi phí tới j không quá láng giềng xa nhất)
+        stale = active[self.cost[active, j] <= self.kth[active]]
+        self.cost[j, :] = np.inf
+        self.cost[:, j] = np.inf
+        self.slots[j] = None
+        self.free.append(j)
+        self.changed(j, stale)
+        if self.tour is None:
+            self.rebuild()
+            return None if self.tour is None else list(self.tour)
+        return focus
+
+    def instance(self):
+        # Bài toán dùng chung ma trận self.cost (tên là số ô), giữ tới khi ma trận phải mở rộng
+        if self._inst is None:
+            self._inst = TSPInstance(range(self.capacity), self.cost)
+        return self._inst
+
+    def repair(self, focus, control=None):
+        if self.tour is not None and focus and len(self.tour) >= 5:
+            self.tour = improve_ids(self.instance(), self.tour, control=control, focus=focus,
+                                    neighbors=self.near, symmetric=self.asymmetric == 0)
+
+    def update(self, selected_cities, start, control=None):
+        # Áp dụng các thay đổi so với lần trước; trả về (path, cost) như greedy_best_first_search
+        selected = set(selected_cities)
+        removed = [city for city in self.slot_of if city not in selected]
+        added = [city for city in dict.fromkeys(selected_cities) if city not in self.slot_of]
+        self.start = start
+        counters = counters_of(control)
+        for city in removed:
+            self.repair(self.remove(city), control)
+        for city in added:
+            self.repair(self.add(city), control)
+        if self.tour is None:
+            self.rebuild()
+            self.repair(self.tour, control)
+        if counters is not None:
+            counters['added'] += len(added)
+            counters['removed'] += len(removed)
+        return self.route()
+
+    def route(self):
+        if self.tour is None or self.start not in self.slot_of:
+            return None, None
+        s = self.tour.index(self.slot_of[self.start])
+        tour = self.tour[s:] + self.tour[:s]
+        total = self.cost[tour, np.roll(tour, -1)].sum() if len(tour) > 1 else 0.0
+        return [self.slots[i] for i in tour + tour[:1]], round(float(total), 2)
+
+# Bản đồ: với nhiều điểm dừng, các cạnh không đi qua được gộp thành một lớp GeoJSON
+# (bỏ hẳn khi quá nhiều) và marker được gom cụm, thay vì một PolyLine cho mỗi cặp quận.
+MAP_FILE = "Algorithms/tsp_tp_hcm.html"
+FAST_MAP_MIN = 30             # từ số quận này dùng chế độ nhanh (fast=None)
+CLUSTER_MIN = 50              # từ số quận này gom cụm marker
+MAX_BACKGROUND_EDGES = 5000   # quá số cạnh này thì không vẽ các cạnh không đi qua
+
+def draw_map(path, selected_cities, start, fast=None, output=MAP_FILE):
+    # folium chỉ được nạp khi tạo bản đồ
+    import folium
+    from folium.plugins import MarkerCluster
+
+    fast = len(selected_cities) >= FAST_MAP_MIN if fast is None else fast
     m = folium.Map(location=[positions[start][1], positions[start][0]], zoom_start=12)
 
     # Tô màu đỏ cho điểm xuất phát
@@ -110,24 +359,39 @@ def draw_map(path, selected_cities, start):
     ).add_to(m)
 
     # Thêm marker cho các thành phố được chọn
+    layer = MarkerCluster().add_to(m) if fast and len(selected_cities) >= CLUSTER_MIN else m
     for city in selected_cities:
         if city != start:
-            folium.Marker(location=[positions[city][1], positions[city][0]], popup=city).add_to(m)
-
-    # Đường không đi qua (nét đứt)
-    for c1 in selected_cities:
-        for c2 in selected_cities:
-            if c1 != c2 and (c1, c2) not in zip(path, path[1:]) and (c2, c1) not in zip(path, path[1:]):
-                folium.PolyLine(
-                    locations=[
-                        (positions[c1][1], positions[c1][0]),
-                        (positions[c2][1], positions[c2][0])
-                    ],
-                    color='black',
-                    weight=1.5,
-                    dash_array='5, 10',
-                    opacity=2
-                ).add_to(m)
+            folium.Marker(location=[positions[city][1], positions[city][0]], popup=city).add_to(layer)
+
+    # Đường không đi qua (nét đứt): tập cạnh của lộ trình chỉ dựng một lần, mỗi cặp quận xét một lần
+    route = {frozenset(edge) for edge in zip(path, path[1:])}
+    background = [(c1, c2) for i, c1 in enumerate(selected_cities) for c2 in selected_cities[i + 1:]
+                  if frozenset((c1, c2)) not in route]
+    if not fast:
+        for c1, c2 in background:
+            folium.PolyLine(
+                locations=[
+                    (positions[c1][1], positions[c1][0]),
+                    (positions[c2][1], positions[c2][0])
+                ],
+                color='black',
+                weight=1.5,
+                dash_array='5, 10',
+                opacity=2
+            ).add_to(m)
+    elif len(background) <= MAX_BACKGROUND_EDGES:
+        folium.GeoJson(
+            {
+                'type': 'Feature',
+                'properties': {},
+                'geometry': {
+                    'type': 'MultiLineString',
+                    'coordinates': [[list(positions[c1]), list(positions[c2])] for c1, c2 in background],
+                },
+            },
+            style_function=lambda feature: {'color': 'black', 'weight': 1, 'dashArray': '5, 10', 'opacity': 0.5},
+        ).add_to(m)
 
     # Đường đã đi qua (tô xanh dương)
     route_coords = [(positions[city][1], positions[city][0]) for city in path]
@@ -138,8 +402,12 @@ def draw_map(path, selected_cities, start):
         opacity=0.9
     ).add_to(m)
 
-    m.save("Algorithms/tsp_tp_hcm.html")
-    print(">> Đã lưu bản đồ tại: tsp_tp_hcm.html")
+    # Ghi ra file tạm rồi thay thế, để trình duyệt không bao giờ đọc phải file đang ghi dở
+    temp = output + ".tmp"
+    m.save(temp)
+    os.replace(temp, output)
+    print(f">> Đã lưu bản đồ tại: {os.path.basename(output)}")
+    return output
 
 if __name__ == "__main__":
     all_cities = list(positions.keys())
@@ -154,8 +422,8 @@ if __name__ == "__main__":
         if start not in selected_cities:
             print(">> Quận bắt đầu không hợp lệ.")
         else:
-            graph = create_graph(selected_cities)
-            path, cost = greedy_best_first_search(graph, start)
+            instance = create_instance(selected_cities)
+            path, cost = greedy_best_first_search(instance, start)
             if path is None:
                 print(">> Không tìm được đường đi phù hợp.")
             else:
@@ -1,4 +1,8 @@
-import networkx as nx
+import numpy as np
+
+from .Control import counters_of
+from .Instance import as_instance
+from .LowerBound import node_penalties
 
 graph = {
     'A': [['B', 25], ['C', 33], ['D', 19], ['E', 30], ['F', 35]],
@@ -18,34 +22,198 @@ positions = {
     'F': (17, 20),   
 }
 
-cost_map = {}
-for node in graph:
-    cost_map[node] = {}
-    for neighbor, cost in graph[node]:
-        cost_map[node][neighbor] = cost
-
-best_path = None
-best_cost = float('inf')
-
-def backtrack_tsp(current, visited, path, current_cost, start):
-    global best_cost, best_path
-    if len(visited) == len(graph):
-        if start in cost_map[current]:
-            total_cost = current_cost + cost_map[current][start]
-            if total_cost < best_cost:
-                best_cost = total_cost
-                best_path = path + [start]
+instance = as_instance(graph, positions)
+
+TITLE = "Backtracking - Traveling Salesman Problem"
+
+def backtrack_tsp(current, visited, path, current_cost, start, best, control=None, graph=None):
+    # best = {'path': ..., 'cost': ...}: lời giải tốt nhất của lần chạy hiện tại, do người gọi tạo
+    # Hết thời gian hoặc bị hủy: giữ nguyên best['path'] hiện có
+    if control is not None and control.should_stop():
+        return
+    counters = counters_of(control)
+    if counters is not None:
+        counters['expanded'] += 1
+    inst = instance if graph is None else as_instance(graph)
+    cost = inst.cost
+    i = inst.index[current]
+    if len(visited) == inst.n:
+        s = inst.index[start]
+        if inst.adj[i, s]:
+            total_cost = current_cost + cost[i, s]
+            if total_cost < best['cost']:
+                best['cost'] = inst.number(total_cost)
+                best['path'] = path + [start]
+                if control is not None:
+                    control.incumbent(best['path'], best['cost'])
         return
-    
-    for neighbor in graph[current]:
-        city = neighbor[0]
-        cost = neighbor[1]
+
+    for j in inst.neighbors[i]:
+        city = inst.names[j]
         if city not in visited:
-            if current_cost + cost >= best_cost:
+            if current_cost + cost[i, j] >= best['cost']:
+                if counters is not None:
+                    counters['pruned'] += 1
                 continue
-            backtrack_tsp(city, visited | {city}, path + [city], current_cost + cost, start)
+            backtrack_tsp(city, visited | {city}, path + [city], current_cost + cost[i, j], start, best, control,
+                          inst)
+
+def backtracking(graph, start, control=None):
+    # Gọi backtrack_tsp từ đầu và trả về (path, cost) như các thuật toán khác;
+    # trạng thái nằm trong best của riêng lần gọi nên nhiều lần chạy song song không ảnh hưởng nhau
+    best = {'path': None, 'cost': float('inf')}
+    backtrack_tsp(start, {start}, [start], 0, start, best, control, graph)
+    return best['path'], best['cost']
+
+# ==== Branch and Bound ====
+# Cận dưới cho phần đường còn lại (current -> các thành phố chưa đi -> start):
+#   'mst'       : MST trên các thành phố chưa đi + cạnh rẻ nhất nối current và start vào (1-tree),
+#                 trên chi phí đã cộng phạt đỉnh pi (tính một lần ở gốc bằng subgradient)
+#   'reduction' : rút gọn hàng/cột trên ma trận chi phí con. Chỉ để minh họa (cận kiểu Little):
+#                 yếu hơn 'mst' rất nhiều (18 thành phố: hàng chục giây so với vài chục ms), không
+#                 nằm trong BOUNDS nên BranchBoundSolver không nhận; gọi trực tiếp branch_and_bound
+#   'both'      : lấy max của hai cận trên (rút gọn giúp thêm với chi phí có hướng)
+
+BOUNDS = ('mst', 'both')
+TEACHING_BOUNDS = ('reduction',)
+
+def reduction_bound(cost, rows, cols):
+    sub = cost[np.ix_(rows, cols)]
+    row_min = sub.min(axis=1)
+    if not np.all(np.isfinite(row_min)):
+        return np.inf
+    col_min = (sub - row_min[:, None]).min(axis=0)
+    return row_min.sum() + col_min.sum()
+
+def mst_weight(sym, nodes):
+    k = len(nodes)
+    if k <= 1:
+        return 0.0
+    sub = sym[np.ix_(nodes, nodes)]
+    in_tree = np.zeros(k, dtype=bool)
+    in_tree[0] = True
+    dist = sub[0].copy()
+    total = 0.0
+    for _ in range(k - 1):
+        dist[in_tree] = np.inf
+        j = int(np.argmin(dist))
+        total += dist[j]
+        in_tree[j] = True
+        np.minimum(dist, sub[j], out=dist)
+    return total
+
+def branch_and_bound(graph, start, bound='mst', control=None):
+    if bound not in BOUNDS + TEACHING_BOUNDS:
+        raise ValueError(f"Cận dưới không hợp lệ: {bound}")
+    inst = as_instance(graph)
+    n = inst.n
+    s = inst.index[start]
+    cost = inst.cost
+    rows = inst.cost_rows
+    sym = np.minimum(cost, cost.T)
+    symmetric = bool(np.array_equal(cost, cost.T))
+    # Con được thử theo thứ tự chi phí tăng dần (tính sẵn một lần)
+    children = [sorted(inst.neighbors[i].tolist(), key=rows[i].__getitem__) for i in range(n)]
+
+    stats = {'expanded': 0, 'pruned': 0}
+    if n == 1:
+        return [start, start], 0, stats
+    path = [s] + [0] * (n - 1)
+    unvisited = np.ones(n, dtype=bool)
+    unvisited[s] = False
+    best = {'cost': np.inf, 'path': None}
+
+    def improve(path_ids, total_cost):
+        best['cost'] = total_cost
+        best['path'] = path_ids[:]
+        if control is not None:
+            control.incumbent(inst.path_names(path_ids + [s]), inst.number(total_cost), expanded=stats['expanded'])
+
+    # Cận trên ban đầu: láng giềng gần nhất
+    mask, current, total = 1 << s, s, 0.0
+    for depth in range(1, n):
+        nxt = next((j for j in children[current] if not mask >> j & 1), None)
+        if nxt is None:
+            break
+        total += rows[current][nxt]
+        mask |= 1 << nxt
+        path[depth] = current = nxt
+    else:
+        if inst.adj[current, s]:
+            improve(path, total + rows[current][s])
+
+    if bound in ('mst', 'both'):
+        pi = node_penalties(sym, best['cost'])
+        penalized = sym + pi[:, None] + pi[None, :]
+
+    def lower_bound(current):
+        remaining = np.flatnonzero(unvisited)
+        if bound in ('mst', 'both'):
+            # Đường đi Hamilton current -> remaining -> start: đỉnh trong có bậc 2, hai đầu bậc 1
+            lb = (mst_weight(penalized, remaining) + penalized[current, remaining].min()
+                  + penalized[remaining, s].min()
+                  - pi[current] - pi[s] - 2 * pi[remaining].sum())
+        else:
+            lb = 0.0
+        if bound in ('reduction', 'both'):
+            out_rows = np.append(remaining, current)
+            in_cols = np.append(remaining, s)
+            lb = max(lb, reduction_bound(cost, out_rows, in_cols))
+        return lb
+
+    full = (1 << n) - 1
+
+    def mask_has_above(mask, city):
+        # Còn thành phố chưa đi có chỉ số > city hay không
+        return ((full ^ mask) >> (city + 1)) != 0
+
+    def search(current, depth, mask, current_cost):
+        if control is not None and control.should_stop():
+            stats['stopped'] = True
+            return
+        stats['expanded'] += 1
+        if depth == n:
+            if inst.adj[current, s]:
+                total_cost = current_cost + rows[current][s]
+                if total_cost < best['cost']:
+                    improve(path, total_cost)
+            return
+
+        # Phá đối xứng chiều đi: thành phố cuối phải có chỉ số lớn hơn thành phố thứ hai
+        if symmetric and depth > 1 and not mask_has_above(mask, path[1]):
+            stats['pruned'] += 1
+            return
+
+        if depth < n - 1 and current_cost + lower_bound(current) >= best['cost']:
+            stats['pruned'] += 1
+            return
+
+        for j in children[current]:
+            if stats.get('stopped'):
+                return
+            if mask >> j & 1:
+                continue
+            new_cost = current_cost + rows[current][j]
+            if new_cost >= best['cost']:
+                stats['pruned'] += 1
+                continue
+            path[depth] = j
+            unvisited[j] = False
+            search(j, depth + 1, mask | (1 << j), new_cost)
+            unvisited[j] = True
+
+    search(s, 1, 1 << s, 0.0)
+    if counters_of(control) is not None:
+        control.counters.update(stats)
+
+    if best['path'] is None:
+        return None, None, stats
+    return inst.path_names(best['path'] + [s]), inst.number(best['cost']), stats
 
 def draw_path(graph, path, ax):
+    # networkx chỉ cần khi vẽ: nạp lúc dùng để phần giải không phụ thuộc thư viện đồ họa
+    import networkx as nx
+
     G = nx.Graph()
     for node in graph:
         for neighbor, cost in graph[node]:
@@ -64,5 +232,5 @@ def draw_path(graph, path, ax):
     nx.draw_networkx_labels(G, positions, font_size=12, ax=ax)
     nx.draw_networkx_edge_labels(G, positions, edge_labels=edge_labels, ax=ax)
 
-    ax.set_title("Backtracking - Traveling Salesman Problem")
+    ax.set_title(TITLE)
     ax.axis('off')
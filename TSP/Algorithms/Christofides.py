@@ -0,0 +1,201 @@
+import numpy as np
+
+from .Control import counters_of
+from .Instance import as_instance
+
+# Dựng chu trình từ cây khung nhỏ nhất (MST), có bảo đảm chất lượng khi chi phí thỏa bất đẳng thức tam giác:
+#   double_tree : duyệt cây theo thứ tự trước (mỗi cạnh cây đi hai lần rồi đi tắt) -> <= 2 x tối ưu
+#   christofides: cây + ghép cặp nhỏ nhất trên các đỉnh bậc lẻ -> chu trình Euler -> đi tắt
+#                 -> <= 1.5 x tối ưu khi ghép cặp chính xác
+# MST dựng bằng Prim O(n^2) trên NumPy, mỗi bước lấy một hàng chi phí (TSPInstance.sym_row), nên
+# bài toán theo tọa độ không cần ma trận n x n. Chi phí có hướng được lấy min hai chiều khi dựng
+# cây; chu trình cuối được tính theo chi phí thật, chọn chiều đi rẻ hơn.
+# Ghép cặp:
+#   'exact' : min_weight_matching của networkx (blossom, O(k^3), nạp khi dùng)
+#   'greedy': ghép các cặp rẻ nhất trước trên GREEDY_CANDIDATES láng giềng gần nhất của mỗi đỉnh
+#   'auto'  : exact tới EXACT_MATCHING_MAX đỉnh lẻ (và khi có networkx), lớn hơn thì greedy
+
+EXACT_MATCHING_MAX = 120
+GREEDY_CANDIDATES = 10
+
+
+def prim(inst, root, control=None):
+    # -> (parent, weight): parent[root] = -1; (None, inf) nếu đồ thị không liên thông
+    n = inst.n
+    parent = np.full(n, root, dtype=np.intp)
+    parent[root] = -1
+    in_tree = np.zeros(n, dtype=bool)
+    in_tree[root] = True
+    dist = inst.sym_row(root).copy()
+    dist[root] = np.inf
+    weight = 0.0
+    for step in range(n - 1):
+        if control is not None and step % 256 == 0:
+            control.check()
+            control.progress(step / n)
+        j = int(np.argmin(dist))
+        if not np.isfinite(dist[j]):
+            return None, np.inf
+        weight += dist[j]
+        in_tree[j] = True
+        dist[j] = np.inf
+        row = inst.sym_row(j)
+        closer = row < dist
+        closer &= ~in_tree
+        dist[closer] = row[closer]
+        parent[closer] = j
+    return parent, weight
+
+
+def children_of(parent):
+    # Danh sách con của mỗi đỉnh, theo thứ tự chỉ số
+    children = [[] for _ in range(len(parent))]
+    for child, p in enumerate(parent.tolist()):
+        if p >= 0:
+            children[p].append(child)
+    return children
+
+
+def preorder(children, root):
+    order = []
+    stack = [root]
+    while stack:
+        u = stack.pop()
+        order.append(u)
+        stack.extend(reversed(children[u]))
+    return order
+
+
+def greedy_matching(w):
+    # Ghép cặp hoàn hảo trên ma trận đối xứng w (k chẵn, đường chéo inf): các cạnh ứng viên
+    # (GREEDY_CANDIDATES láng giềng gần nhất mỗi đỉnh) xét theo chi phí tăng dần; đỉnh còn sót
+    # được ghép với đỉnh chưa ghép gần nhất
+    k = len(w)
+    mate = [-1] * k
+    if k == 0:
+        return []
+    near = min(k - 1, GREEDY_CANDIDATES)
+    cols = np.argpartition(w, near - 1, axis=1)[:, :near].ravel()
+    rows = np.repeat(np.arange(k), near)
+    order = np.argsort(w[rows, cols], kind='stable')
+    for a, b in zip(rows[order].tolist(), cols[order].tolist()):
+        if mate[a] < 0 and mate[b] < 0:
+            mate[a], mate[b] = b, a
+    rest = [i for i in range(k) if mate[i] < 0]
+    while rest:
+        a, others = rest[0], np.array(rest[1:])
+        b = int(others[np.argmin(w[a, others])])
+        mate[a], mate[b] = b, a
+        rest = [i for i in rest if i != a and i != b]
+    return [(a, b) for a, b in enumerate(mate) if a < b]
+
+
+def exact_matching(w):
+    import networkx as nx   # chỉ nạp khi cần ghép cặp chính xác
+
+    k = len(w)
+    rows, cols = np.triu_indices(k, 1)
+    finite = np.isfinite(w[rows, cols])
+    g = nx.Graph()
+    g.add_weighted_edges_from(zip(rows[finite].tolist(), cols[finite].tolist(), w[rows, cols][finite].tolist()))
+    pairs = [tuple(sorted(pair)) for pair in nx.min_weight_matching(g)]
+    if 2 * len(pairs) != k:
+        # Thiếu cạnh giữa các đỉnh lẻ: không có ghép cặp hoàn hảo
+        return greedy_matching(w)
+    return pairs
+
+
+def match_odd(inst, odd, matching='auto'):
+    # -> (các cặp đỉnh theo chỉ số thành phố, cách ghép đã dùng)
+    w = np.array([inst.sym_row(i)[odd] for i in odd.tolist()]).reshape(len(odd), len(odd))
+    if matching == 'auto':
+        matching = 'exact' if len(odd) <= EXACT_MATCHING_MAX else 'greedy'
+    if matching == 'exact':
+        try:
+            pairs = exact_matching(w)
+        except ImportError:
+            matching = 'greedy'
+    if matching == 'greedy':
+        pairs = greedy_matching(w)
+    elif matching != 'exact':
+        raise ValueError(f"Cách ghép cặp không hợp lệ: {matching}")
+    return [(int(odd[a]), int(odd[b])) for a, b in pairs], matching
+
+
+def euler_circuit(n, edges, root):
+    # Hierholzer trên đa đồ thị vô hướng (các cạnh có thể trùng nhau)
+    adjacent = [[] for _ in range(n)]
+    for e, (a, b) in enumerate(edges):
+        adjacent[a].append((b, e))
+        adjacent[b].append((a, e))
+    used = [False] * len(edges)
+    circuit = []
+    stack = [root]
+    while stack:
+        u = stack[-1]
+        edges_u = adjacent[u]
+        while edges_u and used[edges_u[-1][1]]:
+            edges_u.pop()
+        if edges_u:
+            v, e = edges_u.pop()
+            used[e] = True
+            stack.append(v)
+        else:
+            circuit.append(stack.pop())
+    return circuit
+
+
+def shortcut(walk):
+    # Bỏ các đỉnh đã đi qua (đi tắt): chu trình Hamilton theo thứ tự xuất hiện đầu tiên
+    return list(dict.fromkeys(walk))
+
+
+def close_tour(inst, ids, counters=None):
+    # Chọn chiều đi rẻ hơn (chi phí có hướng), trả về (path đóng, cost) hoặc (None, None)
+    # khi thiếu cạnh đi tắt trên đồ thị không đầy đủ
+    forward = inst.tour_cost(ids)
+    back = [ids[0]] + ids[:0:-1]
+    backward = inst.tour_cost(back)
+    if backward < forward:
+        ids, forward = back, backward
+    if not np.isfinite(forward):
+        if counters is not None:
+            counters['dead_ends'] += 1
+        return None, None
+    return inst.path_names(ids + ids[:1]), forward
+
+
+def double_tree(graph, start, control=None):
+    # -> (path, cost, stats)
+    inst = as_instance(graph)
+    s = inst.index[start]
+    counters = counters_of(control)
+    parent, weight = prim(inst, s, control)
+    if parent is None:
+        if counters is not None:
+            counters['dead_ends'] += 1
+        return None, None, None
+    path, cost = close_tour(inst, preorder(children_of(parent), s), counters)
+    return path, cost, {'mst': inst.number(weight)}
+
+
+def christofides(graph, start, matching='auto', control=None):
+    # -> (path, cost, stats); stats: trọng số MST, số đỉnh lẻ, cách ghép cặp đã dùng
+    inst = as_instance(graph)
+    s = inst.index[start]
+    counters = counters_of(control)
+    parent, weight = prim(inst, s, control)
+    if parent is None:
+        if counters is not None:
+            counters['dead_ends'] += 1
+        return None, None, None
+    edges = [(int(p), child) for child, p in enumerate(parent.tolist()) if p >= 0]
+    degree = np.bincount(np.array(edges, dtype=np.intp).ravel(), minlength=inst.n)
+    odd = np.flatnonzero(degree % 2)
+    if control is not None:
+        control.check()
+    pairs, matching = match_odd(inst, odd, matching)
+    if counters is not None:
+        counters['matched_pairs'] += len(pairs)
+    path, cost = close_tour(inst, shortcut(euler_circuit(inst.n, edges + pairs, s)), counters)
+    return path, cost, {'mst': inst.number(weight), 'odd': int(odd.size), 'matching': matching}
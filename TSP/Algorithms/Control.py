@@ -0,0 +1,152 @@
+import queue
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+# Điều khiển một lần chạy từ bên ngoài (GUI, benchmark): hủy, giới hạn thời gian, báo tiến độ.
+# Thuật toán có lời giải tạm thời (GA, Backtracking, Branch and Bound, LocalSearch) dừng sớm
+# và trả về lời giải tốt nhất khi should_stop(); các thuật toán khác gọi check() để ném Cancelled.
+# instrument=True bật bộ đếm công việc (control.counters); khi tắt, counters là None và
+# thuật toán chỉ tốn một phép so sánh với None ở mỗi điểm đếm.
+# Thuật toán có lời giải tạm thời báo mỗi lần tìm được chu trình tốt hơn qua incumbent();
+# iterate() biến bất kỳ thuật toán nào thành iterator trả về các lời giải đó (anytime).
+# gap (%): khi đã biết cận dưới (set_lower_bound) và có lời giải tạm thời cách cận dưới không quá
+# gap%, lời giải đã đủ gần tối ưu: should_stop() trả về True như khi hết thời gian.
+
+class Cancelled(Exception):
+    pass
+
+
+class SearchLimit(Exception):
+    # Thuật toán vượt giới hạn công việc do chính nó được giao (vd. max_nodes của GBFS quay lui):
+    # bỏ cuộc trên bài toán này, khác với Cancelled (người dùng hủy hoặc hết thời gian)
+    pass
+
+
+class RunControl:
+    def __init__(self, time_budget=None, on_progress=None, instrument=False, on_incumbent=None, gap=None):
+        self.time_budget = time_budget
+        self.gap = gap
+        self.lower_bound = None
+        self.gap_reached = False
+        self.on_progress = on_progress
+        self.on_incumbent = on_incumbent
+        self.counters = Counter() if instrument else None
+        self.best = None
+        self.fraction = 0.0
+        self._cancel = threading.Event()
+        self._last_progress = -1.0
+        self.start()
+
+    def start(self):
+        # Bắt đầu tính giới hạn thời gian từ lúc gọi (ví dụ khi job rời hàng đợi)
+        self.started = time.monotonic()
+        self.deadline = None if not self.time_budget else self.started + self.time_budget
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def should_stop(self):
+        if self._cancel.is_set() or self.gap_reached:
+            return True
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def check(self):
+        if self.should_stop():
+            raise Cancelled("Đã dừng thuật toán (hủy hoặc hết thời gian).")
+
+    def progress(self, fraction):
+        # Chỉ báo khi tiến độ tăng ít nhất 1% để không làm ngập hàng đợi sự kiện của GUI
+        fraction = min(max(fraction, 0.0), 1.0)
+        self.fraction = fraction
+        if self.on_progress is not None and fraction - self._last_progress >= 0.01:
+            self._last_progress = fraction
+            self.on_progress(fraction)
+
+    def set_lower_bound(self, bound):
+        self.lower_bound = bound
+        if self.best is not None:
+            self.within_gap(self.best[1])
+
+    def within_gap(self, cost):
+        # Chi phí cost cách cận dưới không quá gap%: đánh dấu để thuật toán dừng sớm
+        if self.gap is not None and self.lower_bound is not None and cost is not None \
+                and cost <= self.lower_bound * (1 + self.gap / 100):
+            self.gap_reached = True
+        return self.gap_reached
+
+    def incumbent(self, path, cost, **metrics):
+        # Lời giải tạm thời tốt hơn (chu trình theo tên thành phố); metrics: thế hệ, số nút...
+        self.best = (path, cost)
+        self.within_gap(cost)
+        if self.counters is not None:
+            self.counters['incumbents'] += 1
+        if self.on_incumbent is not None:
+            metrics['progress'] = self.fraction
+            metrics['elapsed'] = time.monotonic() - self.started
+            self.on_incumbent(path, cost, metrics)
+
+    @contextmanager
+    def section(self, name):
+        # Đo thời gian một giai đoạn (giải, vẽ, render...) vào counters['time_<name>_ms']
+        if self.counters is None:
+            yield
+            return
+        t0 = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.counters[f'time_{name}_ms'] += (time.perf_counter_ns() - t0) / 1e6
+
+
+def counters_of(control):
+    return None if control is None else control.counters
+
+
+def iterate(solve, *args, time_budget=None, **kwargs):
+    # Chạy solve(*args, control=..., **kwargs) trên luồng riêng và lần lượt trả về
+    # (path, cost, metrics) mỗi khi có lời giải tốt hơn; phần tử cuối là kết quả của solve
+    # (metrics['final'] = True, metrics['result'] = nguyên giá trị solve trả về: Result của
+    # Solver.solve hoặc (path, cost[, stats]); kèm metrics['stats'] / metrics['trace'] nếu có).
+    # Dừng vòng lặp sớm (break) sẽ hủy thuật toán.
+    items = queue.Queue()
+    control = RunControl(time_budget,
+                         on_incumbent=lambda path, cost, metrics: items.put(('incumbent', (path, cost, metrics))))
+
+    def run():
+        try:
+            items.put(('done', solve(*args, control=control, **kwargs)))
+        except Exception as e:
+            items.put(('failed', e))
+
+    worker = threading.Thread(target=run, daemon=True)
+    worker.start()
+    try:
+        while True:
+            kind, item = items.get()
+            if kind == 'incumbent':
+                yield item
+            elif kind == 'done':
+                path, cost, *rest = item
+                metrics = {'progress': 1.0, 'elapsed': time.monotonic() - control.started, 'final': True,
+                           'result': item}
+                stats = getattr(item, 'stats', rest[0] if rest else None)
+                if stats is not None:
+                    metrics['stats'] = stats
+                if getattr(item, 'trace', None) is not None:
+                    metrics['trace'] = item.trace
+                yield path, cost, metrics
+                return
+            elif isinstance(item, Cancelled) and control.best is not None:
+                # Hết thời gian sau khi đã có lời giải tạm thời: lời giải cuối đã được trả về
+                return
+            else:
+                raise item
+    finally:
+        control.cancel()
+        worker.join()
@@ -0,0 +1,193 @@
+import json
+import math
+import os
+import sqlite3
+import sys
+import threading
+from contextlib import closing
+
+import numpy as np
+
+# Nguồn khoảng cách đường đi thực tế cho BTTT. Mọi nguồn trả lời truy vấn theo lô
+# nhiều-nhiều: matrix(sources, targets) -> mảng len(sources) x len(targets) (km),
+# inf nếu không biết đường đi giữa hai điểm.
+#   TableProvider     : bảng cặp (a, b) -> km nhập tay (mặc định, BTTT.real_distances)
+#   MatrixFileProvider: ma trận lưu file .npz (nén) hoặc thư mục names.json + matrix.npy (memory-map)
+#   HttpProvider      : dịch vụ định tuyến kiểu OSRM /table (có máy chủ thay thế cục bộ bên dưới)
+#   CachedProvider    : bọc một nguồn bất kỳ, lưu mọi cặp đã hỏi vào SQLite trên đĩa;
+#                       lần sau chỉ hỏi nguồn gốc các cặp còn thiếu, trong một lô duy nhất.
+
+
+class DistanceProvider:
+    def matrix(self, sources, targets):
+        raise NotImplementedError
+
+
+class TableProvider(DistanceProvider):
+    def __init__(self, table, symmetric=True):
+        self.table = dict(table)
+        if symmetric:
+            for (a, b), km in table.items():
+                self.table.setdefault((b, a), km)
+
+    def matrix(self, sources, targets):
+        return np.array([[self.table.get((a, b), np.inf) for b in targets] for a in sources],
+                        dtype=np.float64).reshape(len(sources), len(targets))
+
+
+class MatrixFileProvider(DistanceProvider):
+    def __init__(self, path):
+        if path.lower().endswith('.npz'):
+            with np.load(path) as data:
+                names = data['names'].tolist()
+                self.distances = data['matrix']
+        else:
+            with open(os.path.join(path, 'names.json'), encoding='utf-8') as f:
+                names = json.load(f)
+            self.distances = np.load(os.path.join(path, 'matrix.npy'), mmap_mode='r')
+        self.index = {name: i for i, name in enumerate(names)}
+
+    def ids(self, names):
+        # Điểm không có trong file: -1, cho ra inf
+        return np.array([self.index.get(name, -1) for name in names], dtype=np.intp)
+
+    def matrix(self, sources, targets):
+        rows, cols = self.ids(sources), self.ids(targets)
+        result = np.asarray(self.distances[np.ix_(np.maximum(rows, 0), np.maximum(cols, 0))], dtype=np.float64)
+        result[rows < 0, :] = np.inf
+        result[:, cols < 0] = np.inf
+        return result
+
+    @staticmethod
+    def save(path, names, distances):
+        distances = np.asarray(distances, dtype=np.float64)
+        if path.lower().endswith('.npz'):
+            np.savez_compressed(path, names=np.array(names), matrix=distances)
+            return
+        os.makedirs(path, exist_ok=True)
+        with open(os.path.join(path, 'names.json'), 'w', encoding='utf-8') as f:
+            json.dump(list(names), f, ensure_ascii=False)
+        np.save(os.path.join(path, 'matrix.npy'), distances)
+
+
+class HttpProvider(DistanceProvider):
+    # Gọi API dạng OSRM: GET {url}/table/v1/driving/lon,lat;...?sources=..&destinations=..&annotations=distance
+    # (khoảng cách trả về theo mét). Mỗi lô là một yêu cầu duy nhất.
+    def __init__(self, url, positions, timeout=10.0, profile='driving'):
+        self.url = url.rstrip('/')
+        self.positions = positions
+        self.timeout = timeout
+        self.profile = profile
+        self.requests = 0
+
+    def matrix(self, sources, targets):
+        import urllib.request   # thư viện mạng chỉ nạp khi thật sự gọi dịch vụ
+
+        points = list(dict.fromkeys(list(sources) + list(targets)))
+        slot = {name: i for i, name in enumerate(points)}
+        coords = ';'.join(f"{self.positions[p][0]},{self.positions[p][1]}" for p in points)
+        query = (f"sources={';'.join(str(slot[a]) for a in sources)}"
+                 f"&destinations={';'.join(str(slot[b]) for b in targets)}&annotations=distance")
+        with urllib.request.urlopen(f"{self.url}/table/v1/{self.profile}/{coords}?{query}",
+                                    timeout=self.timeout) as response:
+            body = json.load(response)
+        self.requests += 1
+        if body.get('code') != 'Ok':
+            raise RuntimeError(f"Dịch vụ định tuyến trả lỗi: {body.get('message', body.get('code'))}")
+        meters = np.array([[np.inf if d is None else d for d in row] for row in body['distances']],
+                          dtype=np.float64).reshape(len(sources), len(targets))
+        return meters / 1000.0
+
+
+class CachedProvider(DistanceProvider):
+    def __init__(self, provider, path, source=''):
+        # source: tên nguồn gốc, để nhiều nguồn dùng chung một file đệm mà không lẫn dữ liệu
+        self.provider = provider
+        self.path = path
+        self.source = source
+        self.fetched = 0   # số cặp đã phải hỏi nguồn gốc
+        self.lock = threading.Lock()
+        with closing(self.connect()) as db, db:
+            db.execute("CREATE TABLE IF NOT EXISTS pairs "
+                       "(source TEXT, a TEXT, b TEXT, km REAL, PRIMARY KEY (source, a, b))")
+
+    def connect(self):
+        return sqlite3.connect(self.path)
+
+    def matrix(self, sources, targets):
+        sources, targets = list(sources), list(targets)
+        row = {name: i for i, name in enumerate(sources)}
+        col = {name: j for j, name in enumerate(targets)}
+        result = np.full((len(sources), len(targets)), np.nan)
+        with self.lock, closing(self.connect()) as db, db:
+            db.execute("CREATE TEMP TABLE ask_a (name TEXT)")
+            db.execute("CREATE TEMP TABLE ask_b (name TEXT)")
+            db.executemany("INSERT INTO ask_a VALUES (?)", [(a,) for a in row])
+            db.executemany("INSERT INTO ask_b VALUES (?)", [(b,) for b in col])
+            known = db.execute("SELECT a, b, km FROM pairs WHERE source = ? AND a IN (SELECT name FROM ask_a) "
+                               "AND b IN (SELECT name FROM ask_b)", (self.source,))
+            for a, b, km in known:
+                result[row[a], col[b]] = np.inf if km is None else km
+
+            # Chỉ hỏi nguồn gốc các hàng / cột còn thiếu, trong một lô
+            missing = np.isnan(result)
+            rows = np.flatnonzero(missing.any(axis=1))
+            cols = np.flatnonzero(missing.any(axis=0))
+            if rows.size:
+                fetched = self.provider.matrix([sources[i] for i in rows], [targets[j] for j in cols])
+                result[np.ix_(rows, cols)] = np.where(missing[np.ix_(rows, cols)], fetched,
+                                                      result[np.ix_(rows, cols)])
+                db.executemany("INSERT OR REPLACE INTO pairs VALUES (?, ?, ?, ?)",
+                               [(self.source, sources[i], targets[j], None if math.isinf(km) else float(km))
+                                for i, line in zip(rows, fetched.tolist())
+                                for j, km in zip(cols, line)])
+                self.fetched += int(missing.sum())
+        return result
+
+
+# ==== Máy chủ thay thế cục bộ cho dịch vụ định tuyến (API /table kiểu OSRM) ====
+# Khoảng cách đường đi được ước lượng bằng haversine nhân hệ số đường vòng.
+
+def serve_table(host='127.0.0.1', port=5000, detour=1.3):
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import parse_qs, urlsplit
+
+    def haversine_m(p, q):
+        lon1, lat1, lon2, lat2 = map(math.radians, (p[0], p[1], q[0], q[1]))
+        a = math.sin((lat2 - lat1) / 2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2)**2
+        return 2 * 6371000.0 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+    class TableHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlsplit(self.path)
+            parts = url.path.strip('/').split('/')
+            if len(parts) != 4 or parts[0] != 'table':
+                return self.reply(400, {'code': 'InvalidUrl', 'message': url.path})
+            points = [tuple(map(float, p.split(','))) for p in parts[3].split(';')]
+            query = parse_qs(url.query)
+            sources = [int(i) for i in query.get('sources', ['all'])[0].split(';')] \
+                if query.get('sources', ['all'])[0] != 'all' else range(len(points))
+            targets = [int(i) for i in query.get('destinations', ['all'])[0].split(';')] \
+                if query.get('destinations', ['all'])[0] != 'all' else range(len(points))
+            distances = [[round(haversine_m(points[i], points[j]) * detour, 1) for j in targets] for i in sources]
+            self.reply(200, {'code': 'Ok', 'distances': distances})
+
+        def reply(self, status, body):
+            data = json.dumps(body).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    return ThreadingHTTPServer((host, port), TableHandler)
+
+
+if __name__ == "__main__":
+    # python -m Algorithms.Distances [cổng]
+    server = serve_table(port=int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
+    print(f">> Máy chủ định tuyến cục bộ: http://{server.server_address[0]}:{server.server_address[1]}")
+    server.serve_forever()
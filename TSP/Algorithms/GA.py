@@ -1,5 +1,12 @@
+import os
 import random
-import networkx as nx
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .Control import counters_of
+from .Instance import as_instance
 
 graph = {
     'A': [['B', 25], ['C', 33], ['D', 19], ['E', 30], ['F', 35]],
@@ -19,41 +26,131 @@ positions = {
     'F': (17, 20),   
 }
 
-cost_map = {node: {neighbor: cost for neighbor, cost in edges} for node, edges in graph.items()}
-cities = list(graph.keys())
+instance = as_instance(graph, positions)
+cities = instance.names
+
+TITLE = "Genetic Algorithm - Traveling Salesman Problem"
+
+# Số thế hệ không cố định: GA dừng khi hết ngân sách (thời gian, số lần đánh giá, số thế hệ nếu có)
+# hoặc khi hội tụ - STALL thế hệ liền không cải thiện quá STALL_TOLERANCE, hoặc quần thể mất đa dạng
+# mà không thể mở rộng thêm. Nhờ vậy bài toán 6 thành phố dừng sau vài chục thế hệ, bài toán lớn
+# chạy lâu hơn.
+# Thích nghi (engine NumPy): tỉ lệ đột biến tăng khi độ đa dạng (tỉ lệ chi phí khác nhau trong quần thể)
+# thấp và giảm dần về mức gốc khi quần thể đa dạng trở lại; khi mất đa dạng, quần thể được nhân đôi
+# bằng cá thể ngẫu nhiên mới (tới MAX_POPULATION_FACTOR lần cỡ ban đầu).
+
+POPULATION_MIN, POPULATION_MAX = 20, 200
+MAX_POPULATION_FACTOR = 4
+STALL_MIN, STALL_MAX = 30, 200
+STALL_TOLERANCE = 1e-3     # cải thiện tương đối nhỏ hơn mức này không được tính
+DIVERSITY_LOW = 0.3        # dưới mức này: tăng đột biến
+DIVERSITY_MIN = 0.05       # dưới mức này: quần thể coi như đã hội tụ
+MUTATION_MAX = 0.1
+
+
+def population_size(n):
+    return int(np.clip(2 * n, POPULATION_MIN, POPULATION_MAX))
+
+def stall_limit(n):
+    return int(np.clip(2 * n, STALL_MIN, STALL_MAX))
+
+
+class Convergence:
+    # Theo dõi một lần chạy GA: ngân sách, số thế hệ không cải thiện, đường hội tụ (trace: chi phí
+    # tốt nhất sau mỗi thế hệ); reason cho biết vì sao dừng
+    def __init__(self, n, generations=None, time_budget=None, max_evaluations=None, stall=None):
+        self.generations = generations
+        self.time_budget = time_budget
+        self.max_evaluations = max_evaluations
+        self.stall = stall_limit(n) if stall is None else stall
+        self.started = time.monotonic()
+        self.generation = 0
+        self.evaluations = 0
+        self.best_generation = 0
+        self.best = np.inf           # chi phí ở lần cải thiện đáng kể gần nhất
+        self.trace = []
+        self.reason = None
+
+    def record(self, evaluations, best_cost, generations=1):
+        self.generation += generations
+        self.evaluations += evaluations
+        if np.isfinite(best_cost) and (not np.isfinite(self.best) or best_cost < self.best * (1 - STALL_TOLERANCE)):
+            self.best = best_cost
+            self.best_generation = self.generation
+
+    def elapsed(self):
+        return time.monotonic() - self.started
 
-def total_cost(path):
+    def stop(self):
+        # -> lý do dừng ('generations', 'evaluations', 'time', 'stall') hoặc None
+        if self.generations is not None and self.generation >= self.generations:
+            self.reason = 'generations'
+        elif self.max_evaluations is not None and self.evaluations >= self.max_evaluations:
+            self.reason = 'evaluations'
+        elif self.time_budget is not None and self.elapsed() >= self.time_budget:
+            self.reason = 'time'
+        elif self.stall and self.generation - self.best_generation >= self.stall:
+            self.reason = 'stall'
+        return self.reason
+
+    def fraction(self):
+        # Tiến độ ước lượng: gần nhất trong các giới hạn
+        parts = [(self.generation - self.best_generation) / self.stall if self.stall else 0.0]
+        if self.generations:
+            parts.append(self.generation / self.generations)
+        if self.max_evaluations:
+            parts.append(self.evaluations / self.max_evaluations)
+        if self.time_budget:
+            parts.append(self.elapsed() / self.time_budget)
+        return min(1.0, max(parts))
+
+    def stats(self, inst, population=None, mutation_rate=None):
+        stats = {'generations': self.generation, 'evaluations': self.evaluations,
+                 'best_generation': self.best_generation, 'stop': self.reason}
+        if population is not None:
+            stats['population'] = population
+        if mutation_rate is not None:
+            stats['mutation_rate'] = round(float(mutation_rate), 4)
+        stats['trace'] = [inst.number(c) if np.isfinite(c) else None for c in self.trace]
+        return stats
+
+# Engine danh sách: mọi hàm nhận rng = random.Random(seed) riêng của lần chạy (không dùng trạng thái
+# toàn cục của module random) và bài toán inst (mặc định là đồ thị mẫu)
+
+def total_cost(path, inst=None):
+    inst = instance if inst is None else inst
+    rows, index = inst.cost_rows, inst.index
     cost = 0
     for i in range(len(path) - 1):
-        cost += cost_map[path[i]][path[i+1]]
-    cost += cost_map[path[-1]][path[0]]
-    return cost
+        cost += rows[index[path[i]]][index[path[i+1]]]
+    cost += rows[index[path[-1]]][index[path[0]]]
+    return inst.number(cost)
 
-def init_population(pop_size, start_city):
+def init_population(rng, pop_size, start_city, inst=None):
     population = []
-    other_cities = [c for c in cities if c != start_city]
+    other_cities = [c for c in (cities if inst is None else inst.names) if c != start_city]
     for _ in range(pop_size):
         individual = other_cities[:]
-        random.shuffle(individual)
+        rng.shuffle(individual)
         individual = [start_city] + individual
         population.append(individual)
     return population
 
-def fitness(individual):
-    return 1 / total_cost(individual)
+def fitness(individual, inst=None):
+    return 1 / total_cost(individual, inst)
 
-def selection(population, fitnesses):
+def selection(rng, population, fitnesses):
     total_fit = sum(fitnesses)
-    pick = random.uniform(0, total_fit)
+    pick = rng.uniform(0, total_fit)
     current = 0
     for individual, fit in zip(population, fitnesses):
         current += fit
         if current > pick:
             return individual
 
-def crossover(parent1, parent2, start_city):
+def crossover(rng, parent1, parent2, start_city):
     size = len(parent1)
-    start, end = sorted(random.sample(range(1, size), 2)) 
+    start, end = sorted(rng.sample(range(1, size), 2))
     child = [None]*size
     child[0] = start_city
     child[start:end+1] = parent1[start:end+1]
@@ -65,35 +162,305 @@ def crossover(parent1, parent2, start_city):
             child[i] = parent2[p2_idx]
     return child
 
-def mutate(individual, mutation_rate):
+def mutate(rng, individual, mutation_rate):
     for i in range(1, len(individual)):
-        if random.random() < mutation_rate:
-            j = random.randint(1, len(individual)-1)
+        if rng.random() < mutation_rate:
+            j = rng.randint(1, len(individual)-1)
             individual[i], individual[j] = individual[j], individual[i]
 
-def genetic_algorithm(start_city, pop_size=100, generations=500, mutation_rate=0.02):
-    population = init_population(pop_size, start_city)
+def genetic_algorithm(start_city, pop_size=None, generations=None, mutation_rate=0.02,
+                      engine='numpy', graph=None, seed=None, control=None, time_budget=None,
+                      max_evaluations=None, stall=None):
+    # -> (path, cost, stats); stats gồm số thế hệ / lần đánh giá, lý do dừng và đường hội tụ (trace).
+    # pop_size None: theo số thành phố; generations None: chạy tới khi hội tụ hoặc hết ngân sách.
+    # Engine 'list' (bản gốc, thuần Python) chỉ dùng ngân sách và điều kiện không cải thiện, không thích nghi.
+    inst = instance if graph is None else as_instance(graph)
+    pop_size = population_size(inst.n) if pop_size is None else pop_size
+    convergence = Convergence(inst.n, generations, time_budget, max_evaluations, stall)
+    if engine == 'numpy':
+        return genetic_algorithm_np(inst, start_city, pop_size, mutation_rate, seed, control, convergence)
+
+    rng = random.Random(seed)
+    population = init_population(rng, pop_size, start_city, inst)
     best_individual = None
     best_cost = float('inf')
+    reported = best_cost
 
-    for gen in range(generations):
-        fitnesses = [fitness(ind) for ind in population]
+    counters = counters_of(control)
+    while not convergence.stop():
+        if control is not None:
+            if control.should_stop():
+                break
+            control.progress(convergence.fraction())
+        if counters is not None:
+            counters['generations'] += 1
+            counters['evaluations'] += 2 * pop_size
+        fitnesses = [fitness(ind, inst) for ind in population]
         new_population = []
         for _ in range(pop_size):
-            p1 = selection(population, fitnesses)
-            p2 = selection(population, fitnesses)
-            child = crossover(p1, p2, start_city)
-            mutate(child, mutation_rate)
+            p1 = selection(rng, population, fitnesses)
+            p2 = selection(rng, population, fitnesses)
+            child = crossover(rng, p1, p2, start_city)
+            mutate(rng, child, mutation_rate)
             new_population.append(child)
         population = new_population
         for ind in population:
-            c = total_cost(ind)
+            c = total_cost(ind, inst)
             if c < best_cost:
                 best_cost = c
                 best_individual = ind[:]
-    return best_individual, best_cost
+                if counters is not None:
+                    counters['improvements'] += 1
+        convergence.record(2 * pop_size, best_cost)
+        convergence.trace.append(best_cost)
+        if control is not None and best_individual is not None and best_cost < reported:
+            reported = best_cost
+            control.incumbent(best_individual, best_cost, generation=convergence.generation)
+    return best_individual, best_cost, convergence.stats(inst, pop_size, mutation_rate)
+
+# ==== Engine NumPy: quần thể là mảng (pop_size x n) chỉ số thành phố ====
+# Cột 0 luôn là thành phố xuất phát.
+
+def init_population_np(rng, pop_size, n, s):
+    others = np.array([i for i in range(n) if i != s], dtype=np.intp)
+    keys = rng.random((pop_size, n - 1))
+    population = np.empty((pop_size, n), dtype=np.intp)
+    population[:, 0] = s
+    population[:, 1:] = others[np.argsort(keys, axis=1)]
+    return population
+
+def population_costs(cost, population):
+    # Một phép gather cho toàn bộ quần thể, kể cả cạnh quay về
+    successor = np.roll(np.arange(population.shape[1]), -1)
+    return cost[population, population[:, successor]].sum(axis=1)
+
+def selection_np(rng, costs, k):
+    fitnesses = np.where(np.isfinite(costs), 1.0 / costs, 0.0)
+    cumulative = np.cumsum(fitnesses)
+    if cumulative[-1] <= 0:
+        return rng.integers(0, len(costs), k)
+    picks = rng.random(k) * cumulative[-1]
+    return np.minimum(np.searchsorted(cumulative, picks, side='right'), len(costs) - 1)
+
+def crossover_np(rng, parent1, parent2):
+    # Lai ghép thứ tự (như crossover): giữ đoạn [a, b] của cha, phần còn lại theo thứ tự của mẹ
+    pop_size, n = parent1.shape
+    rows = np.arange(pop_size)[:, None]
+    cols = np.arange(n)[None, :]
+    ends = np.sort(np.stack([rng.integers(1, n, pop_size), rng.integers(1, n, pop_size)]), axis=0)
+    segment = (cols >= ends[0][:, None]) & (cols <= ends[1][:, None])
+    segment[:, 0] = True
+
+    taken = np.zeros((pop_size, n), dtype=bool)
+    taken[np.broadcast_to(rows, (pop_size, n))[segment], parent1[segment]] = True
+    keep = ~taken[rows, parent2]
+
+    child = np.where(segment, parent1, 0)
+    child[~segment] = parent2[keep]
+    return child
+
+def mutate_np(rng, population, mutation_rate):
+    pop_size, n = population.shape
+    hits = rng.random((pop_size, n)) < mutation_rate
+    hits[:, 0] = False
+    rows, cols = np.nonzero(hits)
+    if len(rows) == 0:
+        return
+    # Các phép hoán đổi trong cùng một cá thể phải làm tuần tự: chia thành từng lượt,
+    # mỗi lượt mỗi cá thể đổi tối đa một vị trí (theo thứ tự cột như mutate)
+    first = np.searchsorted(rows, rows)
+    rank = np.arange(len(rows)) - first
+    targets = rng.integers(1, n, len(rows))
+    for r in range(rank.max() + 1):
+        pick = rank == r
+        i, j, k = rows[pick], cols[pick], targets[pick]
+        population[i, j], population[i, k] = population[i, k], population[i, j]
+
+def immigrants(rng, population, k):
+    # k cá thể ngẫu nhiên mới, cùng thành phố xuất phát với quần thể
+    others = population[0, 1:]
+    fresh = np.empty((k, population.shape[1]), dtype=population.dtype)
+    fresh[:, 0] = population[0, 0]
+    fresh[:, 1:] = others[np.argsort(rng.random((k, len(others))), axis=1)]
+    return fresh
+
+def diversity(costs):
+    # Tỉ lệ chi phí khác nhau trong quần thể (hai chu trình cùng chi phí coi như trùng nhau)
+    return len(np.unique(costs)) / len(costs)
+
+def evolve(rng, cost, population, costs, convergence, mutation_rate, best_individual=None, best_cost=np.inf,
+           control=None, report=None, adaptive=True, max_size=None):
+    # Chạy tới khi convergence.stop() (hoặc control dừng); convergence.trace ghi chi phí tốt nhất sau
+    # mỗi thế hệ. Cá thể tốt nhất luôn được giữ lại trong quần thể (elitism).
+    # max_size: cỡ quần thể tối đa, tính từ cỡ ban đầu của cả lần chạy (mô hình đảo gọi evolve nhiều
+    # lần trên quần thể đã mở rộng); None: MAX_POPULATION_FACTOR lần cỡ hiện tại.
+    # report(cá thể, chi phí, thế hệ) được gọi mỗi khi cá thể tốt nhất được cải thiện.
+    # -> (population, costs, best_individual, best_cost, mutation_rate)
+    base_rate = mutation_rate
+    max_size = len(population) * MAX_POPULATION_FACTOR if max_size is None else max_size
+    counters = counters_of(control)
+    while not convergence.stop():
+        if control is not None:
+            if control.should_stop():
+                break
+            control.progress(convergence.fraction())
+        pop_size = len(population)
+        parent1 = population[selection_np(rng, costs, pop_size)]
+        parent2 = population[selection_np(rng, costs, pop_size)]
+        population = crossover_np(rng, parent1, parent2)
+        mutate_np(rng, population, mutation_rate)
+        costs = population_costs(cost, population)
+        if best_individual is not None:
+            worst = int(np.argmax(costs))
+            population[worst], costs[worst] = best_individual, best_cost
+        i = int(np.argmin(costs))
+        if counters is not None:
+            counters['generations'] += 1
+            counters['evaluations'] += pop_size
+        if costs[i] < best_cost:
+            best_cost = costs[i]
+            best_individual = population[i].copy()
+            if counters is not None:
+                counters['improvements'] += 1
+            if report is not None:
+                report(best_individual, best_cost, convergence.generation + 1)
+        convergence.record(pop_size, best_cost)
+        convergence.trace.append(best_cost)
+
+        if not adaptive:
+            continue
+        spread = diversity(costs)
+        if spread < DIVERSITY_LOW:
+            mutation_rate = min(MUTATION_MAX, max(mutation_rate * 1.5, base_rate))
+        else:
+            mutation_rate = max(base_rate, mutation_rate * 0.9)
+        if spread < DIVERSITY_MIN:
+            if pop_size * 2 > max_size:
+                convergence.reason = 'diversity'
+                break
+            # Mở rộng quần thể bằng cá thể mới thay vì dừng ngay
+            population = np.vstack([population, immigrants(rng, population, pop_size)])
+            costs = np.concatenate([costs, population_costs(cost, population[pop_size:])])
+            if counters is not None:
+                counters['population_growths'] += 1
+    return population, costs, best_individual, best_cost, mutation_rate
+
+def genetic_algorithm_np(inst, start_city, pop_size, mutation_rate, seed, control, convergence):
+    rng = np.random.default_rng(seed)
+    s = inst.index[start_city]
+    if inst.n < 3:
+        path = [s] + [i for i in range(inst.n) if i != s]
+        return inst.path_names(path), inst.tour_cost(path), convergence.stats(inst)
+
+    population = init_population_np(rng, pop_size, inst.n, s)
+    costs = population_costs(inst.cost, population)
+    report = None
+    if control is not None:
+        def report(individual, cost, generation):
+            if np.isfinite(cost):
+                control.incumbent(inst.path_names(individual), inst.number(cost), generation=generation)
+    population, _, best_individual, best_cost, mutation_rate = evolve(
+        rng, inst.cost, population, costs, convergence, mutation_rate, control=control, report=report,
+        max_size=pop_size * MAX_POPULATION_FACTOR)
+
+    stats = convergence.stats(inst, len(population), mutation_rate)
+    if not np.isfinite(best_cost):
+        return None, None, stats
+    return inst.path_names(best_individual), inst.number(best_cost), stats
+
+# ==== Mô hình đảo: K quần thể chạy song song trên nhiều tiến trình ====
+# Mỗi M thế hệ, các cá thể tốt nhất của đảo i thay cho các cá thể tệ nhất của đảo i+1 (vòng).
+
+_worker_cost = None
+
+def _init_island_worker(cost):
+    global _worker_cost
+    _worker_cost = cost
+
+def _run_island(population, costs, rng, generations, mutation_rate, best_individual, best_cost, max_size):
+    # Một chu kỳ di cư trên một đảo; ngân sách và điều kiện hội tụ chung do tiến trình chính kiểm tra
+    convergence = Convergence(population.shape[1], generations, stall=0)
+    population, costs, best_individual, best_cost, mutation_rate = evolve(
+        rng, _worker_cost, population, costs, convergence, mutation_rate, best_individual, best_cost,
+        max_size=max_size)
+    return population, costs, best_individual, best_cost, convergence.trace, convergence.evaluations, mutation_rate, rng
+
+def island_model(start_city, islands=4, pop_size=None, generations=None, mutation_rate=0.02,
+                 migration_interval=20, migrants=2, graph=None, seed=None, workers=None, control=None,
+                 time_budget=None, max_evaluations=None, stall=None):
+    # -> (path, cost, stats) như genetic_algorithm; trace là chi phí tốt nhất của mọi đảo sau mỗi thế hệ,
+    # stats['island_traces'][k] là đường hội tụ riêng của đảo k (cùng độ dài với trace).
+    # Ngân sách và điều kiện không cải thiện được kiểm tra sau mỗi chu kỳ di cư.
+    inst = instance if graph is None else as_instance(graph)
+    s = inst.index[start_city]
+    pop_size = population_size(inst.n) if pop_size is None else pop_size
+    convergence = Convergence(inst.n, generations, time_budget, max_evaluations, stall)
+    if inst.n < 3:
+        path = [s] + [i for i in range(inst.n) if i != s]
+        return inst.path_names(path), inst.tour_cost(path), convergence.stats(inst)
+
+    rngs = [np.random.default_rng(child) for child in np.random.SeedSequence(seed).spawn(islands)]
+    populations = [init_population_np(rng, pop_size, inst.n, s) for rng in rngs]
+    costs = [population_costs(inst.cost, p) for p in populations]
+    bests = [(None, np.inf)] * islands
+    rates = [mutation_rate] * islands
+    migrants = min(migrants, pop_size)
+    reported = np.inf
+    island_traces = [[] for _ in range(islands)]
+
+    workers = workers or min(islands, os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_island_worker,
+                             initargs=(inst.cost,)) as pool:
+        while not convergence.stop():
+            if control is not None:
+                if control.should_stop():
+                    break
+                control.progress(convergence.fraction())
+            epoch = migration_interval
+            if generations is not None:
+                epoch = min(epoch, generations - convergence.generation)
+            futures = [pool.submit(_run_island, populations[k], costs[k], rngs[k], epoch,
+                                   rates[k], *bests[k], pop_size * MAX_POPULATION_FACTOR) for k in range(islands)]
+            traces, evaluations = [], 0
+            for k, future in enumerate(futures):
+                populations[k], costs[k], best_individual, best_cost, trace, spent, rates[k], rngs[k] = future.result()
+                bests[k] = (best_individual, best_cost)
+                # Đảo dừng sớm (mất đa dạng) giữ nguyên chi phí tốt nhất tới hết chu kỳ
+                traces.append(trace + trace[-1:] * (epoch - len(trace)) if trace else [best_cost] * epoch)
+                island_traces[k].extend(traces[-1])
+                evaluations += spent
+
+            best_individual, best_cost = min(bests, key=lambda b: b[1])
+            convergence.record(evaluations, best_cost, epoch)
+            convergence.trace.extend(np.min(traces, axis=0).tolist())
+
+            # Báo lời giải tốt nhất của mọi đảo sau mỗi chu kỳ di cư
+            if control is not None and best_cost < reported and np.isfinite(best_cost):
+                reported = best_cost
+                control.incumbent(inst.path_names(best_individual), inst.number(best_cost),
+                                  generation=convergence.generation)
+
+            if islands > 1:
+                elite = [populations[k][np.argsort(costs[k])[:migrants]] for k in range(islands)]
+                elite_costs = [np.sort(costs[k])[:migrants] for k in range(islands)]
+                for k in range(islands):
+                    target = (k + 1) % islands
+                    worst = np.argsort(costs[target])[-migrants:]
+                    populations[target][worst] = elite[k]
+                    costs[target][worst] = elite_costs[k]
+
+    k = min(range(islands), key=lambda k: bests[k][1])
+    best_individual, best_cost = bests[k]
+    stats = convergence.stats(inst, sum(len(p) for p in populations), min(rates))
+    stats['island_traces'] = [[inst.number(c) if np.isfinite(c) else None for c in trace] for trace in island_traces]
+    if not np.isfinite(best_cost):
+        return None, None, stats
+    return inst.path_names(best_individual), inst.number(best_cost), stats
 
 def draw_path(graph, path, ax):
+    # networkx chỉ cần khi vẽ: nạp lúc dùng để phần giải không phụ thuộc thư viện đồ họa
+    import networkx as nx
+
     G = nx.Graph()
     for node in graph:
         for neighbor, cost in graph[node]:
@@ -109,5 +476,5 @@ def draw_path(graph, path, ax):
     nx.draw_networkx_labels(G, positions, font_size=12, ax=ax)
     nx.draw_networkx_edge_labels(G, positions, edge_labels=edge_labels, ax=ax)
 
-    ax.set_title("Genetic Algorithm - Traveling Salesman Problem")
+    ax.set_title(TITLE)
     ax.axis('off')
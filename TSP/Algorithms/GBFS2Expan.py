@@ -1,15 +1,7 @@
-import heapq
-import matplotlib.pyplot as plt
-import networkx as nx
-import math
-
-class Node:
-    def __init__(self, name, heuristic):
-        self.name = name
-        self.heuristic = heuristic
-    
-    def __lt__(self, other):
-        return self.heuristic < other.heuristic
+import numpy as np
+
+from .Control import SearchLimit, counters_of
+from .Instance import as_instance
 
 graph = {
     'A': [['B', 25], ['C', 33], ['D', 19], ['E', 30]],
@@ -29,42 +21,189 @@ positions = {
     'F': (17, 20),   
 }
 
-def euclidean_distance(pos1, pos2):  # heuristic
-    return math.sqrt((pos1[0] - pos2[0])**2 + (pos1[1] - pos2[1])**2)
-
-def greedy_best_first_search_Ex(graph, start):
-    def dfs(current, visited, path, total_cost):
-        if len(visited) == len(graph):
-            for neighbor, cost in graph[current]:
-                if neighbor == start:
-                    path.append(start)
-                    total_cost += cost
-                    return path, total_cost
-            return None, None
-
-        heap = []
-        for neighbor, cost in graph[current]:
-            if neighbor not in visited:
-                heu = euclidean_distance(positions[current], positions[neighbor])
-                heapq.heappush(heap, (heu, cost, neighbor))
-
-        while heap:
-            heu, cost, neighbor = heapq.heappop(heap)
-            visited.add(neighbor)
-            path.append(neighbor)
-            result_path, result_cost = dfs(neighbor, visited, path, total_cost + cost)
-            if result_path:
-                return result_path, result_cost
-            # backtrack
-            visited.remove(neighbor)
-            path.pop()
+instance = as_instance(graph, positions)
+sample_graph = graph   # chỉ đồ thị mẫu có tọa độ; đồ thị khác dùng heuristic theo chi phí
+
+TITLE = "Greedy Best First Search - Traveling Salesman Problem \nTrường hợp 2 mở rộng: Kết hợp với backtracking để tìm đường về điểm xuất phát"
+
+MEMO_LIMIT = 1 << 20   # số trạng thái thất bại tối đa được ghi nhớ
+
+
+def greedy_best_first_search_Ex(graph, start, control=None, max_nodes=None, memo_limit=MEMO_LIMIT):
+    # DFS theo thứ tự GBFS bằng ngăn xếp tường minh (không giới hạn độ sâu đệ quy).
+    # - dead: các trạng thái (thành phố hiện tại, bitmask đã đi) đã biết là không hoàn thành
+    #   được chu trình, để không duyệt lại khi gặp lại từ một thứ tự đi khác.
+    # - Cắt tỉa theo bậc: mỗi thành phố chưa đi phải còn ít nhất một cạnh vào (từ thành phố
+    #   chưa đi hoặc thành phố hiện tại) và một cạnh ra (tới thành phố chưa đi hoặc điểm xuất phát);
+    #   với đồ thị vô hướng là hai láng giềng khác nhau trong số đó.
+    #   Chỉ loại các nhánh chắc chắn thất bại nên đường đi tìm được không đổi.
+    # - Kiểm tra trước khi tìm: chu trình Hamilton chỉ có khi đồ thị 2-liên thông (không có đỉnh
+    #   khớp, nên cũng không có cầu) và, với đồ thị có hướng, liên thông mạnh. Đồ thị hai cụm nối
+    #   bằng một cạnh bị loại ngay thay vì duyệt hết các thứ tự đi trong một cụm.
+    # max_nodes: giới hạn số nút mở rộng; vượt quá thì ném SearchLimit (không phải Cancelled, để
+    # người gọi phân biệt với hủy / hết thời gian).
+    inst = instance if graph is sample_graph else as_instance(graph)
+    cost, heu, adj = inst.cost, inst.heuristic, inst.adj
+    s = inst.index[start]
+    counters = counters_of(control)
+    succ = [row.tolist() for row in inst.neighbors]
+    pred = [np.flatnonzero(col).tolist() for col in adj.T]
+    symmetric = bool(np.array_equal(adj, adj.T))
+    # Đồ thị vô hướng: in_left là số láng giềng còn dùng được (chưa đi, thành phố hiện tại, điểm xuất phát)
+    in_left = [len(p) for p in pred]
+    out_left = [len(q) for q in succ]
+    need = 2 if symmetric else 1
+    dead = set()
+
+    seen = [False] * inst.n
+    seen[s] = True
+    mask = 1 << s
+
+    def move(current, v, step):
+        # step = -1: đi current -> v; step = +1: hoàn tác. Trả về False nếu vi phạm điều kiện bậc.
+        ok = True
+        if not (symmetric and current == s):
+            # current không còn là đầu mút (điểm xuất phát vẫn là đích cuối của đồ thị vô hướng)
+            for w in succ[current]:
+                if not seen[w]:
+                    in_left[w] += step
+                    ok = ok and in_left[w] >= need
+        if not symmetric:
+            for w in pred[v]:
+                if not seen[w]:
+                    out_left[w] += step
+                    ok = ok and out_left[w] > 0
+        return ok
+
+    if inst.n > 2 and (min(min(in_left), min(out_left)) < need or not connected_enough(succ, pred, s)):
+        # Có thành phố không đủ cạnh, đỉnh khớp hoặc không liên thông mạnh: không tồn tại chu trình Hamilton
+        if counters is not None:
+            counters['pruned'] += 1
         return None, None
 
-    visited = set([start])
-    path = [start]
-    return dfs(start, visited, path, 0)
+    path = [s]
+    totals = [0.0]
+    stack = []   # mỗi tầng: [danh sách ứng viên đã sắp xếp, vị trí ứng viên kế tiếp]
+    expanded = 0
+
+    while True:
+        current = path[-1]
+        if len(stack) < len(path):
+            # Vào một trạng thái mới
+            if control is not None:
+                control.check()
+            if len(path) == inst.n:
+                if adj[current, s]:
+                    path.append(s)
+                    return inst.path_names(path), inst.number(totals[-1] + cost[current, s])
+                if counters is not None:
+                    counters['dead_ends'] += 1
+                candidates = []
+            else:
+                expanded += 1
+                if max_nodes is not None and expanded > max_nodes:
+                    raise SearchLimit(f"Vượt giới hạn {max_nodes} nút mở rộng.")
+                candidates = np.array([w for w in succ[current] if not seen[w]], dtype=np.intp)
+                order = np.lexsort((cost[current, candidates], heu[current, candidates]))
+                candidates = candidates[order].tolist()
+                if counters is not None:
+                    counters['expanded'] += 1
+                    counters['heap_pushes'] += len(candidates)
+                    if not candidates:
+                        counters['dead_ends'] += 1
+            stack.append([candidates, 0])
+
+        frame = stack[-1]
+        candidates, k = frame
+        while k < len(candidates):
+            neighbor = candidates[k]
+            k += 1
+            key = (neighbor, mask | (1 << neighbor))
+            if key in dead:
+                if counters is not None:
+                    counters['memo_hits'] += 1
+                continue
+            seen[neighbor] = True
+            if move(current, neighbor, -1):
+                break
+            move(current, neighbor, 1)
+            seen[neighbor] = False
+            if counters is not None:
+                counters['pruned'] += 1
+            if len(dead) < memo_limit:
+                dead.add(key)
+        else:
+            # Hết ứng viên: ghi nhớ trạng thái thất bại và quay lui
+            stack.pop()
+            if len(dead) < memo_limit:
+                dead.add((current, mask))
+            if len(path) == 1:
+                return None, None
+            if counters is not None:
+                counters['backtracks'] += 1
+            path.pop()
+            totals.pop()
+            move(path[-1], current, 1)
+            seen[current] = False
+            mask ^= 1 << current
+            continue
+
+        frame[1] = k
+        mask |= 1 << neighbor
+        totals.append(totals[-1] + cost[current, neighbor])
+        path.append(neighbor)
+
+def reachable(neighbors, s):
+    seen = [False] * len(neighbors)
+    seen[s] = True
+    stack = [s]
+    while stack:
+        for v in neighbors[stack.pop()]:
+            if not seen[v]:
+                seen[v] = True
+                stack.append(v)
+    return all(seen)
+
+def biconnected(neighbors, s):
+    # Tarjan (DFS bằng ngăn xếp) trên đồ thị vô hướng: liên thông và không có đỉnh khớp
+    n = len(neighbors)
+    disc = [-1] * n
+    low = [0] * n
+    disc[s] = 0
+    visit = 1
+    root_children = 0
+    stack = [(s, -1, iter(neighbors[s]))]
+    while stack:
+        u, parent, rest = stack[-1]
+        for v in rest:
+            if disc[v] < 0:
+                disc[v] = low[v] = visit
+                visit += 1
+                stack.append((v, u, iter(neighbors[v])))
+                break
+            if v != parent:
+                low[u] = min(low[u], disc[v])
+        else:
+            stack.pop()
+            if parent == s:
+                root_children += 1
+            elif parent >= 0:
+                low[parent] = min(low[parent], low[u])
+                if low[u] >= disc[parent]:
+                    return False
+    return visit == n and root_children == 1
+
+def connected_enough(succ, pred, s):
+    # Điều kiện cần của chu trình Hamilton (n > 2), O(n + số cạnh)
+    if succ == pred:
+        return biconnected(succ, s)
+    undirected = [sorted(set(a) | set(b)) for a, b in zip(succ, pred)]
+    return biconnected(undirected, s) and reachable(succ, s) and reachable(pred, s)
 
 def draw_graph(graph, path, ax):
+    # networkx chỉ cần khi vẽ: nạp lúc dùng để phần giải không phụ thuộc thư viện đồ họa
+    import networkx as nx
+
     G = nx.Graph()
     for node in graph:
         for neighbor, cost in graph[node]:
@@ -83,10 +222,12 @@ def draw_graph(graph, path, ax):
     nx.draw_networkx_labels(G, positions, font_size=12, ax=ax)
     nx.draw_networkx_edge_labels(G, positions, edge_labels=labels, ax=ax)
 
-    ax.set_title("Greedy Best First Search - Traveling Salesman Problem \nTrường hợp 2 mở rộng: Kết hợp với backtracking để tìm đường về điểm xuất phát")
+    ax.set_title(TITLE)
     ax.axis('off')
 
 if __name__ == "__main__":
+    import matplotlib.pyplot as plt
+
     print("Các thành phố: A, B, C, D, E")
     start = input("Chọn thành phố bắt đầu: ").strip().upper()
     if start not in graph:
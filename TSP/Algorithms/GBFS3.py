@@ -1,15 +1,5 @@
-import heapq
-import matplotlib.pyplot as plt
-import networkx as nx
-import math
-
-class Node:
-    def __init__(self, name, heuristic):
-        self.name = name
-        self.heuristic = heuristic
-
-    def __lt__(self, other):
-        return self.heuristic < other.heuristic
+from .Greedy import greedy_best_first
+from .Instance import as_instance
 
 # Đồ thị với heuristic
 graph = {
@@ -30,43 +20,19 @@ positions = {
     'F': (17, 20),   
 }
 
-def euclidean_distance(pos1, pos2):  #heuristic
-    return math.sqrt((pos1[0] - pos2[0])**2 + (pos1[1] - pos2[1])**2)
-
-def greedy_best_first_search(graph, start):
-    visited = set()
-    path = [start]
-    total_cost = 0
-    current = start
-    visited.add(current)
-
-    while len(visited) < len(graph):
-        heap = []
-        for neighbor, cost in graph[current]:
-            if neighbor not in visited:
-                heu = euclidean_distance(positions[current], positions[neighbor])
-                heapq.heappush(heap, (heu, cost, neighbor))
-        
-        if not heap:
-            return None, None
+instance = as_instance(graph, positions)
+sample_graph = graph   # chỉ đồ thị mẫu có tọa độ; đồ thị khác dùng heuristic theo chi phí
 
-        _, cost_next_node, next_node = heapq.heappop(heap)
-        total_cost += cost_next_node
-        path.append(next_node)
-        visited.add(next_node)
-        current = next_node
+TITLE = "Greedy Best First Search - Traveling Salesman Problem \nTrường hợp 3: Đồ thị không có chu trình Hamilton"
 
-    # Quay lại điểm xuất phát
-    for neighbor, cost in graph[current]:
-        if neighbor == start:
-            total_cost += cost
-            path.append(start)
-            return path, total_cost
-
-    # Không có đường quay về
-    return None, None
+def greedy_best_first_search(graph, start, control=None, spatial=None):
+    inst = instance if graph is sample_graph else as_instance(graph)
+    return greedy_best_first(inst, start, control, spatial)
 
 def draw_graph(graph, path, ax):
+    # networkx chỉ cần khi vẽ: nạp lúc dùng để phần giải không phụ thuộc thư viện đồ họa
+    import networkx as nx
+
     G = nx.Graph()
     for node in graph:
         for neighbor, cost in graph[node]:
@@ -85,9 +51,11 @@ def draw_graph(graph, path, ax):
     nx.draw_networkx_labels(G, positions, font_size=12, ax=ax)
     nx.draw_networkx_edge_labels(G, positions, edge_labels=labels, ax=ax)
 
-    ax.set_title("Greedy Best First Search - Traveling Salesman Problem \nTrường hợp 3: Đồ thị không có chu trình Hamilton")
+    ax.set_title(TITLE)
     ax.axis('off')
 if __name__ == "__main__":
+    import matplotlib.pyplot as plt
+
     print("Các thành phố: A, B, C, D, E")
     start = input("Chọn thành phố bắt đầu: ").strip().upper()
     if start not in graph:
@@ -0,0 +1,54 @@
+import numpy as np
+
+from .Control import counters_of
+from .Spatial import greedy_nearest, use_spatial
+
+# Lõi GBFS dùng chung cho GBFS1 / GBFS2 / GBFS3 (ba module chỉ khác đồ thị mẫu và cách vẽ):
+# từ thành phố hiện tại luôn đi tới thành phố chưa đi có heuristic nhỏ nhất trong các cạnh có thật,
+# không quay lui; hết cạnh đi tiếp hoặc không có cạnh về điểm xuất phát thì thất bại (None, None).
+
+
+def greedy_best_first(inst, start, control=None, spatial=None):
+    # Bài toán lớn theo tọa độ: truy vấn láng giềng gần nhất trên lưới, không dựng ma trận
+    if spatial or (spatial is None and use_spatial(inst)):
+        return greedy_nearest(inst, start, control)
+    cost, heu, adj = inst.cost, inst.heuristic, inst.adj
+    s = inst.index[start]
+    visited = np.zeros(inst.n, dtype=bool)
+    visited[s] = True
+    path = [s]
+    total_cost = 0.0
+    current = s
+    counters = counters_of(control)
+
+    for step in range(inst.n - 1):
+        if control is not None:
+            control.check()
+            control.progress(step / inst.n)
+        candidates = np.flatnonzero(adj[current] & ~visited)
+        if candidates.size == 0:
+            if counters is not None:
+                counters['dead_ends'] += 1
+            return None, None
+        if counters is not None:
+            counters['heap_pushes'] += candidates.size
+            counters['heap_pops'] += 1
+
+        # Thứ tự giống heap cũ: heuristic, rồi chi phí, rồi thứ tự thành phố
+        order = np.lexsort((cost[current, candidates], heu[current, candidates]))
+        next_node = candidates[order[0]]
+        total_cost += cost[current, next_node]
+        path.append(next_node)
+        visited[next_node] = True
+        current = next_node
+
+    # Quay lại điểm xuất phát
+    if adj[current, s]:
+        total_cost += cost[current, s]
+        path.append(s)
+        return inst.path_names(path), inst.number(total_cost)
+
+    # Không có đường quay về
+    if counters is not None:
+        counters['dead_ends'] += 1
+    return None, None
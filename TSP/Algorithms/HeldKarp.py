@@ -0,0 +1,122 @@
+from math import comb
+
+import numpy as np
+
+from .Control import counters_of
+from .Instance import as_instance
+
+# Quy hoạch động Held-Karp trên tập con (bitmask), cho lời giải tối ưu.
+# dp[mask, j]: chi phí nhỏ nhất đi từ điểm xuất phát qua đúng các thành phố
+# trong mask và kết thúc tại j. Mỗi tầng (số bit của mask) được tính một lần
+# bằng NumPy, vector hóa theo chiều thành phố liền trước.
+# Bộ nhớ: bảng cha 2^m x m (1 byte/trạng thái, cần để truy vết) luôn phải giữ đủ; bảng chi phí
+# đầy đủ thêm 8 byte/trạng thái, chế độ theo tầng chỉ giữ hai tầng liền nhau (tầng rộng nhất
+# C(m, m/2) mask). memory_limit tính cả hai bảng; chế độ theo tầng vẫn vượt thì báo lỗi.
+
+MAX_CITIES = 24
+MEMORY_LIMIT = 1 << 30   # byte, vượt quá thì chuyển sang chế độ theo tầng
+CHUNK_ROWS = 1 << 16     # số mask xử lý mỗi lần để giới hạn bộ nhớ tạm
+
+
+def popcount(masks, m):
+    count = np.zeros(masks.shape, dtype=np.int8)
+    for b in range(m):
+        count += ((masks >> b) & 1).astype(np.int8)
+    return count
+
+
+def memory_needed(m, layered):
+    # Ước lượng byte cho m thành phố (không kể điểm xuất phát): bảng cha + số bit của mọi mask
+    # + bảng chi phí (đầy đủ, hoặc hai tầng rộng nhất và vị trí của mask trong tầng)
+    size = (1 << m) * (m + 1)
+    if layered:
+        return size + (1 << m) * 4 + 2 * comb(m, m // 2) * m * 8
+    return size + (1 << m) * m * 8
+
+
+def held_karp(graph, start, layered=None, memory_limit=MEMORY_LIMIT, control=None):
+    inst = as_instance(graph)
+    s = inst.index[start]
+    others = np.array([i for i in range(inst.n) if i != s], dtype=np.intp)
+    m = len(others)
+    if m == 0:
+        return [start, start], 0
+    if inst.n > MAX_CITIES:
+        raise ValueError(f"Held-Karp chỉ hỗ trợ tối đa {MAX_CITIES} thành phố.")
+
+    sub = inst.cost[np.ix_(others, others)]
+    from_start = inst.cost[s, others]
+    to_start = inst.cost[others, s]
+
+    if layered is None:
+        layered = memory_needed(m, False) > memory_limit
+    if memory_needed(m, layered) > memory_limit:
+        raise ValueError(f"Held-Karp cần khoảng {memory_needed(m, layered) >> 20} MB cho {inst.n} thành phố, "
+                         f"vượt giới hạn {memory_limit >> 20} MB.")
+    parent = np.full((1 << m, m), -1, dtype=np.int8)
+
+    count = popcount(np.arange(1 << m, dtype=np.int32), m)
+
+    def layer_of(k):
+        # Các mask có đúng k bit, tính khi cần thay vì giữ một bảng sắp xếp 2^m phần tử
+        return np.flatnonzero(count == k)
+
+    if layered:
+        # pos[mask]: vị trí của mask trong tầng của nó
+        pos = np.empty(1 << m, dtype=np.int32)
+        pos[layer_of(1)] = np.arange(m, dtype=np.int32)
+        prev_dp = np.full((m, m), np.inf)
+        prev_dp[np.arange(m), np.arange(m)] = from_start
+    else:
+        dp = np.full((1 << m, m), np.inf)
+        dp[1 << np.arange(m), np.arange(m)] = from_start
+
+    for k in range(2, m + 1):
+        if control is not None:
+            control.check()
+            control.progress(k / m)
+        layer = layer_of(k)
+        if layered:
+            pos[layer] = np.arange(len(layer), dtype=np.int32)
+            cur_dp = np.full((len(layer), m), np.inf)
+        for j in range(m):
+            sel = layer[(layer >> j) & 1 == 1]
+            for c in range(0, len(sel), CHUNK_ROWS):
+                rows = sel[c:c + CHUNK_ROWS]
+                prev = rows ^ (1 << j)
+                if layered:
+                    cand = prev_dp[pos[prev]] + sub[:, j]
+                else:
+                    cand = dp[prev] + sub[:, j]
+                best = np.argmin(cand, axis=1)
+                value = cand[np.arange(len(rows)), best]
+                parent[rows, j] = best
+                if layered:
+                    cur_dp[pos[rows], j] = value
+                else:
+                    dp[rows, j] = value
+        if layered:
+            prev_dp = cur_dp
+
+    if counters_of(control) is not None:
+        control.counters['states'] += (1 << m) * m
+        control.counters['layered'] = int(layered)
+
+    full = (1 << m) - 1
+    last_row = prev_dp[0] if layered else dp[full]
+    final = last_row + to_start
+    j = int(np.argmin(final))
+    if not np.isfinite(final[j]):
+        return None, None
+
+    # Truy vết ngược từ tập đầy đủ
+    tour = []
+    mask = full
+    while j >= 0:
+        tour.append(others[j])
+        prev_j = int(parent[mask, j])
+        mask ^= 1 << j
+        j = prev_j
+    tour.reverse()
+    path = [s] + tour + [s]
+    return inst.path_names(path), inst.number(final.min())
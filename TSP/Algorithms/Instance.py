@@ -0,0 +1,257 @@
+import hashlib
+import math
+
+import numpy as np
+
+# Thể hiện chung của một bài toán TSP: ánh xạ tên thành phố -> chỉ số nguyên
+# một lần duy nhất, lưu chi phí, heuristic và ma trận kề dưới dạng mảng NumPy.
+# Cạnh không tồn tại có chi phí = inf và adj = False.
+
+class TSPInstance:
+    def __init__(self, names, cost=None, coords=None, heuristic=None, metric=None, planar=None):
+        self.names = list(names)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.n = len(self.names)
+        self.coords = None if coords is None else np.ascontiguousarray(coords, dtype=np.float64)
+        if cost is None and self.coords is None:
+            raise ValueError("Cần có ma trận chi phí hoặc tọa độ.")
+        self._cost = None if cost is None else np.ascontiguousarray(cost, dtype=np.float64)
+        if self._cost is not None and np.isfinite(np.diagonal(self._cost)).any():
+            # Không có cạnh từ một thành phố về chính nó
+            self._cost = self._cost.copy()
+            np.fill_diagonal(self._cost, np.inf)
+        # Không có ma trận chi phí: tính từ tọa độ bằng metric(p, q) (mặc định Euclid) khi cần.
+        # planar: chi phí tăng theo khoảng cách Euclid, nên láng giềng gần nhất trên mặt phẳng
+        # cũng là láng giềng rẻ nhất (cho phép dùng chỉ mục không gian thay cho ma trận).
+        self.metric = metric or euclidean
+        self.derived = cost is None
+        self.euclidean = cost is None and metric is None
+        self.planar = self.derived and (metric is None if planar is None else planar)
+        self._heuristic = None if heuristic is None else np.ascontiguousarray(heuristic, dtype=np.float64)
+        self._adj = None
+        self._neighbors = None
+        self._cost_rows = None
+        self._integral = None
+        self._fingerprint = None
+
+    @classmethod
+    def from_graph(cls, graph, positions=None):
+        names = list(graph.keys())
+        index = {name: i for i, name in enumerate(names)}
+        cost = np.full((len(names), len(names)), np.inf)
+        for node, edges in graph.items():
+            for neighbor, c in edges:
+                cost[index[node], index[neighbor]] = c
+        coords = None
+        if positions is not None:
+            coords = [positions[name] for name in names]
+        return cls(names, cost, coords)
+
+    @classmethod
+    def from_coords(cls, coords, names=None, metric=None, planar=None):
+        coords = np.asarray(coords, dtype=np.float64)
+        if names is None:
+            names = [str(i + 1) for i in range(len(coords))]
+        # Đồ thị đầy đủ: chi phí = khoảng cách (Euclid hoặc metric), tính khi cần
+        return cls(names, None, coords, metric=metric, planar=planar)
+
+    @property
+    def cost(self):
+        if self._cost is None:
+            self._cost = self.metric(self.coords[:, None, :], self.coords[None, :, :])
+            np.fill_diagonal(self._cost, np.inf)
+        return self._cost
+
+    @property
+    def heuristic(self):
+        if self._heuristic is None:
+            if self.derived:
+                # Chi phí chính là khoảng cách theo tọa độ: dùng chung một ma trận thay vì tính hai lần
+                self._heuristic = self.cost
+            elif self.coords is not None:
+                self._heuristic = euclidean_matrix(self.coords)
+            else:
+                self._heuristic = np.where(self.adj, self.cost, 0.0)
+        return self._heuristic
+
+    @property
+    def adj(self):
+        if self._adj is None:
+            self._adj = np.isfinite(self.cost)
+            np.fill_diagonal(self._adj, False)
+        return self._adj
+
+    @property
+    def neighbors(self):
+        # Danh sách kề dạng chỉ số, tính một lần
+        if self._neighbors is None:
+            self._neighbors = [np.flatnonzero(row) for row in self.adj]
+        return self._neighbors
+
+    @property
+    def cost_rows(self):
+        # Bản sao dạng list cho các vòng lặp Python thuần (truy cập vô hướng nhanh hơn NumPy)
+        if self._cost_rows is None:
+            self._cost_rows = self.cost.tolist()
+        return self._cost_rows
+
+    @property
+    def is_complete(self):
+        return bool(self.adj.sum() == self.n * (self.n - 1))
+
+    @property
+    def integral(self):
+        if self._integral is None:
+            if self._cost is None:
+                # Chưa có ma trận (bài toán lớn): kiểm tra trên một khối hàng đầu thay vì dựng cả ma trận
+                rows = min(self.n, max(1, (1 << 21) // max(self.n, 1)))
+                finite = self.metric(self.coords[:rows, None, :], self.coords[None, :, :])
+            else:
+                finite = self.cost[self.adj]
+            self._integral = bool(np.all(finite == np.round(finite)))
+        return self._integral
+
+    def number(self, value):
+        # Giữ kiểu int khi mọi chi phí là số nguyên (giống đồ thị gốc)
+        if self.integral and np.isfinite(value):
+            return int(round(value))
+        return float(value)
+
+    def ids(self, path):
+        return [self.index[name] for name in path]
+
+    def path_names(self, ids):
+        return [self.names[i] for i in ids]
+
+    def rotate(self, path, start):
+        # Xoay đường đi (đóng [a, ..., a] hoặc mở [a, ...]) để bắt đầu tại start; chu trình không đổi chi phí
+        if not path or path[0] == start:
+            return path
+        closed = len(path) > 1 and path[0] == path[-1]
+        ids = self.ids(path[:-1] if closed else path)
+        shift = ids.index(self.index[start])
+        ids = ids[shift:] + ids[:shift]
+        if closed:
+            ids.append(ids[0])
+        return self.path_names(ids)
+
+    def pair_cost(self, a, b):
+        # Chi phí các cạnh a[k] -> b[k]; với bài toán theo tọa độ không cần dựng cả ma trận
+        if self._cost is None:
+            return self.metric(self.coords[a], self.coords[b])
+        return self._cost[a, b]
+
+    def cost_block(self, lo, hi):
+        # Các hàng lo..hi-1 của ma trận chi phí; bài toán theo tọa độ chưa có ma trận thì chỉ tính
+        # khối hàng này (dùng để duyệt cả ma trận theo từng khối với bộ nhớ giới hạn)
+        if self._cost is None:
+            block = self.metric(self.coords[lo:hi, None, :], self.coords[None, :, :])
+            block[np.arange(hi - lo), np.arange(lo, hi)] = np.inf
+            return block
+        return self._cost[lo:hi]
+
+    def cost_function(self):
+        # c(a, b) vô hướng cho các vòng lặp Python thuần. Đã có ma trận: tra bản sao dạng list;
+        # bài toán theo tọa độ chưa dựng ma trận: tính từng cặp từ tọa độ, không tốn bộ nhớ n x n
+        if self._cost is not None or not self.derived:
+            rows = self.cost_rows
+
+            def cost(a, b):
+                return rows[a][b]
+        elif self.euclidean:
+            xs, ys = self.coords[:, 0].tolist(), self.coords[:, 1].tolist()
+
+            def cost(a, b):
+                return math.hypot(xs[a] - xs[b], ys[a] - ys[b])
+        else:
+            coords, metric = self.coords, self.metric
+
+            def cost(a, b):
+                return float(metric(coords[a], coords[b]))
+        return cost
+
+    def sym_row(self, i):
+        # Chi phí vô hướng min(i -> j, j -> i) tới mọi thành phố; bài toán theo tọa độ chưa có
+        # ma trận thì tính riêng hàng này (metric đối xứng), không dựng cả ma trận n x n
+        if self._cost is None:
+            row = self.metric(self.coords[i], self.coords)
+            row[i] = np.inf
+            return row
+        return np.minimum(self._cost[i], self._cost[:, i])
+
+    def tour_cost(self, ids, closed=True):
+        ids = np.asarray(ids, dtype=np.intp)
+        if closed:
+            total = self.pair_cost(ids, np.roll(ids, -1)).sum()
+        else:
+            total = self.pair_cost(ids[:-1], ids[1:]).sum()
+        return self.number(total)
+
+    def cost_changed(self, i):
+        # Hàng và cột i của ma trận chi phí vừa được sửa tại chỗ: cập nhật bản sao dạng list,
+        # bỏ các bảng dẫn xuất khác (tính lại khi cần)
+        if self._cost_rows is not None:
+            rows = self._cost_rows
+            rows[i] = self._cost[i].tolist()
+            for row, value in zip(rows, self._cost[:, i].tolist()):
+                row[i] = value
+        self._adj = self._neighbors = self._integral = self._fingerprint = None
+
+    def positions(self):
+        if self.coords is None:
+            return None
+        return {name: tuple(self.coords[i]) for i, name in enumerate(self.names)}
+
+    def fingerprint(self):
+        # Mã băm nội dung (tên, tọa độ, ma trận chi phí hoặc metric): hai bài toán giống hệt nhau
+        # được tạo ở hai lần khác nhau cho cùng một mã
+        if self._fingerprint is None:
+            h = hashlib.sha1('\x1f'.join(self.names).encode('utf-8'))
+            if self.coords is not None:
+                h.update(self.coords.tobytes())
+            if self.derived:
+                h.update(f"{self.metric.__module__}.{self.metric.__name__}:{self.planar}".encode('utf-8'))
+            else:
+                h.update(np.ascontiguousarray(self._cost).tobytes())
+            self._fingerprint = h.hexdigest()
+        return self._fingerprint
+
+    def __getstate__(self):
+        # Gửi sang tiến trình khác: bỏ các bảng tính lại được (ma trận dựng từ tọa độ, danh sách kề...)
+        state = self.__dict__.copy()
+        state.update(_adj=None, _neighbors=None, _cost_rows=None)
+        if self.derived:
+            state.update(_cost=None, _heuristic=None)
+        return state
+
+
+def euclidean(p, q):
+    # Khoảng cách từng cặp điểm, p và q có dạng (..., 2) và broadcast được với nhau
+    return np.hypot(p[..., 0] - q[..., 0], p[..., 1] - q[..., 1])
+
+
+def euclidean_matrix(coords):
+    coords = np.asarray(coords, dtype=np.float64)
+    return euclidean(coords[:, None, :], coords[None, :, :])
+
+
+def as_instance(graph, positions=None):
+    if isinstance(graph, TSPInstance):
+        return graph
+    return TSPInstance.from_graph(graph, positions)
+
+
+# ==== Sinh bài toán ngẫu nhiên (benchmark) ====
+
+def random_uniform(n, seed=None, scale=1000.0):
+    rng = np.random.default_rng(seed)
+    return TSPInstance.from_coords(rng.random((n, 2)) * scale)
+
+
+def random_clustered(n, seed=None, clusters=None, scale=1000.0, spread=0.05):
+    rng = np.random.default_rng(seed)
+    clusters = clusters or max(1, int(np.sqrt(n) / 2))
+    centers = rng.random((clusters, 2)) * scale
+    labels = rng.integers(0, clusters, n)
+    coords = centers[labels] + rng.normal(0.0, spread * scale, (n, 2))
+    return TSPInstance.from_coords(coords)
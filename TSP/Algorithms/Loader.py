@@ -0,0 +1,226 @@
+import csv
+import json
+import math
+import os
+
+import numpy as np
+
+from .Instance import TSPInstance, euclidean
+
+# Đọc bài toán từ file TSPLIB (.tsp: EUC_2D, CEIL_2D, ATT, GEO, EXPLICIT) hoặc CSV tọa độ.
+# File được đọc từng dòng vào mảng NumPy cấp phát sẵn; dạng đã phân tích được lưu
+# thành .npy trong thư mục <file>.cache/ để lần sau chỉ cần memory-map.
+
+CACHE_VERSION = 1
+
+
+# ==== Hàm khoảng cách theo chuẩn TSPLIB (từng cặp điểm p, q dạng (..., 2)) ====
+
+def euc_2d(p, q):
+    return np.rint(euclidean(p, q))
+
+
+def ceil_2d(p, q):
+    return np.ceil(euclidean(p, q))
+
+
+def att(p, q):
+    r = euclidean(p, q) / math.sqrt(10.0)
+    t = np.rint(r)
+    return np.where(t < r, t + 1, t)
+
+
+def geo_radians(p):
+    # Tọa độ dạng DDD.MM (độ.phút)
+    deg = np.trunc(p)
+    return math.pi * (deg + 5.0 * (p - deg) / 3.0) / 180.0
+
+
+def geo(p, q):
+    # Bán kính Trái Đất 6378.388 km theo TSPLIB
+    a, b = geo_radians(p), geo_radians(q)
+    q1 = np.cos(a[..., 1] - b[..., 1])
+    q2 = np.cos(a[..., 0] - b[..., 0])
+    q3 = np.cos(a[..., 0] + b[..., 0])
+    inner = np.clip(0.5 * ((1.0 + q1) * q2 - (1.0 - q1) * q3), -1.0, 1.0)
+    return np.trunc(6378.388 * np.arccos(inner) + 1.0)
+
+
+METRICS = {
+    'EUC_2D': euc_2d,
+    'CEIL_2D': ceil_2d,
+    'ATT': att,
+    'GEO': geo,
+}
+# Các metric tăng theo khoảng cách Euclid trên mặt phẳng (GEO thì không)
+PLANAR = {'EUC_2D', 'CEIL_2D', 'ATT'}
+
+
+# ==== TSPLIB ====
+
+def parse_tsplib(path):
+    header = {}
+    coords = None
+    weights = None
+    section = None
+    filled = 0
+
+    with open(path, encoding='utf-8', errors='replace') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line == 'EOF':
+                break
+            parts = line.split()
+            if not is_number(parts[0]):
+                # Dòng từ khóa: "KEY : value" hoặc tên section
+                key = line.split(':')[0].strip()
+                section = key if key.endswith('_SECTION') else None
+                filled = 0
+                n = int(header.get('DIMENSION', 0))
+                if section in ('NODE_COORD_SECTION', 'DISPLAY_DATA_SECTION'):
+                    coords = np.empty((n, 2))
+                elif section == 'EDGE_WEIGHT_SECTION':
+                    weights = np.empty(explicit_count(header.get('EDGE_WEIGHT_FORMAT', 'FULL_MATRIX'), n))
+                elif section is None and ':' in line:
+                    header[key] = line.split(':', 1)[1].strip()
+                continue
+
+            if section in ('NODE_COORD_SECTION', 'DISPLAY_DATA_SECTION'):
+                coords[filled] = (float(parts[1]), float(parts[2]))
+                filled += 1
+            elif section == 'EDGE_WEIGHT_SECTION':
+                values = np.array(parts, dtype=np.float64)
+                weights[filled:filled + len(values)] = values
+                filled += len(values)
+
+    return header, coords, weights
+
+
+def is_number(token):
+    try:
+        float(token)
+    except ValueError:
+        return False
+    return True
+
+
+def explicit_count(fmt, n):
+    return {
+        'FULL_MATRIX': n * n,
+        'UPPER_ROW': n * (n - 1) // 2,
+        'LOWER_ROW': n * (n - 1) // 2,
+        'UPPER_DIAG_ROW': n * (n + 1) // 2,
+        'LOWER_DIAG_ROW': n * (n + 1) // 2,
+    }[fmt]
+
+
+def explicit_matrix(fmt, n, weights):
+    if fmt == 'FULL_MATRIX':
+        return weights.reshape(n, n)
+    cost = np.zeros((n, n))
+    if fmt == 'UPPER_ROW':
+        rows, cols = np.triu_indices(n, 1)
+    elif fmt == 'LOWER_ROW':
+        rows, cols = np.tril_indices(n, -1)
+    elif fmt == 'UPPER_DIAG_ROW':
+        rows, cols = np.triu_indices(n)
+    else:
+        rows, cols = np.tril_indices(n)
+    cost[rows, cols] = weights
+    cost[cols, rows] = weights
+    return cost
+
+
+def load_tsplib(path):
+    header, coords, weights = parse_tsplib(path)
+    n = int(header['DIMENSION'])
+    kind = header.get('EDGE_WEIGHT_TYPE', 'EUC_2D')
+    names = [str(i + 1) for i in range(n)]
+    if kind == 'EXPLICIT':
+        cost = explicit_matrix(header.get('EDGE_WEIGHT_FORMAT', 'FULL_MATRIX'), n, weights)
+        return {'names': names, 'coords': coords, 'cost': cost, 'metric': None}
+    if kind not in METRICS:
+        raise ValueError(f"Chưa hỗ trợ EDGE_WEIGHT_TYPE = {kind}")
+    return {'names': names, 'coords': coords, 'cost': None, 'metric': kind}
+
+
+# ==== CSV: "x,y" hoặc "tên,x,y" (dòng tiêu đề tùy chọn) ====
+
+def load_csv(path):
+    names = []
+    chunks = []
+    block = []
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        for row in csv.reader(f):
+            if not row or row[0].startswith('#'):
+                continue
+            try:
+                x, y = float(row[-2]), float(row[-1])
+            except ValueError:
+                continue   # dòng tiêu đề
+            names.append(row[0].strip() if len(row) >= 3 else str(len(names) + 1))
+            block.append((x, y))
+            if len(block) == 65536:
+                chunks.append(np.array(block))
+                block = []
+    if block:
+        chunks.append(np.array(block))
+    coords = np.concatenate(chunks) if chunks else np.empty((0, 2))
+    return {'names': names, 'coords': coords, 'cost': None, 'metric': None}
+
+
+# ==== Bộ nhớ đệm .npy ====
+
+def cache_dir(path):
+    return path + '.cache'
+
+
+def read_cache(path):
+    folder = cache_dir(path)
+    meta_path = os.path.join(folder, 'meta.json')
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path, encoding='utf-8') as f:
+        meta = json.load(f)
+    stat = os.stat(path)
+    if meta.get('version') != CACHE_VERSION or meta.get('size') != stat.st_size \
+            or meta.get('mtime') != stat.st_mtime:
+        return None
+    data = {'names': meta['names'], 'metric': meta['metric'], 'coords': None, 'cost': None}
+    for key in ('coords', 'cost'):
+        file = os.path.join(folder, key + '.npy')
+        if os.path.exists(file):
+            data[key] = np.load(file, mmap_mode='r')
+    return data
+
+
+def write_cache(path, data):
+    folder = cache_dir(path)
+    try:
+        os.makedirs(folder, exist_ok=True)
+        for key in ('coords', 'cost'):
+            if data[key] is not None:
+                np.save(os.path.join(folder, key + '.npy'), np.ascontiguousarray(data[key], dtype=np.float64))
+        stat = os.stat(path)
+        meta = {'version': CACHE_VERSION, 'size': stat.st_size, 'mtime': stat.st_mtime,
+                'names': data['names'], 'metric': data['metric']}
+        with open(os.path.join(folder, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+    except OSError:
+        pass   # thư mục chỉ đọc: bỏ qua bộ nhớ đệm
+
+
+def load_instance(path, use_cache=True):
+    data = read_cache(path) if use_cache else None
+    if data is None:
+        if path.lower().endswith('.tsp'):
+            data = load_tsplib(path)
+        else:
+            data = load_csv(path)
+        if use_cache:
+            write_cache(path, data)
+    metric = METRICS.get(data['metric']) if data['metric'] else None
+    planar = data['metric'] in PLANAR if data['metric'] else None
+    return TSPInstance(data['names'], data['cost'], data['coords'], metric=metric, planar=planar)
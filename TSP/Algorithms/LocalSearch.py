@@ -0,0 +1,219 @@
+from collections import deque
+
+import numpy as np
+
+from .Control import counters_of
+from .Instance import as_instance
+from .Spatial import GridIndex, use_spatial
+
+# Tìm kiếm cục bộ 2-opt / Or-opt cho một chu trình bất kỳ (từ GBFS, GA, BTTT, ...).
+# - Chỉ xét các ứng viên trong k láng giềng gần nhất của mỗi thành phố.
+# - Bit "không nhìn" (don't-look): thành phố không cải thiện được sẽ bị bỏ qua
+#   cho tới khi một cạnh kề với nó thay đổi.
+# - Độ chênh lệch chi phí của mỗi bước được tính O(1) từ 4-6 cạnh.
+# 2-opt đảo chiều một đoạn nên chỉ dùng cho ma trận đối xứng.
+
+EPS = 1e-9
+NEIGHBOR_BLOCK = 1 << 22   # số phần tử tối đa của một khối hàng khi tìm láng giềng gần nhất
+
+
+def nearest_neighbors(inst, k):
+    # k láng giềng rẻ nhất của mỗi thành phố (bỏ cạnh không tồn tại), theo chi phí tăng dần.
+    # Bài toán lớn theo tọa độ phẳng: truy vấn trên lưới (gần tuyến tính); còn lại duyệt ma trận theo
+    # từng khối hàng (cost_block) nên không cần giữ cả ma trận n x n nếu bài toán chưa dựng nó
+    n = inst.n
+    k = min(k, n - 1)
+    if k < 1:
+        return [[] for _ in range(n)]
+    if use_spatial(inst):
+        return GridIndex(inst.coords).k_nearest_all(k)
+    neigh = []
+    block = max(1, NEIGHBOR_BLOCK // n)
+    for lo in range(0, n, block):
+        rows = inst.cost_block(lo, min(n, lo + block))
+        near = np.argpartition(rows, k - 1, axis=1)[:, :k]
+        values = np.take_along_axis(rows, near, axis=1)
+        order = np.argsort(values, axis=1, kind='stable')
+        near = np.take_along_axis(near, order, axis=1)
+        finite = np.isfinite(np.take_along_axis(values, order, axis=1))
+        neigh.extend([j for j, ok in zip(row, keep) if ok] for row, keep in zip(near.tolist(), finite.tolist()))
+    return neigh
+
+
+def improve_tour(graph, path, k=10, use_2opt=True, use_or_opt=True, control=None):
+    inst = as_instance(graph)
+    closed = len(path) > 1 and path[0] == path[-1]
+    ids = inst.ids(path[:-1] if closed else path)
+    first = ids[0] if ids else None
+
+    def output(tour):
+        # Giữ thành phố xuất phát ở đầu và định dạng mở / đóng như đầu vào
+        shift = tour.index(first) if tour else 0
+        names = inst.path_names(tour[shift:] + tour[:shift])
+        if closed:
+            names.append(names[0])
+        return names, inst.tour_cost(tour)
+
+    if len(ids) >= 5:
+        report = None
+        if control is not None:
+            def report(tour):
+                control.incumbent(*output(tour))
+        ids = improve_ids(inst, ids, k, use_2opt, use_or_opt, control, report)
+    return output(ids)
+
+
+def two_opt(graph, path, k=10):
+    return improve_tour(graph, path, k, use_2opt=True, use_or_opt=False)
+
+
+def or_opt(graph, path, k=10):
+    return improve_tour(graph, path, k, use_2opt=False, use_or_opt=True)
+
+
+def improve_ids(inst, tour, k=10, use_2opt=True, use_or_opt=True, control=None, report=None, focus=None,
+                neighbors=None, symmetric=None):
+    # report(tour): gọi định kỳ (mỗi 1024 bước) khi chu trình đã được cải thiện kể từ lần báo trước
+    # focus: chỉ bắt đầu từ các thành phố này (các thành phố khác giữ bit "không nhìn"), để sửa
+    # nhanh một chu trình vừa bị thay đổi cục bộ thay vì tối ưu lại toàn bộ
+    # neighbors, symmetric: kết quả nearest_neighbors(inst, k) và tính đối xứng của ma trận, nếu người
+    # gọi đã giữ sẵn (tránh tính lại O(n^2) mỗi lần gọi)
+    d = inst.cost_function()
+    n = len(tour)
+    if symmetric is None:
+        # Chi phí theo tọa độ (metric) luôn đối xứng: không dựng ma trận chỉ để kiểm tra
+        symmetric = inst.derived or bool(np.array_equal(inst.cost, inst.cost.T))
+    use_2opt = use_2opt and symmetric
+    neigh = nearest_neighbors(inst, k) if neighbors is None else neighbors
+    tour = list(tour)
+    pos = [0] * inst.n
+    for i, c in enumerate(tour):
+        pos[c] = i
+
+    def succ(c):
+        return tour[(pos[c] + 1) % n]
+
+    def pred(c):
+        return tour[pos[c] - 1]
+
+    def reverse(i, j):
+        # Đảo đoạn vị trí i..j (theo chiều tiến, có vòng); đảo phần bù nếu ngắn hơn
+        length = (j - i) % n + 1
+        if 2 * length > n:
+            i, j = (j + 1) % n, (i - 1) % n
+            length = n - length
+        for _ in range(length // 2):
+            ci, cj = tour[i], tour[j]
+            tour[i], tour[j] = cj, ci
+            pos[cj], pos[ci] = i, j
+            i = (i + 1) % n
+            j = (j - 1) % n
+
+    def try_2opt(a):
+        b = succ(a)
+        d_ab = d(a, b)
+        for c in neigh[a]:
+            if d(a, c) >= d_ab:
+                break
+            e = succ(c)
+            if c == b or e == a:
+                continue
+            delta = d(a, c) + d(b, e) - d_ab - d(c, e)
+            if delta < -EPS:
+                reverse(pos[b], pos[c])
+                return (a, b, c, e)
+        p = pred(a)
+        d_pa = d(p, a)
+        for c in neigh[a]:
+            if d(a, c) >= d_pa:
+                break
+            e = pred(c)
+            if c == p or e == a:
+                continue
+            delta = d(c, a) + d(e, p) - d_pa - d(e, c)
+            if delta < -EPS:
+                reverse(pos[c], pos[p])
+                return (a, p, c, e)
+        return None
+
+    def try_or_opt(a):
+        for length in (1, 2, 3):
+            if length > n - 3:
+                break
+            segment = [tour[(pos[a] + t) % n] for t in range(length)]
+            last = segment[-1]
+            p, nx = pred(a), succ(last)
+            removed = d(p, a) + d(last, nx) - d(p, nx)
+            if removed <= EPS:
+                continue
+            inside = set(segment)
+            for c in set(neigh[a]) | set(neigh[last]):
+                if c in inside:
+                    continue
+                for x, y in ((pred(c), c), (c, succ(c))):
+                    if x in inside or y in inside:
+                        continue
+                    forward = d(x, a) + d(last, y) - d(x, y)
+                    backward = d(x, last) + d(a, y) - d(x, y) if symmetric else np.inf
+                    if min(forward, backward) - removed < -EPS:
+                        move_segment(segment, x, backward < forward)
+                        return (a, last, p, nx, x, y)
+        return None
+
+    def move_segment(segment, x, flip):
+        # Chu trình = đoạn S, khối B1 (sau S tới x), khối B2 (từ succ(x) tới trước S). Chèn S giữa x
+        # và succ(x) bằng cách dời khối ngắn hơn sang bù chỗ của S: chỉ cập nhật pos của khối đó và S
+        length = len(segment)
+        i, j = pos[segment[0]], pos[segment[-1]]
+        after = (pos[x] - j) % n
+        before = n - length - after
+        if after <= before:
+            for t in range(after):
+                c = tour[(j + 1 + t) % n]
+                tour[(i + t) % n] = c
+                pos[c] = (i + t) % n
+            start = (i + after) % n
+        else:
+            for t in range(before):
+                c = tour[(i - 1 - t) % n]
+                tour[(j - t) % n] = c
+                pos[c] = (j - t) % n
+            start = (i - before) % n
+        for t, c in enumerate(segment[::-1] if flip else segment):
+            tour[(start + t) % n] = c
+            pos[c] = (start + t) % n
+
+    queue = deque(dict.fromkeys(tour if focus is None else focus))
+    queued = [False] * inst.n
+    for c in queue:
+        queued[c] = True
+    steps = 0
+    changed = False
+    counters = counters_of(control)
+    while queue:
+        steps += 1
+        if steps % 1024 == 0:
+            if control is not None and control.should_stop():
+                break
+            if changed and report is not None:
+                report(tour)
+                changed = False
+        a = queue.popleft()
+        queued[a] = False
+        touched = use_2opt and try_2opt(a)
+        if touched and counters is not None:
+            counters['moves_2opt'] += 1
+        if not touched and use_or_opt:
+            touched = try_or_opt(a)
+            if touched and counters is not None:
+                counters['moves_or_opt'] += 1
+        if touched:
+            changed = True
+            # Bỏ bit "không nhìn" ở các đầu mút của cạnh vừa thay đổi
+            for c in touched:
+                if not queued[c]:
+                    queued[c] = True
+                    queue.append(c)
+    if counters is not None:
+        counters['queue_pops'] += steps
+    return tour
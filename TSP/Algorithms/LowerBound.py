@@ -0,0 +1,116 @@
+import math
+import time
+
+import numpy as np
+
+from .Instance import as_instance
+
+# Cận dưới nhanh cho độ dài chu trình tối ưu: cận 1-tree Held-Karp, tăng dần bằng subgradient
+# trên phạt đỉnh pi (w[i, j] = c[i, j] + pi[i] + pi[j]; mọi chu trình tăng đúng 2 * sum(pi) nên
+# 1-tree nhỏ nhất trừ 2 * sum(pi) vẫn là cận dưới). Chi phí có hướng được lấy min hai chiều.
+# Dùng cho:
+#   - Branch and Bound (node_penalties: pi tốt nhất ở gốc),
+#   - báo độ lệch (gap) của lời giải heuristic so với cận dưới, và dừng sớm khi gap đủ nhỏ
+#     (RunControl(gap=...), Solver(lower_bound=True)).
+
+BOUND_ITERATIONS = 200
+BOUND_TIME = 0.5            # giây tối đa cho subgradient; hết giờ thì dùng cận tốt nhất đã có
+BOUND_MAX_CITIES = 5000     # lớn hơn: ma trận n x n quá tốn, không tính cận
+
+
+def one_tree(w, root, pi=None):
+    # MST trên các đỉnh khác root + hai cạnh rẻ nhất từ root; trả về (trọng số, bậc).
+    # pi: phạt đỉnh, mỗi hàng w[j] + pi[j] + pi được tính khi cần thay vì dựng cả ma trận phạt
+    n = len(w)
+
+    def row(j):
+        return w[j].copy() if pi is None else w[j] + (pi[j] + pi)
+
+    degree = np.zeros(n, dtype=np.int64)
+    first = 1 if root == 0 else 0
+    in_tree = np.zeros(n, dtype=bool)
+    in_tree[[root, first]] = True
+    dist = row(first)
+    dist[in_tree] = np.inf
+    parent = np.full(n, first, dtype=np.int64)
+    total = 0.0
+    for _ in range(n - 2):
+        j = int(np.argmin(dist))
+        total += dist[j]
+        in_tree[j] = True
+        dist[j] = np.inf
+        degree[j] += 1
+        degree[parent[j]] += 1
+        r = row(j)
+        closer = r < dist
+        closer &= ~in_tree
+        dist[closer] = r[closer]
+        parent[closer] = j
+    r = row(root)
+    r[root] = np.inf
+    two = np.argpartition(r, 1)[:2]
+    total += r[two].sum()
+    degree[two] += 1
+    degree[root] = 2
+    return total, degree
+
+def ascent(sym, upper=np.inf, iterations=BOUND_ITERATIONS, deadline=None, control=None):
+    # Subgradient trên pi; trả về (cận tốt nhất, pi tốt nhất). deadline: time.monotonic()
+    n = len(sym)
+    pi = np.zeros(n)
+    best_pi, best_lb = pi.copy(), -np.inf
+    if n < 4:
+        if n == 3:
+            best_lb = one_tree(sym, 0)[0]
+        return best_lb, best_pi
+    step_scale, stall = 2.0, 0
+    for _ in range(iterations):
+        lb, degree = one_tree(sym, 0, pi)
+        lb -= 2 * pi.sum()
+        if not np.isfinite(lb):
+            break
+        if lb > best_lb + 1e-9:
+            best_lb, best_pi, stall = lb, pi.copy(), 0
+        else:
+            stall += 1
+            if stall >= max(n // 4, 5):
+                step_scale, stall = step_scale / 2, 0
+        g = degree - 2
+        norm = float(g @ g)
+        if norm == 0 or step_scale < 1e-4:
+            # Bậc mọi đỉnh bằng 2: 1-tree là một chu trình, cận bằng tối ưu
+            break
+        if deadline is not None and time.monotonic() >= deadline:
+            break
+        if control is not None and control.should_stop():
+            break
+        target = upper if np.isfinite(upper) else 1.05 * lb
+        pi = pi + step_scale * max(target - lb, 1e-6 * abs(lb)) / norm * g
+    return best_lb, best_pi
+
+def node_penalties(sym, upper=np.inf, iterations=BOUND_ITERATIONS):
+    # Tăng dần cận 1-tree Held-Karp bằng subgradient; trả về pi tốt nhất
+    return ascent(sym, upper, iterations)[1]
+
+def lower_bound(graph, upper=None, iterations=BOUND_ITERATIONS, time_limit=BOUND_TIME, control=None):
+    # -> cận dưới của chu trình tối ưu, hoặc None (bài toán quá lớn / quá nhỏ / không có chu trình)
+    inst = as_instance(graph)
+    if inst.n < 3 or inst.n > BOUND_MAX_CITIES:
+        return None
+    cost = inst.cost
+    sym = np.minimum(cost, cost.T)
+    deadline = None if time_limit is None else time.monotonic() + time_limit
+    lb, _ = ascent(sym, np.inf if upper is None else upper, iterations, deadline, control)
+    if not np.isfinite(lb):
+        return None
+    if inst.integral:
+        # Chi phí nguyên: chu trình tối ưu cũng nguyên, làm tròn lên (bỏ qua sai số dấu phẩy động)
+        lb = math.ceil(lb - 1e-6)
+    return inst.number(lb)
+
+def gap(cost, bound):
+    # Độ lệch (%) của chi phí so với cận dưới: chi phí tối ưu nằm trong [bound, cost]
+    if cost is None or bound is None or bound <= 0:
+        return None
+    # Chi phí thấp hơn cận chỉ có thể do sai số dấu phẩy động (cận đạt đúng tối ưu)
+    return max(0.0, 100.0 * (cost - bound) / bound)
@@ -0,0 +1,111 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from . import GBFS1, GBFS2Expan
+from .Control import SearchLimit, counters_of
+from .Instance import as_instance
+
+# GBFS đa điểm xuất phát: chạy GBFS từ mọi thành phố (hoặc một mẫu ngẫu nhiên) trên nhiều
+# tiến trình, lấy chu trình rẻ nhất rồi xoay về thành phố xuất phát được yêu cầu.
+# Chu trình giữ nguyên chi phí khi xoay, nên đây là lời giải hợp lệ cho điểm xuất phát đó.
+
+PARALLEL_MIN_CITIES = 200   # bài toán nhỏ hơn: chạy trong tiến trình hiện tại (tạo pool tốn hơn việc giải)
+CHUNKS_PER_WORKER = 16      # chia các điểm xuất phát thành từng lô: ít gửi nhận hơn, vẫn dừng kịp khi hết giờ
+
+def _gbfs(inst, start, max_nodes):
+    return GBFS1.greedy_best_first_search(inst, start)
+
+def _gbfs_backtrack(inst, start, max_nodes):
+    return GBFS2Expan.greedy_best_first_search_Ex(inst, start, max_nodes=max_nodes)
+
+VARIANTS = {
+    'gbfs': _gbfs,
+    'gbfs_backtrack': _gbfs_backtrack,
+}
+
+_worker_instance = None
+
+def _init_worker(inst):
+    global _worker_instance
+    _worker_instance = inst
+
+def _run_starts(variant, starts, max_nodes, inst=None):
+    # -> [(điểm xuất phát, path, cost)], path = None nếu không tìm được chu trình từ điểm đó
+    inst = _worker_instance if inst is None else inst
+    results = []
+    for start in starts:
+        try:
+            path, cost = VARIANTS[variant](inst, start, max_nodes)
+        except SearchLimit:
+            path, cost = None, None   # vượt max_nodes
+        results.append((start, path, cost))
+    return results
+
+def pick_starts(inst, start, sample=None, seed=None):
+    # sample: số điểm xuất phát (luôn gồm start); None = mọi thành phố
+    if sample is None or sample >= inst.n:
+        return list(inst.names)
+    rng = np.random.default_rng(seed)
+    others = np.delete(np.arange(inst.n), inst.index[start])
+    chosen = rng.choice(others, size=max(0, sample - 1), replace=False)
+    return [start] + inst.path_names(sorted(chosen.tolist()))
+
+def cost_summary(costs):
+    # Phân bố chi phí trên các điểm xuất phát (bỏ qua điểm không tìm được chu trình)
+    found = np.array([c for c in costs.values() if c is not None], dtype=np.float64)
+    summary = {'starts': len(costs), 'found': int(found.size)}
+    if found.size:
+        p10, p50, p90 = np.percentile(found, [10, 50, 90])
+        summary.update(min=float(found.min()), p10=float(p10), median=float(p50), p90=float(p90),
+                       max=float(found.max()), mean=float(found.mean()))
+    return summary
+
+def multi_start(graph, start, variant='gbfs', sample=None, seed=None, workers=None, max_nodes=None,
+                control=None):
+    # -> (path, cost, costs): chu trình tốt nhất bắt đầu tại start, costs = {điểm xuất phát: chi phí hoặc None}.
+    # Hết thời gian / bị hủy: trả về chu trình tốt nhất trong các điểm xuất phát đã chạy xong.
+    inst = as_instance(graph)
+    starts = pick_starts(inst, start, sample, seed)
+    workers = workers or os.cpu_count() or 1
+    counters = counters_of(control)
+
+    costs = {}
+    best = (None, np.inf, None)   # (path, cost, điểm xuất phát)
+
+    def collect(results):
+        nonlocal best
+        for origin, path, cost in results:
+            costs[origin] = cost
+            if path is not None and cost < best[1]:
+                best = (path, cost, origin)
+                if control is not None:
+                    control.incumbent(inst.rotate(path, start), cost, best_start=origin, starts=len(costs))
+        if control is not None:
+            control.progress(len(costs) / len(starts))
+        if counters is not None:
+            counters['starts'] += len(results)
+
+    if workers == 1 or inst.n < PARALLEL_MIN_CITIES:
+        for origin in starts:
+            if control is not None and control.should_stop():
+                break
+            collect(_run_starts(variant, [origin], max_nodes, inst))
+    else:
+        chunk = max(1, -(-len(starts) // (workers * CHUNKS_PER_WORKER)))
+        chunks = [starts[i:i + chunk] for i in range(0, len(starts), chunk)]
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks)), initializer=_init_worker,
+                                 initargs=(inst,)) as pool:
+            futures = [pool.submit(_run_starts, variant, part, max_nodes) for part in chunks]
+            for future in as_completed(futures):
+                collect(future.result())
+                if control is not None and control.should_stop():
+                    # Bỏ các lô chưa chạy; chỉ chờ các lô đang chạy dở
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    break
+
+    path, cost, _ = best
+    if path is None:
+        return None, None, costs
+    return inst.rotate(path, start), cost, costs
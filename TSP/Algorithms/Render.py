@@ -0,0 +1,125 @@
+import weakref
+
+import numpy as np
+from matplotlib.collections import LineCollection
+
+# Vẽ nhanh lên canvas matplotlib của GUI:
+# - Nền (các cạnh nét đứt, đỉnh, nhãn) được dựng một lần cho mỗi bài toán bằng
+#   LineCollection / scatter, lưu ảnh nền và chỉ blit lại lộ trình khi có kết quả mới.
+# - Mức chi tiết theo kích thước: bỏ nhãn trọng số, nhãn đỉnh và các cạnh không thuộc
+#   lộ trình khi đồ thị lớn (networkx vẽ từng cạnh, từng nhãn nên rất chậm).
+
+EDGE_LABEL_MAX_NODES = 15     # vẽ nhãn trọng số cạnh tới số đỉnh này
+NODE_LABEL_MAX_NODES = 60     # vẽ tên đỉnh tới số đỉnh này
+MAX_BACKGROUND_EDGES = 3000   # quá số cạnh này thì không vẽ cạnh nền
+
+
+def layout(inst):
+    # Tọa độ để vẽ; bài toán không có tọa độ (ma trận EXPLICIT) được xếp trên vòng tròn
+    if inst.coords is not None:
+        return np.asarray(inst.coords, dtype=np.float64)
+    angle = np.linspace(0, 2 * np.pi, inst.n, endpoint=False)
+    return np.column_stack([np.cos(angle), np.sin(angle)])
+
+
+class Layer:
+    # Dữ liệu nền của một bài toán, tính một lần
+    def __init__(self, inst):
+        self.xy = layout(inst)
+        self.n = inst.n
+        self.names = inst.names
+        self.segments = None
+        self.weights = None
+        if inst.derived:
+            edges = inst.n * (inst.n - 1) // 2
+            rows = cols = None
+        else:
+            rows, cols = np.nonzero(np.triu(inst.adj | inst.adj.T, 1))
+            edges = len(rows)
+        if edges <= MAX_BACKGROUND_EDGES:
+            if rows is None:
+                rows, cols = np.triu_indices(inst.n, 1)
+            self.segments = np.stack([self.xy[rows], self.xy[cols]], axis=1)
+            if inst.n <= EDGE_LABEL_MAX_NODES:
+                cost = np.where(inst.adj[rows, cols], inst.cost[rows, cols], inst.cost[cols, rows])
+                self.weights = [(x, y, inst.number(c)) for (x, y), c in
+                                zip(self.segments.mean(axis=1).tolist(), cost.tolist())]
+        small = inst.n <= EDGE_LABEL_MAX_NODES
+        self.node_size = 600 if small else (80 if inst.n <= NODE_LABEL_MAX_NODES else 10)
+        self.node_labels = inst.n <= NODE_LABEL_MAX_NODES
+
+
+class RouteRenderer:
+    def __init__(self, figure, canvas):
+        self.figure = figure
+        self.canvas = canvas
+        self.layers = weakref.WeakKeyDictionary()
+        self.clear()
+        canvas.mpl_connect('draw_event', self.on_draw)
+
+    def clear(self):
+        self.figure.clear()
+        self.inst = None
+        self.title = None
+        self.ax = None
+        self.route = None
+        self.background = None
+
+    def layer(self, inst):
+        if inst not in self.layers:
+            self.layers[inst] = Layer(inst)
+        return self.layers[inst]
+
+    def draw_background(self, inst, title):
+        self.clear()
+        layer = self.layer(inst)
+        ax = self.figure.add_subplot()
+        if layer.segments is not None:
+            ax.add_collection(LineCollection(layer.segments, colors='gray', linestyles='dashed',
+                                             linewidths=1, zorder=1))
+        ax.scatter(layer.xy[:, 0], layer.xy[:, 1], s=layer.node_size, c='lightgreen', zorder=3)
+        if layer.node_labels:
+            for (x, y), name in zip(layer.xy.tolist(), layer.names):
+                ax.text(x, y, name, fontsize=12 if layer.node_size >= 600 else 7,
+                        ha='center', va='center', zorder=4)
+        if layer.weights:
+            for x, y, w in layer.weights:
+                ax.text(x, y, str(w), fontsize=9, ha='center', va='center', zorder=2,
+                        bbox=dict(boxstyle='round', fc='white', ec='none'))
+        ax.set_title(title)
+        ax.set_aspect('equal', adjustable='datalim')
+        ax.autoscale_view()
+        ax.axis('off')
+        # Lộ trình là artist "animated": không nằm trong ảnh nền, được blit riêng
+        self.route = LineCollection([], colors='blue', linewidths=3 if layer.n <= NODE_LABEL_MAX_NODES else 1.5,
+                                    zorder=2, animated=True)
+        ax.add_collection(self.route, autolim=False)
+        self.inst, self.title, self.ax = inst, title, ax
+
+    def show(self, inst, path, title=''):
+        if inst is not self.inst or title != self.title:
+            self.draw_background(inst, title)
+        xy = self.layer(inst).xy
+        ids = inst.ids(path) if path else []
+        if len(ids) > 2 and ids[0] != ids[-1]:
+            # Lộ trình mở (GA, ...): vẽ cả cạnh quay về thành phố xuất phát
+            ids = ids + [ids[0]]
+        if len(ids) > 1:
+            self.route.set_segments(np.stack([xy[ids[:-1]], xy[ids[1:]]], axis=1))
+        else:
+            self.route.set_segments([])
+
+    def render(self):
+        if self.ax is None or self.background is None:
+            # Lần đầu hoặc sau khi đổi kích thước: vẽ toàn bộ, on_draw sẽ lưu lại nền
+            self.canvas.draw()
+            return
+        self.canvas.restore_region(self.background)
+        self.ax.draw_artist(self.route)
+        self.canvas.blit(self.ax.bbox)
+
+    def on_draw(self, event):
+        if self.ax is None:
+            return
+        self.background = self.canvas.copy_from_bbox(self.ax.bbox)
+        self.ax.draw_artist(self.route)
@@ -0,0 +1,139 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import closing
+
+from .Instance import as_instance
+from .Solvers import Result
+
+# Bộ nhớ đệm kết quả giải, khóa = (mã băm nội dung bài toán, thuật toán, tham số, seed[, điểm xuất phát]).
+#   - Tầng 1: LRU trong bộ nhớ (capacity mục).
+#   - Tầng 2: SQLite trên đĩa, giới hạn theo dung lượng (max_bytes): vượt quá thì xóa các mục
+#     lâu không dùng nhất.
+# Thuật toán cho cùng một chu trình với mọi điểm xuất phát (Solver.rotation_invariant: lời giải
+# tối ưu, GBFS từ mọi thành phố) được lưu một lần, không kèm điểm xuất phát, và được xoay về
+# thành phố xuất phát của mỗi lần hỏi.
+# Không lưu: lần chạy bị dừng giữa chừng (hết giờ / hủy) và thuật toán ngẫu nhiên không có seed cố định.
+
+RESULT_CACHE = "Algorithms/results_cache.sqlite"
+MEMORY_ENTRIES = 128
+MAX_BYTES = 64 << 20
+
+
+class ResultCache:
+    def __init__(self, path=RESULT_CACHE, capacity=MEMORY_ENTRIES, max_bytes=MAX_BYTES):
+        # path=None: chỉ dùng tầng bộ nhớ
+        self.path = path
+        self.capacity = capacity
+        self.max_bytes = max_bytes
+        self.memory = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = {'memory': 0, 'disk': 0}
+        self.misses = 0
+        if path is not None:
+            with closing(self.connect()) as db, db:
+                db.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, algorithm TEXT, "
+                           "value TEXT, size INTEGER, used REAL)")
+                db.execute("CREATE INDEX IF NOT EXISTS results_used ON results (used)")
+
+    def connect(self):
+        return sqlite3.connect(self.path)
+
+    def key(self, solver, inst, start, seed):
+        params = json.dumps(solver.params(), sort_keys=True, default=str)
+        parts = [inst.fingerprint(), solver.name, params, str(seed)]
+        if not solver.rotation_invariant:
+            parts.append(start)
+        return '|'.join(parts)
+
+    def get(self, key):
+        # -> (value, tầng) hoặc (None, None); value là dict như được lưu bởi put()
+        with self.lock:
+            if key in self.memory:
+                self.memory.move_to_end(key)
+                self.hits['memory'] += 1
+                return self.memory[key], 'memory'
+            if self.path is not None:
+                with closing(self.connect()) as db, db:
+                    row = db.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+                    if row is not None:
+                        db.execute("UPDATE results SET used = ? WHERE key = ?", (time.time(), key))
+                if row is not None:
+                    value = json.loads(row[0])
+                    self.remember(key, value)
+                    self.hits['disk'] += 1
+                    return value, 'disk'
+            self.misses += 1
+            return None, None
+
+    def put(self, key, algorithm, value):
+        data = json.dumps(value, ensure_ascii=False, default=float)
+        with self.lock:
+            self.remember(key, value)
+            if self.path is None:
+                return
+            with closing(self.connect()) as db, db:
+                db.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                           (key, algorithm, data, len(key) + len(data), time.time()))
+                self.evict(db)
+
+    def remember(self, key, value):
+        self.memory[key] = value
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.capacity:
+            self.memory.popitem(last=False)
+
+    def evict(self, db):
+        # Xóa các mục lâu không dùng nhất tới khi tổng dung lượng không vượt max_bytes
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        freed = 0
+        doomed = []
+        for key, size in db.execute("SELECT key, size FROM results ORDER BY used"):
+            if total - freed <= self.max_bytes:
+                break
+            doomed.append((key,))
+            freed += size
+        db.executemany("DELETE FROM results WHERE key = ?", doomed)
+
+    def clear(self):
+        with self.lock:
+            self.memory.clear()
+            if self.path is not None:
+                with closing(self.connect()) as db, db:
+                    db.execute("DELETE FROM results")
+
+    def solve(self, solver, graph, start, control=None, seed=None):
+        # Như solver.solve(), nhưng trả về kết quả đã lưu (xoay về start) nếu có
+        inst = as_instance(graph)
+        seed = solver.seed if seed is None else seed
+        if seed is None and solver.randomized:
+            return solver.solve(inst, start, control)
+        key = self.key(solver, inst, start, seed)
+        value, tier = self.get(key)
+        if value is not None:
+            path = None if value['path'] is None else inst.rotate(inst.path_names(value['path']), start)
+            if control is not None and control.counters is not None:
+                control.counters[f'cache_hits_{tier}'] += 1
+            bound = value.get('lower_bound')
+            if bound is None and solver.lower_bound:
+                # Kết quả được lưu khi chưa tính cận dưới: tính bây giờ và lưu kèm
+                bound = solver.compute_bound(inst, control)
+                self.put(key, solver.name, {**value, 'lower_bound': bound})
+            elif control is not None:
+                control.set_lower_bound(bound)
+            return Result(solver.name, path, value['cost'], value['stats'], seed, 0.0, tier, bound,
+                          value.get('trace'), value.get('island_traces'))
+
+        result = solver.solve(inst, start, control, seed)
+        # Dừng vì hết thời gian riêng của thuật toán (GA time_budget): kết quả phụ thuộc tốc độ máy
+        timed_out = bool(result.stats) and result.stats.get('stop') == 'time'
+        if (control is None or not control.should_stop()) and not timed_out:
+            path = inst.ids(result.path) if result.path else None
+            self.put(key, solver.name, {'path': path, 'cost': result.cost, 'stats': result.stats,
+                                        'lower_bound': result.lower_bound, 'trace': result.trace,
+                                        'island_traces': result.island_traces})
+        return result
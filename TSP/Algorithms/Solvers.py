@@ -0,0 +1,268 @@
+import random
+import time
+
+from . import Backtracking, BTTT, Christofides, GA, GBFS1, GBFS2Expan, HeldKarp, LocalSearch, LowerBound, MultiStart
+from .Control import SearchLimit
+from .Instance import as_instance
+
+# Giao diện chung cho mọi thuật toán: bài toán vào -> đối tượng Solver đã cấu hình -> Result.
+# Solver chỉ giữ tham số; mọi trạng thái của một lần chạy (lời giải tốt nhất, bộ sinh số ngẫu nhiên
+# có seed riêng) được tạo trong solve(), nên cùng một Solver có thể chạy đồng thời trên nhiều luồng
+# hoặc được gửi sang tiến trình khác.
+#
+#   solver = GASolver(time_budget=2.0, seed=1, local_search=True)
+#   result = solver.solve(inst, 'A', control)     # result.path, result.cost, result.stats, result.seed
+#   path, cost = result
+#
+# lower_bound=True: tính cận dưới 1-tree Held-Karp trước khi giải (result.lower_bound, result.gap tính bằng %);
+# nếu control có ngưỡng gap, thuật toán dừng sớm khi lời giải đã cách cận dưới không quá ngưỡng đó.
+
+
+class Result:
+    def __init__(self, algorithm, path, cost, stats=None, seed=None, elapsed=0.0, cached=None, lower_bound=None,
+                 trace=None, island_traces=None):
+        self.algorithm = algorithm
+        self.path = path
+        self.cost = cost
+        self.stats = stats
+        self.seed = seed        # seed thực sự đã dùng, để chạy lại đúng lời giải này
+        self.elapsed = elapsed  # giây
+        self.cached = cached    # None, 'memory' hoặc 'disk' nếu lấy từ ResultCache
+        self.lower_bound = lower_bound
+        self.trace = trace      # đường hội tụ (chi phí tốt nhất sau mỗi thế hệ) nếu thuật toán có
+        self.island_traces = island_traces   # đường hội tụ của từng đảo (GA mô hình đảo)
+
+    @property
+    def found(self):
+        return bool(self.path)
+
+    @property
+    def gap(self):
+        # % so với cận dưới; None nếu không có cận hoặc không có lời giải
+        return LowerBound.gap(self.cost if self.path else None, self.lower_bound)
+
+    def __iter__(self):
+        # Cho phép "path, cost = solver.solve(...)" như các hàm thuật toán
+        return iter((self.path, self.cost))
+
+    def __repr__(self):
+        return f"Result({self.algorithm!r}, cost={self.cost!r}, n={len(self.path) if self.path else 0})"
+
+
+class Solver:
+    name = None
+    exact = False          # lời giải tối ưu khi chạy xong
+    max_cities = None      # cỡ bài toán còn chạy được trong thời gian hợp lý
+    randomized = False     # dùng bộ sinh số ngẫu nhiên (seed)
+
+    def __init__(self, local_search=False, seed=None, lower_bound=False):
+        self.local_search = local_search
+        self.seed = seed
+        self.lower_bound = lower_bound
+
+    @property
+    def rotation_invariant(self):
+        # Cùng một chu trình (chỉ xoay vòng) với mọi thành phố xuất phát: lời giải tối ưu
+        return self.exact
+
+    def params(self):
+        # Tham số ảnh hưởng tới kết quả (khóa của ResultCache); số tiến trình và việc tính cận dưới thì không
+        return {key: value for key, value in vars(self).items()
+                if key not in ('seed', 'randomized', 'workers', 'lower_bound')}
+
+    def compute_bound(self, graph, control=None):
+        # Cận dưới (nếu lower_bound=True), báo cho control để dừng sớm theo ngưỡng gap
+        if not self.lower_bound:
+            return None
+        bound = LowerBound.lower_bound(graph, control=control)
+        if control is not None:
+            control.set_lower_bound(bound)
+        return bound
+
+    def solve(self, graph, start, control=None, seed=None):
+        seed = self.seed if seed is None else seed
+        if seed is None and self.randomized:
+            # Seed mới cho mỗi lần chạy, được ghi vào Result để có thể chạy lại
+            seed = random.SystemRandom().getrandbits(63)
+        t0 = time.perf_counter()
+        bound = self.compute_bound(graph, control)
+        path, cost, stats = self.run(graph, start, control, seed)
+        # Đường hội tụ dài: tách khỏi stats (được in ra nhật ký) sang Result
+        trace = stats.pop('trace', None) if stats else None
+        island_traces = stats.pop('island_traces', None) if stats else None
+        if path and self.local_search and not (control is not None and control.within_gap(cost)):
+            path, cost = LocalSearch.improve_tour(as_instance(graph), path, control=control)
+        return Result(self.name, path, cost, stats, seed, time.perf_counter() - t0, lower_bound=bound, trace=trace,
+                      island_traces=island_traces)
+
+    def run(self, graph, start, control, seed):
+        # -> (path, cost, stats hoặc None)
+        raise NotImplementedError
+
+
+class GBFSSolver(Solver):
+    name = 'gbfs'
+    max_cities = 100000
+
+    def __init__(self, spatial=None, **kwargs):
+        super().__init__(**kwargs)
+        self.spatial = spatial
+
+    def run(self, graph, start, control, seed):
+        path, cost = GBFS1.greedy_best_first_search(graph, start, control, self.spatial)
+        return path, cost, None
+
+
+class GBFSBacktrackSolver(Solver):
+    name = 'gbfs_backtrack'
+    max_cities = 500
+
+    def __init__(self, max_nodes=None, **kwargs):
+        super().__init__(**kwargs)
+        self.max_nodes = max_nodes
+
+    def run(self, graph, start, control, seed):
+        try:
+            path, cost = GBFS2Expan.greedy_best_first_search_Ex(graph, start, control, self.max_nodes)
+        except SearchLimit:
+            return None, None, {'stop': 'max_nodes'}
+        return path, cost, None
+
+
+class MultiStartSolver(Solver):
+    # GBFS (variant 'gbfs' hoặc 'gbfs_backtrack') từ mọi thành phố / sample thành phố, song song;
+    # stats là phân bố chi phí theo điểm xuất phát
+    name = 'gbfs_multistart'
+    max_cities = 1000
+
+    def __init__(self, variant='gbfs', sample=None, workers=None, max_nodes=None, **kwargs):
+        super().__init__(**kwargs)
+        self.variant = variant
+        self.sample = sample
+        self.workers = workers
+        self.max_nodes = max_nodes
+        self.randomized = sample is not None
+
+    @property
+    def rotation_invariant(self):
+        # Chạy từ mọi thành phố thì chu trình tốt nhất không phụ thuộc điểm xuất phát
+        # (tối ưu cục bộ sau đó thì có, vì nó bắt đầu từ chu trình đã xoay)
+        return self.sample is None and not self.local_search
+
+    def run(self, graph, start, control, seed):
+        path, cost, costs = MultiStart.multi_start(graph, start, self.variant, self.sample, seed, self.workers,
+                                                   self.max_nodes, control)
+        return path, cost, MultiStart.cost_summary(costs)
+
+
+class DoubleTreeSolver(Solver):
+    # Chu trình theo thứ tự duyệt MST (<= 2 x tối ưu với chi phí metric); stats['mst'] là cận dưới
+    name = 'double_tree'
+    max_cities = 10000
+
+    def run(self, graph, start, control, seed):
+        return Christofides.double_tree(graph, start, control)
+
+
+class ChristofidesSolver(Solver):
+    name = 'christofides'
+    max_cities = 10000
+
+    def __init__(self, matching='auto', **kwargs):
+        super().__init__(**kwargs)
+        self.matching = matching
+
+    def run(self, graph, start, control, seed):
+        return Christofides.christofides(graph, start, self.matching, control)
+
+
+class BTTTSolver(Solver):
+    name = 'bttt_gbfs'
+    # Giới hạn theo bộ nhớ: đường BTTT dựng ma trận chi phí / heuristic n x n đầy đủ (kèm ma trận adj và
+    # mảng tạm khi tính khoảng cách), khoảng 25 byte mỗi ô lúc cao điểm: 5000 thành phố ~ 600 MB
+    max_cities = 5000
+
+    def run(self, graph, start, control, seed):
+        path, cost = BTTT.greedy_best_first_search(graph, start, control)
+        return path, cost, None
+
+
+class BacktrackingSolver(Solver):
+    name = 'backtracking'
+    exact = True
+    max_cities = 10
+
+    def run(self, graph, start, control, seed):
+        path, cost = Backtracking.backtracking(graph, start, control)
+        return path, cost, None
+
+
+class BranchBoundSolver(Solver):
+    name = 'branch_bound'
+    exact = True
+    max_cities = 25
+
+    def __init__(self, bound='mst', **kwargs):
+        # bound: một trong Backtracking.BOUNDS ('reduction' chỉ để minh họa, quá chậm để chạy thật)
+        super().__init__(**kwargs)
+        if bound not in Backtracking.BOUNDS:
+            raise ValueError(f"Cận dưới không hợp lệ: {bound} (chọn {', '.join(Backtracking.BOUNDS)})")
+        self.bound = bound
+
+    def run(self, graph, start, control, seed):
+        return Backtracking.branch_and_bound(graph, start, self.bound, control)
+
+
+class HeldKarpSolver(Solver):
+    name = 'held_karp'
+    exact = True
+    max_cities = 20        # dưới 1 giây; HeldKarp.MAX_CITIES là giới hạn cứng theo bộ nhớ
+
+    def __init__(self, layered=None, memory_limit=HeldKarp.MEMORY_LIMIT, **kwargs):
+        super().__init__(**kwargs)
+        self.layered = layered
+        self.memory_limit = memory_limit
+
+    def run(self, graph, start, control, seed):
+        path, cost = HeldKarp.held_karp(graph, start, self.layered, self.memory_limit, control)
+        return path, cost, None
+
+
+class GASolver(Solver):
+    # pop_size / generations None: theo cỡ bài toán / chạy tới khi hội tụ; time_budget (giây) và
+    # max_evaluations giới hạn thêm. stats: số thế hệ, lý do dừng...; result.trace: đường hội tụ
+    name = 'ga'
+    max_cities = 1000
+    randomized = True
+
+    def __init__(self, pop_size=None, generations=None, mutation_rate=0.02, engine='numpy', islands=1,
+                 workers=None, time_budget=None, max_evaluations=None, stall=None, **kwargs):
+        super().__init__(**kwargs)
+        self.pop_size = pop_size
+        self.generations = generations
+        self.mutation_rate = mutation_rate
+        self.engine = engine
+        self.islands = islands
+        self.workers = workers
+        self.time_budget = time_budget
+        self.max_evaluations = max_evaluations
+        self.stall = stall
+
+    def run(self, graph, start, control, seed):
+        budget = dict(time_budget=self.time_budget, max_evaluations=self.max_evaluations, stall=self.stall)
+        if self.islands > 1:
+            return GA.island_model(start, self.islands, self.pop_size, self.generations, self.mutation_rate,
+                                   graph=graph, seed=seed, workers=self.workers, control=control, **budget)
+        return GA.genetic_algorithm(start, self.pop_size, self.generations, self.mutation_rate, self.engine,
+                                    graph, seed, control, **budget)
+
+
+SOLVERS = {cls.name: cls for cls in (GBFSSolver, GBFSBacktrackSolver, MultiStartSolver, DoubleTreeSolver,
+                                     ChristofidesSolver, BTTTSolver, BacktrackingSolver, BranchBoundSolver,
+                                     HeldKarpSolver, GASolver)}
+
+
+def make_solver(name, **params):
+    if name not in SOLVERS:
+        raise ValueError(f"Thuật toán không hợp lệ: {name}")
+    return SOLVERS[name](**params)
@@ -0,0 +1,154 @@
+import math
+
+from .Control import counters_of
+
+# Chỉ mục lưới đều trên tọa độ, hỗ trợ xóa điểm: truy vấn "thành phố chưa đi gần nhất"
+# chỉ xét các ô quanh điểm hiện tại theo từng vành, thay vì quét cả hàng của ma trận.
+# Dùng cho GBFS trên bài toán lớn (100k điểm) vốn không thể dựng ma trận n x n.
+
+PER_CELL = 2            # số điểm trung bình mỗi ô khi dựng lưới
+REBUILD_FACTOR = 4      # dựng lại lưới khi số điểm còn lại giảm đi chừng này lần
+SPATIAL_MIN_CITIES = 2000
+
+
+class GridIndex:
+    def __init__(self, coords, ids=None):
+        self.xs = coords[:, 0].tolist()
+        self.ys = coords[:, 1].tolist()
+        self.cell_of = [0] * len(self.xs)
+        self.slot = [0] * len(self.xs)
+        self.rebuilds = 0
+        self.build(list(range(len(self.xs))) if ids is None else list(ids))
+
+    def build(self, ids):
+        xs, ys = self.xs, self.ys
+        self.count = len(ids)
+        if ids:
+            self.x0 = min(xs[i] for i in ids)
+            self.y0 = min(ys[i] for i in ids)
+            width = max(xs[i] for i in ids) - self.x0
+            height = max(ys[i] for i in ids) - self.y0
+        else:
+            self.x0 = self.y0 = width = height = 0.0
+        side = max(1, int(math.sqrt(len(ids) / PER_CELL)))
+        self.size = max(width, height) / side or 1.0
+        self.cols = min(side, int(width / self.size) + 1)
+        self.rows = min(side, int(height / self.size) + 1)
+        self.cells = [[] for _ in range(self.cols * self.rows)]
+        self.built_count = len(ids)
+        for i in ids:
+            c = self.cell(xs[i], ys[i])
+            self.cell_of[i] = c
+            self.slot[i] = len(self.cells[c])
+            self.cells[c].append(i)
+
+    def cell_xy(self, x, y):
+        cx = min(self.cols - 1, max(0, int((x - self.x0) / self.size)))
+        cy = min(self.rows - 1, max(0, int((y - self.y0) / self.size)))
+        return cx, cy
+
+    def cell(self, x, y):
+        cx, cy = self.cell_xy(x, y)
+        return cy * self.cols + cx
+
+    def remove(self, i):
+        # Xóa O(1): đổi chỗ với phần tử cuối của ô
+        bucket = self.cells[self.cell_of[i]]
+        last = bucket.pop()
+        if last != i:
+            bucket[self.slot[i]] = last
+            self.slot[last] = self.slot[i]
+        self.count -= 1
+        if self.count and self.count * REBUILD_FACTOR < self.built_count:
+            # Lưới thưa dần: dựng lại trên các điểm còn lại để vành tìm kiếm không phải quét ô rỗng
+            self.rebuilds += 1
+            self.build([j for bucket in self.cells for j in bucket])
+
+    def nearest(self, x, y):
+        # Quét các vành ô r = 0, 1, 2...; dừng khi vành kế tiếp chắc chắn xa hơn điểm tốt nhất
+        if not self.count:
+            return -1, 0
+        xs, ys, cells, cols, rows = self.xs, self.ys, self.cells, self.cols, self.rows
+        cx, cy = self.cell_xy(x, y)
+        best, best_d = -1, math.inf
+        scanned = 0
+        r = 0
+        limit = max(cx, cols - 1 - cx, cy, rows - 1 - cy)
+        while r <= limit:
+            for gy in range(max(0, cy - r), min(rows - 1, cy + r) + 1):
+                row = gy * cols
+                edge = gy == cy - r or gy == cy + r
+                step = 1 if edge else 2 * r
+                for gx in range(cx - r, cx + r + 1, step):
+                    if gx < 0 or gx >= cols:
+                        continue
+                    scanned += 1
+                    for j in cells[row + gx]:
+                        d = (xs[j] - x) ** 2 + (ys[j] - y) ** 2
+                        if d < best_d or (d == best_d and j < best):
+                            best, best_d = j, d
+            if best >= 0 and best_d <= (r * self.size) ** 2:
+                break
+            r += 1
+        return best, scanned
+
+    def k_nearest(self, i, k):
+        # k điểm gần i nhất (trừ i), gần trước: quét vành như nearest, dừng khi đã có k ứng viên
+        # và điểm thứ k không xa hơn khoảng cách tới vành kế tiếp
+        xs, ys, cells, cols, rows = self.xs, self.ys, self.cells, self.cols, self.rows
+        x, y = xs[i], ys[i]
+        cx, cy = self.cell_xy(x, y)
+        found = []
+        r = 0
+        limit = max(cx, cols - 1 - cx, cy, rows - 1 - cy)
+        while r <= limit:
+            for gy in range(max(0, cy - r), min(rows - 1, cy + r) + 1):
+                row = gy * cols
+                edge = gy == cy - r or gy == cy + r
+                step = 1 if edge else 2 * r
+                for gx in range(cx - r, cx + r + 1, step):
+                    if gx < 0 or gx >= cols:
+                        continue
+                    for j in cells[row + gx]:
+                        if j != i:
+                            found.append(((xs[j] - x) ** 2 + (ys[j] - y) ** 2, j))
+            if len(found) >= k:
+                found.sort()
+                del found[k:]
+                if found[-1][0] <= (r * self.size) ** 2:
+                    break
+            r += 1
+        found.sort()
+        return [j for _, j in found[:k]]
+
+    def k_nearest_all(self, k):
+        return [self.k_nearest(i, k) for i in range(len(self.xs))]
+
+
+def use_spatial(inst):
+    return inst.planar and inst.n >= SPATIAL_MIN_CITIES
+
+
+def greedy_nearest(inst, start, control=None):
+    # GBFS trên đồ thị đầy đủ theo tọa độ: luôn đi tới thành phố chưa đi gần nhất
+    s = inst.index[start]
+    index = GridIndex(inst.coords)
+    index.remove(s)
+    path = [s]
+    current = s
+    counters = counters_of(control)
+    scanned = 0
+    for step in range(inst.n - 1):
+        if control is not None and step % 1024 == 0:
+            control.check()
+            control.progress(step / inst.n)
+        current, cells = index.nearest(index.xs[current], index.ys[current])
+        scanned += cells
+        index.remove(current)
+        path.append(current)
+    path.append(s)
+    if counters is not None:
+        counters['heap_pops'] += inst.n - 1
+        counters['cells_scanned'] += scanned
+        counters['grid_rebuilds'] += index.rebuilds
+    return inst.path_names(path), inst.tour_cost(path[:-1])
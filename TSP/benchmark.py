@@ -0,0 +1,300 @@
+import argparse
+import csv
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from Algorithms.Control import Cancelled, RunControl
+from Algorithms.Instance import random_uniform, random_clustered
+from Algorithms.Loader import load_instance
+from Algorithms.LowerBound import gap as bound_gap, lower_bound
+from Algorithms.Solvers import (BacktrackingSolver, BranchBoundSolver, BTTTSolver, ChristofidesSolver, DoubleTreeSolver,
+                                GASolver, GBFSBacktrackSolver, GBFSSolver, HeldKarpSolver, MultiStartSolver)
+
+# Benchmark không cần GUI: sinh bài toán ngẫu nhiên có seed, chạy mọi thuật toán với
+# warmup + lặp lại, đo bằng perf_counter_ns, ghi JSON/CSV và so sánh với baseline.
+#
+#   python benchmark.py --sizes 6,10,20,100,1000 --repeats 5 --json out.json
+#   python benchmark.py --sizes 10000 --algorithms gbfs,gbfs_2opt
+#   python benchmark.py --sizes 100000 --algorithms gbfs
+#   python benchmark.py --baseline out.json --json new.json
+#   python benchmark.py --files data/berlin52.tsp,data/points.csv --algorithms gbfs,gbfs_2opt
+#   python benchmark.py --startup --repeats 10     (thời gian import nguội của từng module)
+#   python benchmark.py --sizes 100,1000 --bound --gap 5   (gap so với cận dưới, dừng khi gap <= 5%)
+
+GENERATORS = {
+    'uniform': random_uniform,
+    'clustered': random_clustered,
+}
+
+
+# tên -> solver; số thành phố tối đa và lời giải tối ưu hay không lấy từ solver.max_cities / solver.exact
+ALGORITHMS = {
+    'gbfs': GBFSSolver(),
+    'gbfs_backtrack': GBFSBacktrackSolver(),
+    'bttt_gbfs': BTTTSolver(),
+    'gbfs_2opt': GBFSSolver(local_search=True),
+    'gbfs_multistart': MultiStartSolver(),
+    'double_tree': DoubleTreeSolver(),
+    'christofides': ChristofidesSolver(),
+    'christofides_greedy': ChristofidesSolver(matching='greedy'),
+    'christofides_2opt': ChristofidesSolver(local_search=True),
+    'backtracking': BacktrackingSolver(),
+    'branch_bound': BranchBoundSolver(),
+    'held_karp': HeldKarpSolver(),
+    'ga': GASolver(seed=0),
+}
+
+# Giới hạn cỡ riêng khi khác solver.max_cities
+MAX_CITIES = {
+    'gbfs_2opt': 10000,   # 2-opt / Or-opt là vòng lặp Python thuần: chậm dần trên bài toán lớn hơn
+}
+
+
+def max_cities(name):
+    return MAX_CITIES.get(name, ALGORITHMS[name].max_cities)
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    k = min(len(ordered) - 1, max(0, int(round(q / 100 * (len(ordered) - 1)))))
+    return ordered[k]
+
+
+def time_one(solver, inst, start, time_budget, bound=None, gap=None):
+    # bound: cận dưới đã tính trước cho bài toán; gap: dừng sớm khi lời giải cách cận không quá gap%
+    control = RunControl(time_budget, gap=gap)
+    control.set_lower_bound(bound)
+    t0 = time.perf_counter_ns()
+    path, cost = solver.solve(inst, start, control)
+    elapsed = time.perf_counter_ns() - t0
+    return elapsed, path, cost, 'gap' if control.gap_reached else control.should_stop()
+
+
+def bench_algorithm(name, inst, warmup, repeats, time_budget, memory, counters=False, bound=None, gap=None):
+    solver = ALGORITHMS[name]
+    start = inst.names[0]
+    try:
+        for _ in range(warmup):
+            time_one(solver, inst, start, time_budget, bound, gap)
+        times = []
+        for _ in range(repeats):
+            elapsed, path, cost, stopped = time_one(solver, inst, start, time_budget, bound, gap)
+            times.append(elapsed)
+    except Cancelled:
+        return {'status': 'timeout'}
+
+    row = {
+        'status': 'gap' if stopped == 'gap' else ('stopped' if stopped else ('ok' if path else 'no_tour')),
+        'median_ms': statistics.median(times) / 1e6,
+        'p95_ms': percentile(times, 95) / 1e6,
+        'cost': float(cost) if path else None,
+    }
+    if memory:
+        # Đo bộ nhớ ở lượt riêng vì tracemalloc làm chậm đáng kể
+        tracemalloc.start()
+        try:
+            solver.solve(inst, start, RunControl(time_budget))
+        except Cancelled:
+            pass
+        row['peak_kb'] = tracemalloc.get_traced_memory()[1] / 1024
+        tracemalloc.stop()
+    if counters:
+        control = RunControl(time_budget, instrument=True)
+        try:
+            with control.section('solve'):
+                solver.solve(inst, start, control)
+        except Cancelled:
+            pass
+        row['counters'] = dict(control.counters)
+    return row
+
+
+# ==== Thời gian khởi động: import nguội mỗi module trong một tiến trình Python mới ====
+
+STARTUP_MODULES = ['Algorithms.Instance', 'Algorithms.Loader', 'Algorithms.GBFS1', 'Algorithms.GBFS2',
+                   'Algorithms.GBFS2Expan', 'Algorithms.GBFS3', 'Algorithms.Christofides', 'Algorithms.Backtracking',
+                   'Algorithms.HeldKarp', 'Algorithms.GA', 'Algorithms.BTTT', 'Algorithms.LocalSearch',
+                   'Algorithms.LowerBound', 'main']
+# Thư viện GUI / vẽ không được phép nạp khi chỉ import phần giải
+HEAVY_MODULES = ['PySide6', 'matplotlib', 'networkx', 'folium']
+
+STARTUP_SCRIPT = """
+import sys, time
+t0 = time.perf_counter_ns()
+import {module}
+elapsed = time.perf_counter_ns() - t0
+print(elapsed, ','.join(m for m in {heavy!r} if m in sys.modules))
+"""
+
+
+def time_import(module):
+    script = STARTUP_SCRIPT.format(module=module, heavy=HEAVY_MODULES)
+    done = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True,
+                          cwd=os.path.dirname(os.path.abspath(__file__)))
+    if done.returncode != 0:
+        return None, done.stderr.strip().splitlines()[-1:]
+    elapsed, _, heavy = done.stdout.strip().partition(' ')
+    return int(elapsed), heavy.split(',') if heavy else []
+
+
+def run_startup(modules, repeats, log=print):
+    results = []
+    for module in modules:
+        times = []
+        for _ in range(repeats):
+            elapsed, heavy = time_import(module)
+            if elapsed is None:
+                break
+            times.append(elapsed)
+        if not times:
+            row = {'status': 'error', 'error': ' '.join(heavy)}
+        else:
+            row = {'status': 'ok', 'median_ms': statistics.median(times) / 1e6,
+                   'p95_ms': percentile(times, 95) / 1e6, 'heavy_modules': ';'.join(heavy)}
+        row.update({'kind': 'startup', 'n': 0, 'seed': None, 'algorithm': module})
+        results.append(row)
+        log(f"startup   {module:25s} {row['status']:6s} median={row.get('median_ms', float('nan')):8.1f} ms  "
+            f"nạp: {row.get('heavy_modules') or row.get('error') or '-'}")
+    return results
+
+
+def generated(sizes, kinds, seed):
+    for kind in kinds:
+        for n in sizes:
+            yield kind, seed + n, GENERATORS[kind](n, seed=seed + n)
+
+
+def loaded(files):
+    for path in files:
+        yield path, None, load_instance(path)
+
+
+def run_suite(sizes, kinds, algorithms, seed, warmup, repeats, time_budget, memory, counters=False, log=print,
+              files=None, bound=False, gap=None):
+    results = []
+    instances = loaded(files) if files else generated(sizes, kinds, seed)
+    for kind, inst_seed, inst in instances:
+        n = inst.n
+        rows = []
+        # Cận dưới tính một lần cho mỗi bài toán, dùng chung cho mọi thuật toán
+        lb = None
+        if bound or gap is not None:
+            t0 = time.perf_counter_ns()
+            lb = lower_bound(inst)
+            log(f"{kind:9s} n={n:<6d} {'lower_bound':15s} {(time.perf_counter_ns() - t0) / 1e6:10.3f} ms  "
+                f"bound={lb}")
+        for name in algorithms:
+            if n > max_cities(name):
+                continue
+            row = bench_algorithm(name, inst, warmup, repeats, time_budget, memory, counters, lb, gap)
+            row.update({'kind': kind, 'n': n, 'seed': inst_seed, 'algorithm': name})
+            if lb is not None:
+                row['lower_bound'] = float(lb)
+                row['bound_gap_pct'] = bound_gap(row.get('cost'), lb)
+            rows.append(row)
+            log(f"{kind:9s} n={n:<6d} {name:15s} {row['status']:8s} "
+                f"median={row.get('median_ms', float('nan')):10.3f} ms  cost={row.get('cost')}"
+                + (f"  gap={row['bound_gap_pct']:.2f}%" if row.get('bound_gap_pct') is not None else ''))
+
+        # Lời giải tốt nhất đã biết: tối ưu nếu có thuật toán chính xác chạy xong, nếu không thì min
+        exact = [r['cost'] for r in rows if r.get('cost') is not None and r['status'] == 'ok'
+                 and ALGORITHMS[r['algorithm']].exact]
+        known = [r['cost'] for r in rows if r.get('cost') is not None]
+        best = min(exact) if exact else (min(known) if known else None)
+        for r in rows:
+            r['best_known'] = best
+            r['gap_pct'] = None if r.get('cost') is None or not best else 100 * (r['cost'] - best) / best
+        results.extend(rows)
+    return results
+
+
+def compare(results, baseline, threshold):
+    # So sánh median với baseline theo (kind, n, algorithm); trả về các dòng chậm hơn ngưỡng
+    old = {(r['kind'], r['n'], r['algorithm']): r for r in baseline}
+    regressions = []
+    for r in results:
+        b = old.get((r['kind'], r['n'], r['algorithm']))
+        if not b or r.get('median_ms') is None or not b.get('median_ms'):
+            continue
+        r['baseline_ms'] = b['median_ms']
+        r['ratio'] = r['median_ms'] / b['median_ms']
+        if r['ratio'] > threshold:
+            regressions.append(r)
+    return regressions
+
+
+def write_csv(path, results):
+    fields = ['kind', 'n', 'seed', 'algorithm', 'status', 'median_ms', 'p95_ms', 'cost',
+              'best_known', 'gap_pct', 'lower_bound', 'bound_gap_pct', 'peak_kb', 'baseline_ms', 'ratio', 'heavy_modules']
+    # Bộ đếm được trải thành các cột counter_<tên>
+    names = sorted({key for r in results for key in r.get('counters', {})})
+    fields += [f'counter_{key}' for key in names]
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=fields, extrasaction='ignore')
+        writer.writeheader()
+        for r in results:
+            writer.writerow({**r, **{f'counter_{k}': v for k, v in r.get('counters', {}).items()}})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark các thuật toán TSP (không cần GUI).")
+    parser.add_argument('--sizes', default='6,10,20,50,100,1000',
+                        help="danh sách số thành phố, ví dụ 6,10,100,10000")
+    parser.add_argument('--kinds', default='uniform,clustered')
+    parser.add_argument('--algorithms', default=','.join(ALGORITHMS))
+    parser.add_argument('--files', help="danh sách file TSPLIB (.tsp) / CSV, thay cho bài toán ngẫu nhiên")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--time-budget', type=float, default=60.0, help="giây cho mỗi lần chạy")
+    parser.add_argument('--memory', action='store_true', help="thêm lượt đo bộ nhớ đỉnh bằng tracemalloc")
+    parser.add_argument('--counters', action='store_true', help="thêm lượt chạy có bộ đếm công việc")
+    parser.add_argument('--bound', action='store_true',
+                        help="tính cận dưới 1-tree Held-Karp và gap (%%) của mỗi thuật toán so với cận đó")
+    parser.add_argument('--gap', type=float,
+                        help="dừng thuật toán khi lời giải cách cận dưới không quá ngưỡng này (%%)")
+    parser.add_argument('--startup', action='store_true',
+                        help="đo thời gian import nguội của các module (thay cho chạy thuật toán)")
+    parser.add_argument('--json', help="ghi kết quả JSON")
+    parser.add_argument('--csv', help="ghi kết quả CSV")
+    parser.add_argument('--baseline', help="file JSON kết quả cũ để so sánh")
+    parser.add_argument('--threshold', type=float, default=1.2, help="tỉ lệ chậm hơn baseline bị coi là hồi quy")
+    args = parser.parse_args(argv)
+
+    sizes = [int(x) for x in args.sizes.split(',')]
+    kinds = args.kinds.split(',')
+    algorithms = args.algorithms.split(',')
+    for name in algorithms:
+        if name not in ALGORITHMS:
+            parser.error(f"thuật toán không hợp lệ: {name}")
+
+    if args.startup:
+        results = run_startup(STARTUP_MODULES, args.repeats)
+    else:
+        results = run_suite(sizes, kinds, algorithms, args.seed, args.warmup, args.repeats,
+                            args.time_budget, args.memory, args.counters,
+                            files=args.files.split(',') if args.files else None, bound=args.bound, gap=args.gap)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = compare(results, json.load(f)['results'], args.threshold)
+        for r in regressions:
+            print(f">> Chậm hơn baseline: {r['kind']} n={r['n']} {r['algorithm']} "
+                  f"{r['baseline_ms']:.3f} -> {r['median_ms']:.3f} ms (x{r['ratio']:.2f})")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'args': vars(args), 'results': results}, f, indent=2, ensure_ascii=False)
+    if args.csv:
+        write_csv(args.csv, results)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
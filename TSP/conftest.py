@@ -0,0 +1 @@
+# Thư mục gốc của pytest: chạy được "pytest" từ TSP/ mà import được gói Algorithms
@@ -1,18 +1,115 @@
+import importlib
 import sys
 import os
 import webbrowser
 import time
 import tracemalloc
 
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, QTimer, Signal
 from PySide6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
-    QLineEdit, QTextEdit, QLabel, QFileDialog
+    QLineEdit, QTextEdit, QLabel, QFileDialog, QCheckBox, QProgressBar, QSpinBox, QDoubleSpinBox
 )
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
 
+from Algorithms.Control import Cancelled, RunControl
+from Algorithms.Loader import load_instance
+from Algorithms.Render import RouteRenderer
+
+
+class LazyModule:
+    # Module thuật toán chỉ được nạp ở lần dùng đầu tiên (nhấn nút), để cửa sổ mở nhanh
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+
 # Các thuật toán
-from Algorithms import GBFS1, GBFS2, GBFS2Expan, GBFS3, Backtracking, GA, BTTT
+GBFS1 = LazyModule('Algorithms.GBFS1')
+GBFS2 = LazyModule('Algorithms.GBFS2')
+GBFS2Expan = LazyModule('Algorithms.GBFS2Expan')
+GBFS3 = LazyModule('Algorithms.GBFS3')
+Backtracking = LazyModule('Algorithms.Backtracking')
+GA = LazyModule('Algorithms.GA')
+BTTT = LazyModule('Algorithms.BTTT')
+LowerBound = LazyModule('Algorithms.LowerBound')
+Solvers = LazyModule('Algorithms.Solvers')
+ResultCache = LazyModule('Algorithms.ResultCache')
+
+FRAME_INTERVAL_MS = 50   # vẽ lời giải tạm thời tối đa 20 khung hình/giây
+
+
+def result_stats(result):
+    # Thống kê ghi vào lịch sử chạy; đánh dấu kết quả lấy từ bộ nhớ đệm
+    if result.cached:
+        return {**(result.stats or {}), 'kết quả': f"lấy từ bộ nhớ đệm ({result.cached})"}
+    return result.stats
+
+
+# ==== Chạy thuật toán trên luồng nền ====
+class WorkerSignals(QObject):
+    progress = Signal(float)
+    incumbent = Signal(object)
+    finished = Signal(object)
+    failed = Signal(object)
+
+
+class SolverWorker(QRunnable):
+    def __init__(self, algorithm_name, job, show, control, done=None, failed=None):
+        super().__init__()
+        self.algorithm_name = algorithm_name
+        self.job = job
+        self.show = show
+        self.control = control
+        self.done = done
+        self.failed = failed
+        self.signals = WorkerSignals()
+        control.on_progress = self.signals.progress.emit
+        control.on_incumbent = lambda path, cost, metrics: self.signals.incumbent.emit((show, path, cost, metrics))
+
+    def run(self):
+        if self.control.cancelled:
+            self.signals.failed.emit((self.algorithm_name, self.control, "Đã hủy trước khi chạy."))
+            return
+        # Thời gian và bộ nhớ chỉ tính từ lúc job thực sự bắt đầu (không tính thời gian chờ hàng đợi)
+        self.control.start()
+        tracemalloc.start()
+        start_time = time.time()
+        try:
+            result = self.job(self.control)
+        except Cancelled as e:
+            self.signals.failed.emit((self.algorithm_name, self.control, str(e)))
+        except Exception as e:
+            self.signals.failed.emit((self.algorithm_name, self.control, f"Lỗi: {e}"))
+        else:
+            elapsed = time.time() - start_time
+            memory = tracemalloc.get_traced_memory()
+            self.signals.finished.emit((self.algorithm_name, self.show, self.control, result, elapsed, memory))
+        finally:
+            tracemalloc.stop()
+
+
+class BackgroundTask(QRunnable):
+    # Việc phụ không thuộc hàng đợi thuật toán (ví dụ tạo bản đồ HTML)
+    def __init__(self, func):
+        super().__init__()
+        self.func = func
+        self.signals = WorkerSignals()
+
+    def run(self):
+        try:
+            result = self.func()
+        except Exception as e:
+            self.signals.failed.emit(f"Lỗi: {e}")
+        else:
+            self.signals.finished.emit(result)
+
 
 class TSP_GUI(QWidget):
     def __init__(self):
@@ -21,6 +118,25 @@ class TSP_GUI(QWidget):
         self.resize(1400, 600)
 
         self.current_algorithm_func = None
+        self.loaded_instance = None
+
+        # Hàng đợi chạy tuần tự: nhấn nhiều nút liên tiếp sẽ chạy lần lượt
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(1)
+        self.controls = []
+        self.workers = {}
+        self.tasks = set()
+        self.result_cache = None
+        # Bản đồ HTML của BTTT được dựng lần lượt từng cái (cùng ghi một file); yêu cầu đến khi đang dựng
+        # chỉ giữ cái mới nhất, các yêu cầu cũ hơn bị bỏ
+        self.pending_map = None
+        self.map_building = False
+
+        # Lời giải tạm thời mới nhất chờ vẽ; bộ định thời gộp các lần cập nhật, vẽ tối đa 20 khung hình/giây
+        self.pending_frame = None
+        self.frame_timer = QTimer(self)
+        self.frame_timer.setInterval(FRAME_INTERVAL_MS)
+        self.frame_timer.timeout.connect(self.draw_frame)
 
         main_layout = QHBoxLayout(self)
 
@@ -31,7 +147,11 @@ class TSP_GUI(QWidget):
             ("GBFS: Trường hợp 2", self.run_gbfs2),
             ("GBFS: Mở rộng Trường hợp 2", self.run_gbfs2ex),
             ("GBFS: Trường hợp 3", self.run_gbfs3),
+            ("Double-tree (MST)", self.run_double_tree),
+            ("Christofides", self.run_christofides),
             ("Backtracking", self.run_backtracking),
+            ("Branch and Bound", self.run_branch_bound),
+            ("Held-Karp (Quy hoạch động)", self.run_held_karp),
             ("GA", self.run_ga),
             ("Bài toán thực tế", self.run_bttt),
         ]
@@ -47,6 +167,7 @@ class TSP_GUI(QWidget):
         # Vùng vẽ matplotlib
         self.figure = Figure()
         self.canvas = FigureCanvas(self.figure)
+        self.renderer = RouteRenderer(self.figure, self.canvas)
         self.center_panel.addWidget(self.canvas)
 
         # Nhập thành phố xuất phát
@@ -55,12 +176,79 @@ class TSP_GUI(QWidget):
         self.input_start.returnPressed.connect(self.trigger_current_algorithm)
         self.center_panel.addWidget(self.input_start)
 
+        # Nạp bài toán từ file; khi đã nạp, các thuật toán chạy trên bài toán này thay cho dữ liệu mẫu
+        file_row = QHBoxLayout()
+        self.open_file_btn = QPushButton("Mở file bài toán (TSPLIB/CSV)")
+        self.open_file_btn.clicked.connect(self.open_instance)
+        file_row.addWidget(self.open_file_btn)
+        self.unload_btn = QPushButton("Dùng dữ liệu mẫu")
+        self.unload_btn.clicked.connect(self.unload_instance)
+        file_row.addWidget(self.unload_btn)
+        self.file_label = QLabel("Dữ liệu mẫu")
+        file_row.addWidget(self.file_label, 1)
+        self.center_panel.addLayout(file_row)
+
+        # Tối ưu cục bộ sau khi giải (GBFS, GA, BTTT)
+        self.local_search_box = QCheckBox("Tối ưu cục bộ 2-opt / Or-opt sau khi giải")
+        self.center_panel.addWidget(self.local_search_box)
+
+        # GBFS từ mọi thành phố xuất phát, song song trên nhiều tiến trình; giữ chu trình tốt nhất
+        self.multi_start_box = QCheckBox("GBFS đa điểm xuất phát (chạy song song từ mọi thành phố)")
+        self.center_panel.addWidget(self.multi_start_box)
+
+        # Dùng lại kết quả đã giải (cùng bài toán, thuật toán, tham số, seed), lưu cả trên đĩa
+        self.cache_box = QCheckBox("Dùng lại kết quả đã lưu")
+        self.cache_box.setChecked(True)
+        self.center_panel.addWidget(self.cache_box)
+
+        # Cận dưới 1-tree Held-Karp: báo độ lệch (gap) của lời giải, dừng sớm khi gap đủ nhỏ
+        bound_row = QHBoxLayout()
+        self.bound_box = QCheckBox("Tính cận dưới và độ lệch (gap)")
+        bound_row.addWidget(self.bound_box)
+        bound_row.addWidget(QLabel("Dừng khi gap ≤ (%, 0 = không dừng):"))
+        self.gap_target = QDoubleSpinBox()
+        self.gap_target.setRange(0, 100)
+        self.gap_target.setSingleStep(0.5)
+        bound_row.addWidget(self.gap_target)
+        self.center_panel.addLayout(bound_row)
+
+        # Bộ đếm công việc của thuật toán + thời gian giải / vẽ / render
+        self.counters_box = QCheckBox("Ghi thống kê chi tiết (bộ đếm, thời gian vẽ)")
+        self.center_panel.addWidget(self.counters_box)
+
+        # Giới hạn thời gian mỗi lần chạy, tiến độ và nút dừng
+        run_row = QHBoxLayout()
+        run_row.addWidget(QLabel("Giới hạn thời gian (giây, 0 = không giới hạn):"))
+        self.time_budget = QSpinBox()
+        self.time_budget.setRange(0, 3600)
+        run_row.addWidget(self.time_budget)
+        self.progress_bar = QProgressBar()
+        run_row.addWidget(self.progress_bar)
+        self.cancel_btn = QPushButton("Dừng thuật toán")
+        self.cancel_btn.clicked.connect(self.cancel_runs)
+        run_row.addWidget(self.cancel_btn)
+        self.center_panel.addLayout(run_row)
+
         # Nhập danh sách quận cho BTTT
         self.input_districts = QTextEdit()
         self.input_districts.setPlaceholderText("Chỉ dành cho BTTT: Nhập danh sách quận, cách nhau bằng dấu phẩy")
         self.input_districts.setVisible(False)
         self.center_panel.addWidget(self.input_districts)
 
+        # Nguồn khoảng cách đường đi cho BTTT: bảng có sẵn, file ma trận hoặc dịch vụ định tuyến
+        self.distance_source = QLineEdit()
+        self.distance_source.setPlaceholderText(
+            "Chỉ dành cho BTTT: nguồn khoảng cách (để trống = bảng có sẵn, file .npz / thư mục, hoặc URL định tuyến)")
+        self.distance_source.setVisible(False)
+        self.center_panel.addWidget(self.distance_source)
+        self.current_distance_source = 'table'
+
+        # BTTT: khi đổi danh sách quận, sửa lộ trình lần trước (chèn / bỏ quận) thay vì giải lại từ đầu
+        self.incremental_box = QCheckBox("Chỉ dành cho BTTT: cập nhật lộ trình trước khi thêm / bớt quận")
+        self.incremental_box.setVisible(False)
+        self.center_panel.addWidget(self.incremental_box)
+        self.bttt_route = None
+
         # Nút mở HTML cho BTTT
         self.open_html_button = QPushButton("Mở bản đồ HTML")
         self.open_html_button.setVisible(False)
@@ -87,162 +275,335 @@ class TSP_GUI(QWidget):
 
 
     def clear_canvas(self):
-        self.figure.clear()
+        self.renderer.clear()
         self.canvas.draw()
+        self.hide_bttt_inputs()
+
+    def hide_bttt_inputs(self):
         self.input_districts.setVisible(False)
+        self.distance_source.setVisible(False)
+        self.incremental_box.setVisible(False)
         self.open_html_button.setVisible(False)
 
     def trigger_current_algorithm(self):
         if self.current_algorithm_func:
             self.current_algorithm_func()
 
+    def submit(self, algorithm_name, job, show, done=None, failed=None):
+        # Chạy job(control) trên luồng nền; show(path, final) được gọi trên luồng chính với mỗi
+        # lời giải tạm thời (final=False) và khi xong (final=True). done(kết quả của job) / failed()
+        # được gọi trên luồng chính khi job xong / lỗi hoặc bị hủy
+        gap = self.gap_target.value() if self.bound_box.isChecked() else 0
+        control = RunControl(self.time_budget.value() or None, instrument=self.counters_box.isChecked(),
+                             gap=gap or None)
+        worker = SolverWorker(algorithm_name, job, show, control, done, failed)
+        worker.setAutoDelete(False)
+        worker.signals.progress.connect(self.on_progress)
+        worker.signals.incumbent.connect(self.on_incumbent)
+        worker.signals.finished.connect(self.on_run_finished)
+        worker.signals.failed.connect(self.on_run_failed)
+        self.controls.append(control)
+        self.workers[control] = worker
+        self.progress_bar.setValue(0)
+        self.pool.start(worker)
+
+    def open_instance(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Mở file bài toán", "",
+                                              "TSPLIB / CSV (*.tsp *.csv *.txt);;Tất cả (*)")
+        if not path:
+            return
+        try:
+            self.loaded_instance = load_instance(path)
+        except (OSError, ValueError, KeyError, IndexError) as e:
+            self.log_panel.append(f"Không đọc được file {path}: {e}\n{'-'*60}\n")
+            return
+        self.file_label.setText(f"{os.path.basename(path)}: {self.loaded_instance.n} thành phố")
+
+    def unload_instance(self):
+        self.loaded_instance = None
+        self.file_label.setText("Dữ liệu mẫu")
+
+    def submit_solver(self, algorithm_name, solver, inst, city, title):
+        # Mỗi lần chạy dùng đối tượng solver riêng (seed, trạng thái riêng) trên bài toán inst
+        solve = self.solve_function()
+        solver.lower_bound = self.bound_box.isChecked()
+
+        def job(control):
+            result = solve(solver, inst, city, control)
+            return result.path, result.cost, result_stats(result)
+
+        def show(path, final):
+            self.renderer.show(inst, path, title)
+
+        self.submit(algorithm_name, job, show)
+
+    def solve_function(self):
+        # solve(solver, inst, city, control) -> Result, qua bộ nhớ đệm kết quả nếu được bật
+        if not self.cache_box.isChecked():
+            return lambda solver, inst, city, control: solver.solve(inst, city, control)
+        if self.result_cache is None:
+            self.result_cache = ResultCache.ResultCache()
+        return self.result_cache.solve
+
+    def run_loaded(self, algorithm_name, solver):
+        # Để trống ô nhập thì xuất phát từ thành phố đầu
+        inst = self.loaded_instance
+        city = self.input_start.text().strip() or inst.names[0]
+        if city not in inst.index:
+            print("Thành phố xuất phát không có trong file đã nạp.")
+            return
+        self.submit_solver(algorithm_name, solver, inst, city, f"{algorithm_name} - {inst.n} thành phố")
+
+    def run_task(self, func, done, failed=None):
+        # Chạy func() trên luồng nền riêng; done(kết quả) hoặc failed() được gọi trên luồng chính
+        task = BackgroundTask(func)
+        task.setAutoDelete(False)
+        self.tasks.add(task)
+
+        def finish(result):
+            self.tasks.discard(task)
+            done(result)
+
+        def fail(message):
+            self.tasks.discard(task)
+            self.log_panel.append(f"{message}\n{'-'*60}\n")
+            if failed is not None:
+                failed()
+
+        task.signals.finished.connect(finish)
+        task.signals.failed.connect(fail)
+        QThreadPool.globalInstance().start(task)
+
+    def cancel_runs(self):
+        # Các lần chạy còn trong hàng đợi cũng bị hủy và sẽ kết thúc ngay khi tới lượt
+        for control in self.controls:
+            control.cancel()
+
+    def on_progress(self, fraction):
+        self.progress_bar.setValue(int(fraction * 100))
+
+    def on_incumbent(self, frame):
+        self.pending_frame = frame
+        if not self.frame_timer.isActive():
+            self.frame_timer.start()
+
+    def draw_frame(self):
+        if self.pending_frame is None:
+            self.frame_timer.stop()
+            return
+        show, path, cost, metrics = self.pending_frame
+        self.pending_frame = None
+        show(path, False)
+        self.renderer.render()
+        self.progress_bar.setFormat(f"%p% - chi phí {cost}")
+
+    def stop_frames(self):
+        self.pending_frame = None
+        self.frame_timer.stop()
+        self.progress_bar.setFormat("%p%")
+
+    def on_run_finished(self, output):
+        algorithm_name, show, control, result, elapsed, memory = output
+        self.controls.remove(control)
+        worker = self.workers.pop(control)
+        self.stop_frames()
+        if worker.done is not None:
+            worker.done(result)
+        path, cost = result[0], result[1]
+        stats = result[2] if len(result) > 2 else None
+        self.progress_bar.setValue(100)
+        with control.section('draw'):
+            show(path, True)
+        with control.section('render'):
+            self.renderer.render()
+        if control.counters is not None:
+            control.counters['time_solve_ms'] = elapsed * 1000
+            stats = dict(control.counters)
+        self.log_result(algorithm_name, cost if path else None, path, elapsed, stats, memory, control)
+
+    def on_run_failed(self, output):
+        algorithm_name, control, message = output
+        self.controls.remove(control)
+        worker = self.workers.pop(control)
+        self.stop_frames()
+        if worker.failed is not None:
+            worker.failed()
+        self.log_panel.append(f"Thuật toán {algorithm_name}: {message}\n{'-'*60}\n")
+
     def run_backtracking(self):
-        self.clear_canvas()
+        self.hide_bttt_inputs()
         self.current_algorithm_func = self.run_backtracking
+        if self.loaded_instance is not None:
+            return self.run_loaded("Backtracking", Solvers.BacktrackingSolver())
 
         city = self.input_start.text().strip().upper()
         if city in Backtracking.graph:
-            tracemalloc.start()
-            start_time = time.time()
+            self.submit_solver("Backtracking", Solvers.BacktrackingSolver(), Backtracking.instance, city,
+                               Backtracking.TITLE)
 
-            Backtracking.best_path = None
-            Backtracking.best_cost = float('inf')
-            Backtracking.backtrack_tsp(city, {city}, [city], 0, city)
+    def run_branch_bound(self):
+        self.hide_bttt_inputs()
+        self.current_algorithm_func = self.run_branch_bound
+        if self.loaded_instance is not None:
+            return self.run_loaded("Branch and Bound", Solvers.BranchBoundSolver())
 
-            elapsed = time.time() - start_time
-
-            if Backtracking.best_path:
-                Backtracking.draw_path(Backtracking.graph, Backtracking.best_path, ax=self.figure.gca())
-                self.canvas.draw()
-                self.log_result("Backtracking", Backtracking.best_cost, Backtracking.best_path, elapsed)
-            else:
-                self.log_result("Backtracking", None, path=None, elapsed_time=elapsed)
+        city = self.input_start.text().strip().upper()
+        if city in Backtracking.graph:
+            self.submit_solver("Branch and Bound", Solvers.BranchBoundSolver(), Backtracking.instance, city,
+                               "Branch and Bound - Traveling Salesman Problem")
 
-            tracemalloc.stop()
+    def run_held_karp(self):
+        self.hide_bttt_inputs()
+        self.current_algorithm_func = self.run_held_karp
+        if self.loaded_instance is not None:
+            return self.run_loaded("Held-Karp", Solvers.HeldKarpSolver())
 
+        city = self.input_start.text().strip().upper()
+        if city in Backtracking.graph:
+            self.submit_solver("Held-Karp", Solvers.HeldKarpSolver(), Backtracking.instance, city,
+                               "Held-Karp - Traveling Salesman Problem")
 
     def run_ga(self):
-        self.clear_canvas()
+        self.hide_bttt_inputs()
         self.current_algorithm_func = self.run_ga
+        solver = Solvers.GASolver(local_search=self.local_search_box.isChecked())
+        if self.loaded_instance is not None:
+            return self.run_loaded("Genetic Algorithm", solver)
 
         city = self.input_start.text().strip().upper()
         if city in GA.graph:
-            tracemalloc.start()
-            start_time = time.time()
-
-            path, cost = GA.genetic_algorithm(city)
-
-            elapsed = time.time() - start_time
-            GA.draw_path(GA.graph, path, ax=self.figure.gca())
-            self.canvas.draw()
-            self.log_result("Genetic Algorithm", cost, path, elapsed)
-
-            tracemalloc.stop() 
-
-    def run_gbfs1(self):
-        self.clear_canvas()
-        self.current_algorithm_func = self.run_gbfs1
+            self.submit_solver("Genetic Algorithm", solver, GA.instance, city, GA.TITLE)
+
+    def run_gbfs(self, module, algorithm_name, run_func, solver_name='gbfs'):
+        self.hide_bttt_inputs()
+        self.current_algorithm_func = run_func
+        local = self.local_search_box.isChecked()
+        if self.multi_start_box.isChecked():
+            solver = Solvers.MultiStartSolver(solver_name, local_search=local)
+        else:
+            solver = Solvers.make_solver(solver_name, local_search=local)
+        if self.loaded_instance is not None:
+            return self.run_loaded(algorithm_name, solver)
 
         city = self.input_start.text().strip().upper()
-        if city in GBFS1.graph:
-            tracemalloc.start()
-            start_time = time.time()
-
-            path, cost = GBFS1.greedy_best_first_search(GBFS1.graph, city)
-            elapsed = time.time() - start_time
+        if city in module.graph:
+            self.submit_solver(algorithm_name, solver, module.instance, city, module.TITLE)
 
-            GBFS1.draw_graph(GBFS1.graph, path, ax=self.figure.gca())
-            self.canvas.draw()
-            self.log_result("GBFS1", cost if path else None, path, elapsed)
-
-            tracemalloc.stop()
+    def run_gbfs1(self):
+        self.run_gbfs(GBFS1, "GBFS1", self.run_gbfs1)
 
     def run_gbfs2(self):
-        self.clear_canvas()
-        self.current_algorithm_func = self.run_gbfs2
-
-        city = self.input_start.text().strip().upper()
-        if city in GBFS2.graph:
-            tracemalloc.start()
-            start_time = time.time()
-
-            path, cost = GBFS2.greedy_best_first_search(GBFS2.graph, city)
-            elapsed = time.time() - start_time
-
-            GBFS2.draw_graph(GBFS2.graph, path, ax=self.figure.gca())
-            self.canvas.draw()
-            self.log_result("GBFS2", cost if path else None, path, elapsed)
-
-            tracemalloc.stop()
+        self.run_gbfs(GBFS2, "GBFS2", self.run_gbfs2)
 
     def run_gbfs2ex(self):
-        self.clear_canvas()
-        self.current_algorithm_func = self.run_gbfs2ex
-
-        city = self.input_start.text().strip().upper()
-        if city in GBFS2Expan.graph:
-            tracemalloc.start()
-            start_time = time.time()
-
-            path, cost = GBFS2Expan.greedy_best_first_search_Ex(GBFS2Expan.graph, city)
-            elapsed = time.time() - start_time
-
-            if path:
-                GBFS2Expan.draw_graph(GBFS2Expan.graph, path, ax=self.figure.gca())
-                self.canvas.draw()
-
-            self.log_result("GBFS2 with Backtrack", cost if path else None, path, elapsed)
-
-            tracemalloc.stop()
+        self.run_gbfs(GBFS2Expan, "GBFS2 with Backtrack", self.run_gbfs2ex, 'gbfs_backtrack')
 
     def run_gbfs3(self):
-        self.clear_canvas()
-        self.current_algorithm_func = self.run_gbfs3
+        self.run_gbfs(GBFS3, "GBFS3", self.run_gbfs3)
 
-        city = self.input_start.text().strip().upper()
-        if city in GBFS3.graph:
-            tracemalloc.start()
-            start_time = time.time()
+    def run_constructive(self, algorithm_name, solver_name, run_func):
+        # Dựng chu trình từ MST; dữ liệu mẫu là đồ thị đầy đủ có tọa độ của GBFS trường hợp 1
+        self.hide_bttt_inputs()
+        self.current_algorithm_func = run_func
+        solver = Solvers.make_solver(solver_name, local_search=self.local_search_box.isChecked())
+        if self.loaded_instance is not None:
+            return self.run_loaded(algorithm_name, solver)
 
-            path, cost = GBFS3.greedy_best_first_search(GBFS3.graph, city)
-            elapsed = time.time() - start_time
+        city = self.input_start.text().strip().upper()
+        if city in GBFS1.graph:
+            self.submit_solver(algorithm_name, solver, GBFS1.instance, city,
+                               f"{algorithm_name} - Traveling Salesman Problem")
 
-            GBFS3.draw_graph(GBFS3.graph, path, ax=self.figure.gca())
-            self.canvas.draw()
-            self.log_result("GBFS3", cost if path else None, path, elapsed)
+    def run_double_tree(self):
+        self.run_constructive("Double-tree", 'double_tree', self.run_double_tree)
 
-            tracemalloc.stop()       
+    def run_christofides(self):
+        self.run_constructive("Christofides", 'christofides', self.run_christofides)
 
     def run_bttt(self):
-        self.clear_canvas()
+        self.hide_bttt_inputs()
         self.current_algorithm_func = self.run_bttt
 
         self.input_districts.setVisible(True)
+        self.distance_source.setVisible(True)
+        self.incremental_box.setVisible(True)
         self.open_html_button.setVisible(False)
 
+        source = self.distance_source.text().strip() or 'table'
+        if source != self.current_distance_source:
+            try:
+                BTTT.use_distances(source)
+            except (OSError, ValueError, KeyError) as e:
+                self.log_panel.append(f"Không dùng được nguồn khoảng cách {source}: {e}\n{'-'*60}\n")
+                return
+            self.current_distance_source = source
+            self.bttt_route = None   # ma trận đã giữ thuộc nguồn cũ
+
         raw = self.input_districts.toPlainText()
         selected = [x.strip().title() for x in raw.split(",") if x.strip().title() in BTTT.positions]
         start = self.input_start.text().strip().title()
 
         if len(selected) >= 2 and start in selected:
-            tracemalloc.start()
-            start_time = time.time()
-
-            graph = BTTT.create_graph(selected)
-            path, cost = BTTT.greedy_best_first_search(graph, start)
+            solver = Solvers.BTTTSolver(local_search=self.local_search_box.isChecked(),
+                                        lower_bound=self.bound_box.isChecked())
+            solve = self.solve_function()
+            incremental = self.incremental_box.isChecked()
+            route = self.bttt_route if incremental else None
+
+            # Các job chạy tuần tự trên self.pool nên lộ trình giữ lại không bị hai job sửa cùng lúc.
+            # Job trả lộ trình (đã sửa hoặc mới dựng) kèm kết quả; self.bttt_route chỉ được gán trên
+            # luồng chính trong done(). Lỗi / hủy giữa chừng có thể để lộ trình dở dang nên bỏ nó.
+            def job(control):
+                if route is not None:
+                    path, cost = route.update(selected, start, control)
+                    return path, cost, None, route
+                instance = BTTT.create_instance(selected)
+                result = solve(solver, instance, start, control)
+                new_route = BTTT.IncrementalRoute(instance, start, result.path) if incremental else None
+                return (result.path, round(result.cost, 2) if result.path else result.cost, result_stats(result),
+                        new_route)
+
+            def done(result):
+                self.bttt_route = result[3]
+
+            def failed():
+                self.bttt_route = None
+
+            def show(path, final):
+                # Lời giải tạm thời chỉ vẽ lại canvas; bản đồ HTML chỉ dựng cho kết quả cuối
+                self.renderer.clear()
+                self.input_districts.setVisible(True)
+                self.distance_source.setVisible(True)
+                self.incremental_box.setVisible(True)
+                if final and path:
+                    self.build_map(path, selected, start)
+
+            self.submit("Bài toán thực tế (cập nhật)" if route is not None else "Bài toán thực tế", job, show,
+                        done, failed)
+        else:
+            print("Vui lòng nhập đúng các quận và quận xuất phát.")
 
-            elapsed = time.time() - start_time
 
-            if path:
-                BTTT.draw_map(path, selected, start)
-                self.open_html_button.setVisible(True)
+    def build_map(self, path, selected, start):
+        self.pending_map = (path, selected, start)
+        if not self.map_building:
+            self.next_map()
 
-            self.log_result("Bài toán thực tế", cost if path else None, path, elapsed)
+    def next_map(self):
+        # Dựng yêu cầu mới nhất đang chờ; hết yêu cầu thì mới hiện nút mở bản đồ
+        if self.pending_map is None:
+            self.map_building = False
+            return
+        path, selected, start = self.pending_map
+        self.pending_map = None
+        self.map_building = True
 
-            tracemalloc.stop()
-        else:
-            print("Vui lòng nhập đúng các quận và quận xuất phát.")
+        def done(_):
+            if self.pending_map is None:
+                self.open_html_button.setVisible(True)
+            self.next_map()
 
+        self.run_task(lambda: BTTT.draw_map(path, selected, start), done, self.next_map)
 
     def open_html(self):
         file_path = "Algorithms/tsp_tp_hcm.html"
@@ -251,9 +612,9 @@ class TSP_GUI(QWidget):
         else:
             print("File HTML chưa tồn tại.")
         
-    def log_result(self, algorithm_name, cost, path=None, elapsed_time=None):
+    def log_result(self, algorithm_name, cost, path=None, elapsed_time=None, stats=None, memory=None, control=None):
         current_time = time.strftime("%H:%M:%S", time.localtime())
-        mem_current, mem_peak = tracemalloc.get_traced_memory()
+        mem_current, mem_peak = memory or tracemalloc.get_traced_memory()
 
         if path:
             path_str = " → ".join(path)
@@ -266,10 +627,24 @@ class TSP_GUI(QWidget):
             f"  - Đường đi: {path_str}\n"
             f"  - Tổng chi phí: {cost if path else '---'}\n"
             f"  - Bộ nhớ sử dụng: {mem_current / 1024:.2f} KB (tối đa {mem_peak / 1024:.2f} KB)\n"
-            f"{'-'*60}\n"
         )
+        if control is not None and control.lower_bound is not None:
+            gap = LowerBound.gap(cost if path else None, control.lower_bound)
+            log_entry += f"  - Cận dưới (1-tree Held-Karp): {control.lower_bound}\n"
+            if gap is not None:
+                log_entry += f"  - Gap so với cận dưới: {gap:.2f}%"
+                log_entry += f" (dừng sớm: gap ≤ {control.gap}%)\n" if control.gap_reached else "\n"
+        if stats:
+            log_entry += "".join(f"  - {key}: {value}\n" for key, value in stats.items())
+        log_entry += f"{'-'*60}\n"
         self.log_panel.append(log_entry)
 
+    def closeEvent(self, event):
+        self.cancel_runs()
+        self.pool.waitForDone()
+        QThreadPool.globalInstance().waitForDone()
+        super().closeEvent(event)
+
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     window = TSP_GUI()
@@ -0,0 +1,50 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from Algorithms import Backtracking
+from Algorithms.Instance import TSPInstance
+from Algorithms.Solvers import BranchBoundSolver
+
+
+def random_instance(n, seed, symmetric):
+    rng = np.random.default_rng(seed)
+    cost = rng.integers(1, 100, (n, n)).astype(np.float64)
+    if symmetric:
+        cost = np.triu(cost, 1) + np.triu(cost, 1).T
+    return TSPInstance([str(i) for i in range(n)], cost)
+
+
+def brute_force(inst):
+    return min(inst.tour_cost([0] + list(p)) for p in itertools.permutations(range(1, inst.n)))
+
+
+@pytest.mark.parametrize('bound', Backtracking.BOUNDS + Backtracking.TEACHING_BOUNDS)
+@pytest.mark.parametrize('symmetric', [True, False])
+@pytest.mark.parametrize('n', [4, 6, 9])
+def test_branch_and_bound_matches_brute_force(n, symmetric, bound):
+    for seed in range(3):
+        inst = random_instance(n, seed, symmetric)
+        path, cost, _ = Backtracking.branch_and_bound(inst, '0', bound)
+        assert cost == brute_force(inst)
+        assert path[0] == path[-1] == '0'
+        assert inst.tour_cost(inst.ids(path[:-1])) == cost
+
+
+def test_backtracking_matches_branch_and_bound():
+    inst = random_instance(7, 4, False)
+    assert Backtracking.backtracking(inst, '0')[1] == Backtracking.branch_and_bound(inst, '0')[1]
+
+
+def test_custom_graph_without_positions():
+    graph = {'P': [['Q', 1], ['R', 4]], 'Q': [['P', 1], ['R', 2]], 'R': [['P', 4], ['Q', 2]]}
+    path, cost, _ = Backtracking.branch_and_bound(graph, 'P')
+    assert cost == 7 and path[0] == path[-1] == 'P'
+
+
+def test_reduction_bound_is_teaching_only():
+    with pytest.raises(ValueError):
+        BranchBoundSolver(bound='reduction')
+    with pytest.raises(ValueError):
+        Backtracking.branch_and_bound(random_instance(5, 0, True), '0', 'unknown')
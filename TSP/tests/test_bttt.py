@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+from Algorithms import BTTT
+from Algorithms.Distances import DistanceProvider
+from Algorithms.Instance import TSPInstance
+
+
+class PointProvider(DistanceProvider):
+    # Khoảng cách Euclid giữa các điểm đặt tên; skew > 0 làm chi phí hai chiều khác nhau
+    def __init__(self, n, seed, skew=0.0):
+        rng = np.random.default_rng(seed)
+        self.points = {f"p{i}": xy for i, xy in enumerate(rng.uniform(0, 100, (n, 2)))}
+        self.skew = skew
+
+    def matrix(self, sources, targets):
+        a = np.array([self.points[s] for s in sources]).reshape(-1, 2)
+        b = np.array([self.points[t] for t in targets]).reshape(-1, 2)
+        d = np.hypot(a[:, None, 0] - b[None, :, 0], a[:, None, 1] - b[None, :, 1])
+        return d + self.skew * (a[:, None, 0] > b[None, :, 0])
+
+
+def instance(provider, cities):
+    cost = provider.matrix(cities, cities)
+    np.fill_diagonal(cost, np.inf)
+    return TSPInstance(cities, cost)
+
+
+def check_route(route, provider, cities, start):
+    path, cost = route.route()
+    assert path[0] == path[-1] == start
+    assert sorted(path[:-1]) == sorted(cities)
+    legs = provider.matrix(path[:-1], path[1:]).diagonal()
+    assert cost == pytest.approx(legs.sum(), abs=0.01)
+    # Danh sách láng giềng giữ lại khớp với tính lại từ đầu (so theo chi phí, bỏ qua cách phá hòa)
+    for i in route.slot_of.values():
+        assert route.cost[i, route.near[i]].tolist() == route.cost[i, route.nearest(i)].tolist()
+
+
+@pytest.mark.parametrize('skew', [0.0, 7.0], ids=['symmetric', 'asymmetric'])
+def test_add_and_remove_keep_a_valid_tour(skew):
+    provider = PointProvider(60, seed=1, skew=skew)
+    names = list(provider.points)
+    cities = names[:12]
+    route = BTTT.IncrementalRoute(instance(provider, cities), 'p0', provider=provider)
+    check_route(route, provider, cities, 'p0')
+
+    rng = np.random.default_rng(2)
+    for step in range(40):
+        outside = [c for c in names if c not in cities]
+        if len(cities) > 4 and rng.random() < 0.4:
+            removed = rng.choice(cities[1:], size=int(rng.integers(1, 3)), replace=False).tolist()
+            cities = [c for c in cities if c not in removed]
+        else:
+            cities = cities + rng.choice(outside, size=int(rng.integers(1, 4)), replace=False).tolist()
+        route.update(cities, 'p0')
+        check_route(route, provider, cities, 'p0')
+    assert route.capacity > 12
+
+
+def test_update_from_a_path_matches_full_solve():
+    provider = PointProvider(20, seed=3)
+    cities = list(provider.points)[:10]
+    inst = instance(provider, cities)
+    path, cost = BTTT.greedy_best_first_search(inst, 'p0')
+    route = BTTT.IncrementalRoute(inst, 'p0', path, provider=provider)
+    assert route.route() == (path, cost)
+    # Đổi điểm xuất phát: cùng chu trình, xoay về điểm mới
+    route.update(cities, 'p5')
+    new_path, new_cost = route.route()
+    assert new_path[0] == 'p5' and new_cost == cost
+
+
+def test_missing_distances_fall_back_to_a_rebuild():
+    # Quận mới chỉ nối được với một quận: không chèn được vào cạnh nào, không có lộ trình
+    provider = PointProvider(6, seed=4)
+    cities = list(provider.points)[:5]
+    route = BTTT.IncrementalRoute(instance(provider, cities), 'p0', provider=provider)
+    matrix = provider.matrix
+
+    def sparse(sources, targets):
+        d = matrix(sources, targets)
+        for i, s in enumerate(sources):
+            for j, t in enumerate(targets):
+                if 'p5' in (s, t) and {s, t} != {'p5', 'p1'}:
+                    d[i, j] = np.inf
+        return d
+
+    provider.matrix = sparse
+    assert route.update(cities + ['p5'], 'p0') == (None, None)
+    route.update(cities, 'p0')
+    check_route(route, provider, cities, 'p0')
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from Algorithms import Christofides, HeldKarp
+from Algorithms.Instance import TSPInstance, random_uniform
+
+
+def check_tour(inst, path, cost, start):
+    assert path[0] == path[-1] == start
+    assert sorted(path[:-1]) == sorted(inst.names)
+    assert cost == pytest.approx(inst.tour_cost(inst.ids(path[:-1])))
+
+
+@pytest.mark.parametrize('seed', range(4))
+def test_approximation_guarantees(seed):
+    inst = random_uniform(10, seed=seed)
+    _, optimum = HeldKarp.held_karp(inst, '1')
+
+    path, cost, stats = Christofides.double_tree(inst, '1')
+    check_tour(inst, path, cost, '1')
+    assert stats['mst'] <= optimum + 1e-9
+    assert cost <= 2 * optimum + 1e-9
+
+    path, cost, stats = Christofides.christofides(inst, '1', 'exact')
+    check_tour(inst, path, cost, '1')
+    assert stats['matching'] == 'exact' and stats['odd'] % 2 == 0
+    assert cost <= 1.5 * optimum + 1e-9
+
+
+def test_mst_weight_matches_networkx():
+    nx = pytest.importorskip('networkx')
+    inst = random_uniform(40, seed=5)
+    _, _, stats = Christofides.double_tree(inst, '3')
+    g = nx.Graph()
+    g.add_weighted_edges_from((a, b, inst.cost[a, b]) for a in range(inst.n) for b in range(a + 1, inst.n))
+    assert stats['mst'] == pytest.approx(nx.minimum_spanning_tree(g).size(weight='weight'))
+
+
+def test_greedy_matching_is_perfect():
+    rng = np.random.default_rng(6)
+    for k in (0, 2, 8, 30):
+        w = rng.uniform(1, 10, (k, k))
+        w = np.minimum(w, w.T)
+        np.fill_diagonal(w, np.inf)
+        pairs = Christofides.greedy_matching(w)
+        assert sorted(v for pair in pairs for v in pair) == list(range(k))
+
+
+def test_euler_circuit_uses_every_edge_once():
+    # Hai tam giác chung đỉnh 0, cộng một cạnh đôi 3-4
+    edges = [(0, 1), (1, 2), (2, 0), (0, 3), (3, 4), (4, 0), (3, 4), (4, 3)]
+    circuit = Christofides.euler_circuit(5, edges, 0)
+    assert circuit[0] == circuit[-1] == 0
+    walked = sorted(tuple(sorted(e)) for e in zip(circuit, circuit[1:]))
+    assert walked == sorted(tuple(sorted(e)) for e in edges)
+
+
+def test_greedy_matching_on_large_coordinate_instance():
+    # Không dựng ma trận n x n: Prim và ghép cặp chỉ lấy từng hàng chi phí
+    inst = random_uniform(3000, seed=7)
+    path, cost, stats = Christofides.christofides(inst, '1')
+    assert stats['matching'] == 'greedy'
+    assert inst._cost is None
+    assert sorted(path[:-1]) == sorted(inst.names)
+    assert cost == pytest.approx(inst.tour_cost(inst.ids(path[:-1])))
+
+
+def test_disconnected_graph_and_bad_matching():
+    cost = np.full((4, 4), np.inf)
+    cost[0, 1] = cost[1, 0] = cost[2, 3] = cost[3, 2] = 1.0
+    inst = TSPInstance(list('abcd'), cost)
+    assert Christofides.christofides(inst, 'a') == (None, None, None)
+    assert Christofides.double_tree(inst, 'a') == (None, None, None)
+    with pytest.raises(ValueError):
+        Christofides.christofides(random_uniform(6, seed=8), '1', 'blossom')
@@ -0,0 +1,71 @@
+import time
+
+import pytest
+
+from Algorithms.Control import Cancelled, iterate
+from Algorithms.Instance import random_uniform
+from Algorithms.Solvers import GASolver
+
+
+def countdown(steps, control=None):
+    # Thuật toán giả: mỗi bước một lời giải tạm thời rẻ hơn
+    for cost in range(steps, 0, -1):
+        control.check()
+        control.incumbent(['a', 'b', 'a'], cost)
+    return ['a', 'b', 'a'], 0, {'steps': steps}
+
+
+def test_yields_incumbents_then_final_result():
+    items = list(iterate(countdown, 3))
+    assert [cost for _, cost, _ in items] == [3, 2, 1, 0]
+    assert not any(metrics.get('final') for _, _, metrics in items[:-1])
+    final = items[-1][2]
+    assert final['final'] and final['progress'] == 1.0
+    assert final['result'] == (['a', 'b', 'a'], 0, {'steps': 3})
+    assert final['stats'] == {'steps': 3}
+
+
+def test_solver_result_carries_stats_and_trace():
+    inst = random_uniform(12, seed=1)
+    *_, (path, cost, metrics) = iterate(GASolver(seed=0, generations=20).solve, inst, '1')
+    result = metrics['result']
+    assert (path, cost) == (result.path, result.cost)
+    assert metrics['trace'] == result.trace
+
+
+def test_break_cancels_the_run():
+    seen = {}
+
+    def endless(control=None):
+        seen['control'] = control
+        cost = 1e9
+        while True:
+            control.check()
+            control.incumbent(['a', 'a'], cost)
+            cost -= 1
+            time.sleep(0.001)
+
+    for _ in iterate(endless):
+        break
+    assert seen['control'].cancelled
+
+
+def test_errors_reach_the_caller():
+    def broken(control=None):
+        raise ValueError("hỏng")
+
+    with pytest.raises(ValueError):
+        list(iterate(broken))
+
+
+def test_time_budget_after_an_incumbent_ends_quietly():
+    def slow(control=None, found=True):
+        if found:
+            control.incumbent(['a', 'a'], 5)
+        while True:
+            control.check()
+            time.sleep(0.001)
+
+    assert [cost for _, cost, _ in iterate(slow, time_budget=0.05)] == [5]
+    with pytest.raises(Cancelled):
+        list(iterate(slow, time_budget=0.05, found=False))
@@ -0,0 +1,86 @@
+import threading
+
+import numpy as np
+import pytest
+
+from Algorithms.Distances import (CachedProvider, DistanceProvider, HttpProvider, MatrixFileProvider, TableProvider,
+                                  serve_table)
+
+NAMES = ['a', 'b', 'c']
+DISTANCES = np.array([[0.0, 1.5, 2.0],
+                      [1.5, 0.0, 3.0],
+                      [2.0, 3.0, 0.0]])
+
+
+class CountingProvider(DistanceProvider):
+    # Ghi lại mọi lô được hỏi; cặp ('a', 'c') không có đường đi
+    def __init__(self):
+        self.calls = []
+
+    def matrix(self, sources, targets):
+        self.calls.append((list(sources), list(targets)))
+        return np.array([[np.inf if (a, b) == ('a', 'c') else 10.0 * ord(a) + ord(b) for b in targets]
+                         for a in sources], dtype=np.float64).reshape(len(sources), len(targets))
+
+
+def test_table_provider_fills_reverse_pairs():
+    provider = TableProvider({('a', 'b'): 4.0, ('b', 'c'): 2.0, ('c', 'b'): 5.0})
+    m = provider.matrix(['a', 'b', 'c'], ['b', 'c', 'a'])
+    assert m.tolist() == [[4.0, np.inf, np.inf], [np.inf, 2.0, 4.0], [5.0, np.inf, np.inf]]
+    assert provider.matrix([], ['a']).shape == (0, 1)
+    assert np.isinf(TableProvider({('a', 'b'): 1.0}, symmetric=False).matrix(['b'], ['a'])).all()
+
+
+@pytest.mark.parametrize('name', ['m.npz', 'mdir'])
+def test_matrix_file_round_trip(tmp_path, name):
+    path = str(tmp_path / name)
+    MatrixFileProvider.save(path, NAMES, DISTANCES)
+    provider = MatrixFileProvider(path)
+    assert provider.matrix(['c', 'a'], ['b']).tolist() == [[3.0], [1.5]]
+    m = provider.matrix(['a', 'x'], ['x', 'b'])
+    assert np.isinf(m[1]).all() and np.isinf(m[:, 0]).all() and m[0, 1] == 1.5
+
+
+def test_cached_provider_only_asks_for_missing_pairs(tmp_path):
+    inner = CountingProvider()
+    cache = str(tmp_path / 'pairs.sqlite')
+    first = CachedProvider(inner, cache, 'osrm').matrix(['a', 'b'], ['b', 'c'])
+    assert len(inner.calls) == 1 and np.isinf(first[0, 1])
+
+    # Đối tượng mới trên cùng file: mọi cặp đã có (kể cả cặp inf) nên không hỏi lại
+    provider = CachedProvider(inner, cache, 'osrm')
+    assert np.array_equal(provider.matrix(['a', 'b'], ['b', 'c']), first)
+    assert len(inner.calls) == 1 and provider.fetched == 0
+
+    # Thêm một điểm: chỉ hàng / cột còn thiếu được hỏi, trong một lô
+    m = provider.matrix(['a', 'b', 'd'], ['b', 'c'])
+    assert inner.calls[-1] == (['d'], ['b', 'c'])
+    assert provider.fetched == 2
+    assert np.array_equal(m[:2], first)
+    assert np.array_equal(m, inner.matrix(['a', 'b', 'd'], ['b', 'c']))
+
+
+def test_cached_provider_keeps_sources_apart(tmp_path):
+    cache = str(tmp_path / 'pairs.sqlite')
+    inner = CountingProvider()
+    CachedProvider(inner, cache, 'one').matrix(['a'], ['b'])
+    CachedProvider(inner, cache, 'two').matrix(['a'], ['b'])
+    assert len(inner.calls) == 2
+
+
+def test_http_provider_with_local_server():
+    positions = {'q1': (106.70, 10.78), 'q3': (106.68, 10.78)}
+    server = serve_table(port=0, detour=1.0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        host, port = server.server_address[:2]
+        provider = HttpProvider(f"http://{host}:{port}", positions)
+        m = provider.matrix(['q1'], ['q1', 'q3'])
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert provider.requests == 1
+    assert m[0, 0] == 0
+    # 0.02 độ kinh trên vĩ độ 10.78: ~2.18 km
+    assert m[0, 1] == pytest.approx(2.184, abs=0.01)
@@ -0,0 +1,36 @@
+import numpy as np
+
+from Algorithms import GA
+from Algorithms.Instance import TSPInstance, random_uniform
+from Algorithms.Solvers import GASolver
+
+
+def test_island_model_keeps_one_trace_per_island():
+    inst = random_uniform(25, seed=2)
+    path, cost, stats = GA.island_model('1', islands=3, pop_size=20, generations=45, migration_interval=20,
+                                        graph=inst, seed=0, workers=1)
+    traces = stats['island_traces']
+    assert len(traces) == 3
+    assert all(len(trace) == len(stats['trace']) == 45 for trace in traces)
+    # Đường chung là chi phí tốt nhất của mọi đảo sau mỗi thế hệ
+    assert stats['trace'] == [min(costs) for costs in zip(*traces)]
+    assert stats['trace'][-1] == cost
+
+
+def test_solver_moves_island_traces_to_result():
+    inst = random_uniform(20, seed=3)
+    result = GASolver(seed=1, islands=2, generations=20, workers=1).solve(inst, '1')
+    assert len(result.island_traces) == 2
+    assert 'island_traces' not in result.stats and 'trace' not in result.stats
+
+
+def test_ga_stops_on_max_evaluations():
+    rng = np.random.default_rng(0)
+    weights = np.triu(rng.integers(1, 100, (30, 30)).astype(np.float64), 1)
+    inst = TSPInstance([str(i) for i in range(30)], weights + weights.T)
+    path, cost, stats = GA.genetic_algorithm('0', pop_size=20, graph=inst, seed=0, max_evaluations=1000,
+                                             stall=10 ** 6)
+    assert stats['stop'] == 'evaluations'
+    assert 1000 <= stats['evaluations'] < 1000 + 4 * 20
+    assert sorted(path) == sorted(inst.names)
+    assert cost == inst.tour_cost(inst.ids(path))
@@ -0,0 +1,95 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from Algorithms import GBFS2Expan
+from Algorithms.Control import RunControl, SearchLimit
+
+
+def graph_from_edges(n, edges, directed=False):
+    graph = {str(i): [] for i in range(n)}
+    for a, b, w in edges:
+        graph[str(a)].append([str(b), w])
+        if not directed:
+            graph[str(b)].append([str(a), w])
+    return graph
+
+
+def random_graph(n, p, seed, directed=False):
+    rng = np.random.default_rng(seed)
+    pairs = itertools.permutations(range(n), 2) if directed else itertools.combinations(range(n), 2)
+    edges = [(a, b, int(rng.integers(1, 50))) for a, b in pairs if rng.random() < p]
+    return graph_from_edges(n, edges, directed)
+
+
+def reference_search(graph, start):
+    # DFS đệ quy thuần theo cùng thứ tự GBFS (không có heuristic tọa độ: chi phí, rồi thứ tự thành phố),
+    # không cắt tỉa, không ghi nhớ: lời giải đầu tiên tìm được
+    order = {city: i for i, city in enumerate(graph)}
+    weight = {(a, b): w for a in graph for b, w in graph[a]}
+
+    def dfs(path, total):
+        current = path[-1]
+        if len(path) == len(graph):
+            if (current, start) in weight:
+                return path + [start], total + weight[current, start]
+            return None
+        for city, w in sorted(graph[current], key=lambda e: (e[1], order[e[0]])):
+            if city not in path:
+                found = dfs(path + [city], total + w)
+                if found:
+                    return found
+        return None
+
+    return dfs([start], 0) or (None, None)
+
+
+def petersen():
+    # 3-chính quy, 2-liên thông nhưng không có chu trình Hamilton: qua được bước kiểm tra trước
+    outer = [(i, (i + 1) % 5, 1) for i in range(5)]
+    spokes = [(i, i + 5, 1) for i in range(5)]
+    inner = [(5 + i, 5 + (i + 2) % 5, 1) for i in range(5)]
+    return graph_from_edges(10, outer + spokes + inner)
+
+
+@pytest.mark.parametrize('directed', [False, True])
+@pytest.mark.parametrize('seed', range(12))
+def test_matches_plain_dfs(seed, directed):
+    graph = random_graph(8, 0.55 if directed else 0.45, seed, directed)
+    path, cost = GBFS2Expan.greedy_best_first_search_Ex(graph, '0')
+    expected_path, expected_cost = reference_search(graph, '0')
+    assert path == expected_path
+    assert cost == expected_cost
+
+
+def test_sample_graph_tour():
+    path, cost = GBFS2Expan.greedy_best_first_search_Ex(GBFS2Expan.graph, 'A')
+    assert path[0] == path[-1] == 'A'
+    assert sorted(path[:-1]) == sorted(GBFS2Expan.graph)
+    weight = {(a, b): w for a in GBFS2Expan.graph for b, w in GBFS2Expan.graph[a]}
+    assert cost == sum(weight[e] for e in zip(path, path[1:]))
+
+
+def test_rejects_graph_with_a_bridge():
+    # Hai K5 nối bằng một cạnh: loại ngay, không mở rộng nút nào
+    left = [(a, b, 1) for a, b in itertools.combinations(range(5), 2)]
+    right = [(a + 5, b + 5, 1) for a, b in itertools.combinations(range(5), 2)]
+    graph = graph_from_edges(10, left + right + [(4, 5, 1)])
+    control = RunControl(instrument=True)
+    assert GBFS2Expan.greedy_best_first_search_Ex(graph, '0', control) == (None, None)
+    assert control.counters['expanded'] == 0
+
+
+def test_memo_keeps_the_same_answer():
+    graph = random_graph(12, 0.3, 12)
+    control = RunControl(instrument=True)
+    found = GBFS2Expan.greedy_best_first_search_Ex(graph, '0', control)
+    assert control.counters['memo_hits'] > 0
+    assert found == GBFS2Expan.greedy_best_first_search_Ex(graph, '0', memo_limit=0) == reference_search(graph, '0')
+
+
+def test_node_limit_raises_search_limit():
+    assert GBFS2Expan.greedy_best_first_search_Ex(petersen(), '0') == (None, None)
+    with pytest.raises(SearchLimit):
+        GBFS2Expan.greedy_best_first_search_Ex(petersen(), '0', max_nodes=5)
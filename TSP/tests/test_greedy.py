@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+
+from Algorithms import GBFS1, GBFS2, GBFS3
+from Algorithms.Greedy import greedy_best_first
+from Algorithms.Instance import TSPInstance, random_uniform
+
+
+@pytest.mark.parametrize('module', [GBFS1, GBFS2, GBFS3])
+def test_modules_share_the_greedy_core(module):
+    inst = random_uniform(40, seed=3)
+    assert module.greedy_best_first_search(inst, '7') == greedy_best_first(inst, '7')
+
+
+def test_greedy_returns_a_closed_tour():
+    inst = random_uniform(40, seed=4)
+    path, cost = greedy_best_first(inst, '1')
+    assert path[0] == path[-1] == '1'
+    assert sorted(path[:-1]) == sorted(inst.names)
+    assert cost == pytest.approx(inst.tour_cost(inst.ids(path[:-1])))
+
+
+def test_greedy_fails_without_an_edge_back():
+    # 0 -> 1 -> 2 -> 3 chỉ có cạnh một chiều, không có cạnh nào về 0
+    cost = np.full((4, 4), np.inf)
+    cost[0, 1] = cost[1, 2] = cost[2, 3] = 1.0
+    inst = TSPInstance(list('abcd'), cost)
+    assert greedy_best_first(inst, 'a') == (None, None)
@@ -0,0 +1,49 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from Algorithms import HeldKarp
+from Algorithms.Instance import TSPInstance, random_uniform
+
+
+def random_instance(n, seed, symmetric):
+    rng = np.random.default_rng(seed)
+    cost = rng.integers(1, 100, (n, n)).astype(np.float64)
+    if symmetric:
+        cost = np.triu(cost, 1) + np.triu(cost, 1).T
+    return TSPInstance([str(i) for i in range(n)], cost)
+
+
+def brute_force(inst):
+    return min(inst.tour_cost([0] + list(p)) for p in itertools.permutations(range(1, inst.n)))
+
+
+@pytest.mark.parametrize('layered', [False, True])
+@pytest.mark.parametrize('symmetric', [True, False])
+@pytest.mark.parametrize('n', [4, 6, 9])
+def test_held_karp_matches_brute_force(n, symmetric, layered):
+    for seed in range(3):
+        inst = random_instance(n, seed, symmetric)
+        path, cost = HeldKarp.held_karp(inst, '0', layered=layered)
+        assert cost == brute_force(inst)
+        assert path[0] == path[-1] == '0'
+        assert inst.tour_cost(inst.ids(path[:-1])) == cost
+
+
+def test_layered_and_full_agree():
+    inst = random_uniform(14, seed=5)
+    assert HeldKarp.held_karp(inst, '1', layered=True) == HeldKarp.held_karp(inst, '1', layered=False)
+
+
+def test_memory_limit_covers_the_parent_table():
+    # 20 thành phố: riêng bảng cha đã 2^19 x 19 byte (~10 MB), chế độ theo tầng cũng không vừa 4 MB
+    inst = random_uniform(20, seed=1)
+    assert HeldKarp.memory_needed(19, True) > 4 << 20
+    with pytest.raises(ValueError):
+        HeldKarp.held_karp(inst, '1', memory_limit=4 << 20)
+
+
+def test_too_many_cities_rejected():
+    with pytest.raises(ValueError):
+        HeldKarp.held_karp(random_uniform(HeldKarp.MAX_CITIES + 1, seed=1), '1')
@@ -0,0 +1,105 @@
+import os
+
+import numpy as np
+import pytest
+
+from Algorithms import Loader
+from Algorithms.Loader import load_instance
+
+EUC_FILE = """NAME : square
+TYPE : TSP
+DIMENSION : 4
+EDGE_WEIGHT_TYPE : EUC_2D
+NODE_COORD_SECTION
+1 0 0
+2 3 0
+3 3 4.4
+4 0 4.4
+EOF
+"""
+
+MATRIX = np.array([[0, 2, 9, 10],
+                   [2, 0, 6, 4],
+                   [9, 6, 0, 8],
+                   [10, 4, 8, 0]], dtype=float)
+
+
+def write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text, encoding='utf-8')
+    return str(path)
+
+
+def explicit_file(fmt, values):
+    # values: các số theo đúng thứ tự của EDGE_WEIGHT_FORMAT, xuống dòng tùy ý
+    lines = [' '.join(str(int(v)) for v in values[i:i + 3]) for i in range(0, len(values), 3)]
+    return ("NAME : m\nTYPE : TSP\nDIMENSION : 4\nEDGE_WEIGHT_TYPE : EXPLICIT\n"
+            f"EDGE_WEIGHT_FORMAT : {fmt}\nEDGE_WEIGHT_SECTION\n" + '\n'.join(lines) + "\nEOF\n")
+
+
+def test_euc_2d_rounds_distances(tmp_path):
+    inst = load_instance(write(tmp_path, 'square.tsp', EUC_FILE), use_cache=False)
+    assert inst.names == ['1', '2', '3', '4']
+    assert inst.planar
+    assert inst.cost[0, 1] == 3 and inst.cost[1, 2] == 4 and inst.cost[0, 2] == 5   # 5.35 -> 5
+    assert inst.tour_cost([0, 1, 2, 3]) == 14
+
+
+@pytest.mark.parametrize('fmt, values', [
+    ('FULL_MATRIX', MATRIX.ravel()),
+    ('UPPER_ROW', MATRIX[np.triu_indices(4, 1)]),
+    ('LOWER_ROW', MATRIX[np.tril_indices(4, -1)]),
+    ('UPPER_DIAG_ROW', MATRIX[np.triu_indices(4)]),
+    ('LOWER_DIAG_ROW', MATRIX[np.tril_indices(4)]),
+])
+def test_explicit_formats(tmp_path, fmt, values):
+    inst = load_instance(write(tmp_path, 'm.tsp', explicit_file(fmt, values)), use_cache=False)
+    off = ~np.eye(4, dtype=bool)
+    assert np.array_equal(inst.cost[off], MATRIX[off])
+
+
+def test_tsplib_metrics():
+    p, q = np.array([0.0, 0.0]), np.array([10.0, 0.0])
+    assert Loader.att(p, q) == 4           # 10 / sqrt(10) = 3.16 -> làm tròn lên
+    assert Loader.ceil_2d(p, np.array([1.0, 1.0])) == 2
+    # GEO: 1 độ kinh tuyến trên xích đạo ~ 111.3 km
+    assert Loader.geo(p, np.array([0.0, 1.0])) == 112
+
+
+def test_geo_is_not_planar(tmp_path):
+    text = EUC_FILE.replace('EUC_2D', 'GEO')
+    inst = load_instance(write(tmp_path, 'geo.tsp', text), use_cache=False)
+    assert not inst.planar
+    assert np.array_equal(inst.cost, inst.cost.T)
+
+
+def test_unsupported_weight_type(tmp_path):
+    text = EUC_FILE.replace('EUC_2D', 'XRAY1')
+    with pytest.raises(ValueError):
+        load_instance(write(tmp_path, 'x.tsp', text), use_cache=False)
+
+
+def test_csv_with_header_and_names(tmp_path):
+    path = write(tmp_path, 'points.csv', "name,x,y\n# ghi chú\nA,0,0\nB,3,4\n\nC,6,8\n")
+    inst = load_instance(path, use_cache=False)
+    assert inst.names == ['A', 'B', 'C']
+    assert inst.cost[0, 1] == pytest.approx(5.0)
+
+
+def test_csv_without_names(tmp_path):
+    inst = load_instance(write(tmp_path, 'xy.csv', "0,0\n1,0\n"), use_cache=False)
+    assert inst.names == ['1', '2']
+
+
+def test_cache_is_reused_and_invalidated(tmp_path):
+    path = write(tmp_path, 'square.tsp', EUC_FILE)
+    first = load_instance(path)
+    assert os.path.exists(os.path.join(Loader.cache_dir(path), 'meta.json'))
+    cached = Loader.read_cache(path)
+    assert isinstance(cached['coords'], np.memmap)
+    assert np.array_equal(load_instance(path).cost, first.cost)
+
+    # File đổi nội dung (kích thước khác): bộ nhớ đệm cũ bị bỏ qua
+    write(tmp_path, 'square.tsp', EUC_FILE.replace('3 3 4.4', '3 3 40.4'))
+    assert Loader.read_cache(path) is None
+    assert load_instance(path).cost[1, 2] == 40
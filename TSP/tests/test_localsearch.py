@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from Algorithms import LocalSearch
+from Algorithms.Instance import TSPInstance, random_uniform
+from Algorithms.Spatial import SPATIAL_MIN_CITIES
+
+
+def random_tour(n, seed):
+    return np.random.default_rng(seed).permutation(n).tolist()
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_2opt_never_increases_tour_length(seed):
+    inst = random_uniform(60, seed=seed)
+    tour = random_tour(inst.n, seed)
+    out = LocalSearch.improve_ids(inst, tour, use_or_opt=False)
+    assert sorted(out) == list(range(inst.n))
+    assert inst.tour_cost(out) <= inst.tour_cost(tour) + 1e-9
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_or_opt_never_increases_asymmetric_tour_length(seed):
+    rng = np.random.default_rng(seed)
+    cost = rng.uniform(1, 100, (30, 30))
+    np.fill_diagonal(cost, np.inf)
+    inst = TSPInstance([str(i) for i in range(30)], cost)
+    tour = random_tour(inst.n, seed)
+    out = LocalSearch.improve_ids(inst, tour)
+    assert sorted(out) == list(range(inst.n))
+    assert inst.tour_cost(out) <= inst.tour_cost(tour) + 1e-9
+
+
+def test_coordinate_instance_matches_dense_matrix():
+    # Bài toán theo tọa độ không dựng ma trận n x n nhưng phải cho cùng kết quả với ma trận đầy đủ
+    inst = random_uniform(200, seed=7)
+    cost = inst.metric(inst.coords[:, None], inst.coords[None, :])
+    np.fill_diagonal(cost, np.inf)
+    dense = TSPInstance(list(inst.names), cost)
+    tour = random_tour(inst.n, 7)
+    out = LocalSearch.improve_ids(inst, tour)
+    assert inst._cost is None
+    assert out == LocalSearch.improve_ids(dense, tour)
+
+
+def test_grid_neighbors_match_brute_force():
+    inst = random_uniform(SPATIAL_MIN_CITIES, seed=8)
+    neigh = LocalSearch.nearest_neighbors(inst, 8)
+    assert inst._cost is None
+    for i in range(0, inst.n, 97):
+        d = np.hypot(*(inst.coords - inst.coords[i]).T)
+        d[i] = np.inf
+        assert np.allclose(np.sort(d)[:8], d[neigh[i]])
+
+
+def test_neighbors_skip_missing_edges():
+    cost = np.full((4, 4), np.inf)
+    cost[0, 1] = cost[1, 2] = cost[2, 3] = cost[3, 0] = 1.0
+    cost[0, 2] = 5.0
+    inst = TSPInstance(list('abcd'), cost)
+    assert LocalSearch.nearest_neighbors(inst, 3) == [[1, 2], [2], [3], [0]]
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from Algorithms import HeldKarp, LowerBound
+from Algorithms.Control import RunControl
+from Algorithms.Instance import TSPInstance, random_uniform
+from Algorithms.Solvers import GASolver
+
+
+def random_instance(n, seed, symmetric):
+    rng = np.random.default_rng(seed)
+    cost = rng.integers(1, 100, (n, n)).astype(np.float64)
+    if symmetric:
+        cost = np.triu(cost, 1) + np.triu(cost, 1).T
+    np.fill_diagonal(cost, np.inf)
+    return TSPInstance([str(i) for i in range(n)], cost)
+
+
+@pytest.mark.parametrize('seed', range(6))
+@pytest.mark.parametrize('kind', ['euclidean', 'symmetric', 'asymmetric'])
+def test_bound_never_exceeds_optimum(kind, seed):
+    n = 6 + seed
+    inst = random_uniform(n, seed=seed) if kind == 'euclidean' else random_instance(n, seed, kind == 'symmetric')
+    _, optimum = HeldKarp.held_karp(inst, inst.names[0])
+    bound = LowerBound.lower_bound(inst, time_limit=None)
+    assert bound is not None
+    assert bound <= optimum + 1e-6
+    if kind == 'euclidean':
+        # Cận 1-tree Held-Karp thường cách tối ưu vài phần trăm
+        assert bound >= 0.8 * optimum
+
+
+def test_bound_skips_tiny_and_huge_instances(monkeypatch):
+    assert LowerBound.lower_bound(random_uniform(2, seed=0)) is None
+    monkeypatch.setattr(LowerBound, 'BOUND_MAX_CITIES', 10)
+    assert LowerBound.lower_bound(random_uniform(11, seed=0)) is None
+
+
+def test_gap():
+    assert LowerBound.gap(110, 100) == pytest.approx(10.0)
+    assert LowerBound.gap(99.9999, 100) == 0.0
+    assert LowerBound.gap(None, 100) is None and LowerBound.gap(110, None) is None
+
+
+def test_control_stops_within_gap():
+    control = RunControl(gap=5)
+    control.incumbent(['a', 'a'], 106)
+    control.set_lower_bound(100)
+    assert not control.should_stop()
+    control.incumbent(['a', 'a'], 104)
+    assert control.gap_reached and control.should_stop()
+
+
+def test_ga_stops_early_on_gap():
+    # GA thuần trên 40 thành phố kết thúc còn cách cận dưới trên 100%: ngưỡng 200% đạt được giữa chừng
+    inst = random_uniform(40, seed=9)
+    full = GASolver(seed=0, lower_bound=True).solve(inst, '1', RunControl())
+    control = RunControl(gap=200)
+    early = GASolver(seed=0, lower_bound=True).solve(inst, '1', control)
+    assert control.gap_reached
+    assert early.gap <= 200
+    assert len(early.trace) < len(full.trace)
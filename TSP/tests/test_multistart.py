@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from Algorithms import GBFS1, MultiStart
+from Algorithms.Instance import TSPInstance, random_uniform
+from Algorithms.Solvers import MultiStartSolver
+
+
+def test_best_start_is_rotated_to_the_requested_city():
+    inst = random_uniform(30, seed=1)
+    path, cost, costs = MultiStart.multi_start(inst, '5', workers=1)
+    expected = {city: GBFS1.greedy_best_first_search(inst, city)[1] for city in inst.names}
+    assert costs == expected
+    assert cost == min(expected.values())
+    assert path[0] == path[-1] == '5'
+    assert cost == pytest.approx(inst.tour_cost(inst.ids(path[:-1])))
+
+
+def test_process_pool_matches_serial_run():
+    inst = random_uniform(MultiStart.PARALLEL_MIN_CITIES, seed=2)
+    serial = MultiStart.multi_start(inst, '1', sample=40, seed=3, workers=1)
+    parallel = MultiStart.multi_start(inst, '1', sample=40, seed=3, workers=2)
+    assert parallel == serial
+
+
+def test_pick_starts_sample():
+    inst = random_uniform(50, seed=4)
+    starts = MultiStart.pick_starts(inst, '7', sample=10, seed=0)
+    assert starts[0] == '7' and len(set(starts)) == 10
+    assert starts == MultiStart.pick_starts(inst, '7', sample=10, seed=0)
+    assert MultiStart.pick_starts(inst, '7', sample=80) == inst.names
+
+
+def test_starts_without_a_tour_are_reported():
+    # Chu trình có hướng a -> b -> c -> d -> a cộng cạnh tắt a -> c: GBFS từ a và d đi tắt rồi vào ngõ cụt
+    cost = np.full((4, 4), np.inf)
+    cost[0, 1] = cost[1, 2] = cost[2, 3] = cost[3, 0] = 5.0
+    cost[0, 2] = 1.0
+    inst = TSPInstance(list('abcd'), cost)
+    result = MultiStartSolver(workers=1).solve(inst, 'a')
+    assert result.path == ['a', 'b', 'c', 'd', 'a']
+    assert result.stats['starts'] == 4 and result.stats['found'] == 2
+    assert result.stats['min'] == result.cost == 20
+
+
+def test_cost_summary():
+    summary = MultiStart.cost_summary({'a': 10.0, 'b': None, 'c': 20.0, 'd': 30.0})
+    assert summary['starts'] == 4 and summary['found'] == 3
+    assert (summary['min'], summary['median'], summary['max'], summary['mean']) == (10.0, 20.0, 30.0, 20.0)
+    assert MultiStart.cost_summary({'a': None}) == {'starts': 1, 'found': 0}
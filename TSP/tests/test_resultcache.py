@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+from Algorithms.Control import RunControl
+from Algorithms.Instance import TSPInstance, random_uniform
+from Algorithms.ResultCache import ResultCache
+from Algorithms.Solvers import GASolver, GBFSSolver, HeldKarpSolver, MultiStartSolver
+
+
+def random_instance(n, seed, symmetric):
+    rng = np.random.default_rng(seed)
+    cost = rng.integers(1, 100, (n, n)).astype(np.float64)
+    if symmetric:
+        cost = np.triu(cost, 1) + np.triu(cost, 1).T
+    return TSPInstance([str(i) for i in range(n)], cost)
+
+
+def cycle_edges(inst, path):
+    # Tập cạnh có hướng của chu trình đóng: giống nhau nghĩa là cùng một chu trình, bất kể điểm bắt đầu
+    ids = inst.ids(path)
+    return set(zip(ids, ids[1:]))
+
+
+# ==== Kết quả lưu một lần, xoay về mọi điểm xuất phát ====
+
+@pytest.mark.parametrize('solver', [HeldKarpSolver(), MultiStartSolver()], ids=lambda s: s.name)
+def test_cache_rotation_returns_same_cycle(solver):
+    inst = random_instance(8, 1, False)
+    cache = ResultCache(path=None)
+    first = cache.solve(solver, inst, '0')
+    assert first.cached is None
+    for start in inst.names:
+        result = cache.solve(solver, inst, start)
+        assert result.cached == 'memory'
+        assert result.path[0] == result.path[-1] == start
+        assert result.cost == first.cost
+        assert cycle_edges(inst, result.path) == cycle_edges(inst, first.path)
+
+
+def test_cache_keeps_start_for_start_dependent_solver():
+    inst = random_instance(8, 2, True)
+    cache = ResultCache(path=None)
+    for start in inst.names:
+        result = cache.solve(GBFSSolver(), inst, start)
+        assert result.cached is None
+        assert result.path[0] == start
+
+
+# ==== Tầng đĩa ====
+
+def test_disk_tier_survives_a_new_cache(tmp_path):
+    path = str(tmp_path / 'results.sqlite')
+    inst = random_uniform(15, seed=3)
+    solver = GASolver(seed=1, generations=15)
+    first = ResultCache(path).solve(solver, inst, '1')
+    again = ResultCache(path).solve(solver, inst, '1')
+    assert again.cached == 'disk'
+    assert (again.path, again.cost, again.trace) == (first.path, first.cost, first.trace)
+
+
+def test_disk_tier_evicts_least_recently_used(tmp_path):
+    path = str(tmp_path / 'results.sqlite')
+    cache = ResultCache(path, capacity=1, max_bytes=600)
+    for i in range(5):
+        cache.put(f'key{i}', 'test', {'path': list(range(40)), 'cost': i})
+    # Mỗi mục ~200 byte: trên đĩa chỉ còn các mục mới nhất
+    cache.memory.clear()
+    assert cache.get('key4')[1] == 'disk'
+    assert cache.get('key0') == (None, None)
+
+
+# ==== Không lưu ====
+
+def test_stopped_runs_are_not_stored():
+    # GA trả về lời giải tốt nhất đến lúc dừng thay vì ném Cancelled
+    inst = random_uniform(20, seed=4)
+    cache = ResultCache(path=None)
+    control = RunControl()
+    control.cancel()
+    cache.solve(GASolver(seed=1), inst, '1', control)
+    assert not cache.memory
+
+
+def test_unseeded_random_solver_is_not_cached():
+    inst = random_uniform(10, seed=5)
+    cache = ResultCache(path=None)
+    cache.solve(GASolver(generations=5), inst, '1')
+    assert not cache.memory and cache.misses == 0
@@ -0,0 +1,35 @@
+import itertools
+
+import pytest
+
+from Algorithms.Instance import as_instance
+from Algorithms.Solvers import SOLVERS
+
+# Đồ thị đầy đủ 5 thành phố, tên khác các đồ thị mẫu và không có tọa độ
+graph = {
+    'P': [['Q', 3], ['R', 7], ['S', 4], ['T', 6]],
+    'Q': [['P', 3], ['R', 2], ['S', 8], ['T', 5]],
+    'R': [['P', 7], ['Q', 2], ['S', 3], ['T', 9]],
+    'S': [['P', 4], ['Q', 8], ['R', 3], ['T', 2]],
+    'T': [['P', 6], ['Q', 5], ['R', 9], ['S', 2]],
+}
+
+
+def brute_force(inst, start):
+    s = inst.index[start]
+    others = [i for i in range(inst.n) if i != s]
+    return min(inst.tour_cost([s] + list(p)) for p in itertools.permutations(others))
+
+
+@pytest.mark.parametrize('name', sorted(SOLVERS))
+def test_solver_runs_on_graph_without_positions(name):
+    result = SOLVERS[name](seed=1).solve(graph, 'P')
+    inst = as_instance(graph)
+    assert result.found
+    assert result.path[0] == 'P'
+    assert set(result.path) == set(graph) and len(set(result.path)) == inst.n
+    cycle = result.path[:-1] if result.path[-1] == result.path[0] else result.path
+    assert len(cycle) == inst.n
+    assert result.cost == pytest.approx(inst.tour_cost(inst.ids(cycle)))
+    if SOLVERS[name].exact:
+        assert result.cost == brute_force(inst, 'P')
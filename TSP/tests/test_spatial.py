@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from Algorithms.Greedy import greedy_best_first
+from Algorithms.Instance import TSPInstance, random_clustered, random_uniform
+from Algorithms.Spatial import GridIndex, greedy_nearest
+
+
+def lattice(side):
+    # Lưới điểm nguyên: rất nhiều khoảng cách bằng nhau, kiểm tra cách phá hòa
+    xs, ys = np.meshgrid(np.arange(side), np.arange(side))
+    return TSPInstance.from_coords(np.column_stack([xs.ravel(), ys.ravel()]).astype(float))
+
+
+@pytest.mark.parametrize('inst', [random_uniform(200, seed=1), random_clustered(300, seed=2), lattice(12)],
+                         ids=['uniform', 'clustered', 'lattice'])
+def test_grid_greedy_matches_dense_gbfs(inst):
+    for start in inst.names[:3]:
+        path, cost = greedy_nearest(inst, start)
+        dense_path, dense_cost = greedy_best_first(inst, start, spatial=False)
+        assert path == dense_path
+        assert cost == pytest.approx(dense_cost)
+
+
+def test_nearest_after_removals():
+    inst = random_uniform(500, seed=3)
+    index = GridIndex(inst.coords)
+    rng = np.random.default_rng(3)
+    alive = np.ones(inst.n, dtype=bool)
+    for i in rng.permutation(inst.n)[:450]:
+        index.remove(int(i))
+        alive[i] = False
+    assert index.rebuilds > 0
+    for x, y in rng.uniform(0, 1000, (20, 2)):
+        j, _ = index.nearest(x, y)
+        d = np.where(alive, np.hypot(inst.coords[:, 0] - x, inst.coords[:, 1] - y), np.inf)
+        assert d[j] == d.min()
+
+
+def test_nearest_on_empty_index():
+    index = GridIndex(np.zeros((1, 2)))
+    index.remove(0)
+    assert index.nearest(0.0, 0.0) == (-1, 0)